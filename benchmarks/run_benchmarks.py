@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hysteria2 Web Manager benchmark suite
+بنچمارک مسیرهای پرکاربرد مدیر وب
+
+Runs fully offline: stand-in systemctl, hysteria, ping and openssl binaries
+are put first on PATH, and all state lives in a temporary directory.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --clients 10,100,1000 --log-sizes 10M,100M,1G,2G
+    python benchmarks/run_benchmarks.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+FAKE_BINARIES = {
+    "systemctl": """#!/bin/sh
+case "$1" in
+    is-active) echo active ;;
+esac
+exit 0
+""",
+    "hysteria": """#!/bin/sh
+echo "Version: v2.0.0-bench"
+exit 0
+""",
+    "ping": """#!/bin/sh
+echo "rtt min/avg/max/mdev = 40.000/50.000/60.000/5.000 ms"
+exit 0
+""",
+    "openssl": """#!/bin/sh
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -keyout|-out) shift; echo "bench" > "$1" ;;
+    esac
+    shift
+done
+exit 0
+"""
+}
+
+LOG_MESSAGES = [
+    "🟢 client1 ONLINE - SOCKS5 proxy responding",
+    "🔴 client2 OFFLINE - service stopped",
+    "⚠️ WARNING client3 high latency",
+    "🛑 ERROR client4 restart failed",
+    "Health check completed"
+]
+
+
+def parse_size(value):
+    """Parse sizes like 10M or 2G into bytes"""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    value = value.strip().upper()
+    if value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def summarize(samples):
+    """Latency summary in milliseconds"""
+    samples = sorted(samples)
+    p95_index = min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))
+    return {
+        "samples": len(samples),
+        "min_ms": round(samples[0] * 1000, 3),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p95_ms": round(samples[p95_index] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3)
+    }
+
+
+def measure(func, iterations):
+    """Run func repeatedly and record latency and peak Python memory"""
+    samples = []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = summarize(samples)
+    result["peak_alloc_bytes"] = peak
+    return result
+
+
+class BenchEnvironment:
+    def __init__(self, workdir):
+        self.workdir = workdir
+        self.bin_dir = os.path.join(workdir, "bin")
+        self.hysteria_dir = os.path.join(workdir, "hysteria")
+        self.systemd_dir = os.path.join(workdir, "systemd")
+        self.clients_file = os.path.join(workdir, "clients.json")
+        self.log_file = os.path.join(workdir, "hysteria-monitor.log")
+
+    def setup(self):
+        """Create the fake binaries and point the manager at the sandbox"""
+        for path in (self.bin_dir, self.hysteria_dir, self.systemd_dir):
+            os.makedirs(path, exist_ok=True)
+
+        for name, content in FAKE_BINARIES.items():
+            path = os.path.join(self.bin_dir, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.chmod(path, 0o755)
+
+        os.environ["PATH"] = self.bin_dir + os.pathsep + os.environ.get("PATH", "")
+        os.environ["HYSTERIA_WEB_LOG_FILE"] = self.log_file
+        os.environ["HYSTERIA_WEB_HYSTERIA_DIR"] = self.hysteria_dir
+        os.environ["HYSTERIA_WEB_SYSTEMD_DIR"] = self.systemd_dir
+        os.environ["HYSTERIA_WEB_CLIENTS_FILE"] = self.clients_file
+        os.environ["HYSTERIA_WEB_SERVER_FILE"] = os.path.join(self.workdir, "server.json")
+        os.environ["HYSTERIA_WEB_AVAILABILITY_DB"] = os.path.join(self.workdir, "availability.db")
+        os.environ["HYSTERIA_WEB_BINARY"] = os.path.join(self.bin_dir, "hysteria")
+
+    def write_clients(self, count):
+        """Write a synthetic clients.json with count clients"""
+        clients = {}
+        for i in range(1, count + 1):
+            client_id = f"client{i}"
+            clients[client_id] = {
+                "name": f"Client {client_id} (10.0.{i // 256}.{i % 256})",
+                "server": f"10.0.{i // 256}.{i % 256}:443",
+                "port": 20000 + i,
+                "service": f"hysteria-{client_id}",
+                "config_file": os.path.join(self.hysteria_dir, f"{client_id}.yaml"),
+                "status": "unknown",
+                "password": f"pass{i}"
+            }
+        with open(self.clients_file, 'w', encoding='utf-8') as f:
+            json.dump(clients, f, indent=2)
+        return clients
+
+    def write_log(self, size):
+        """Write a synthetic monitor log of roughly size bytes"""
+        rng = random.Random(size)
+        block = []
+        for i in range(4096):
+            timestamp = datetime(2025, 1, 1).timestamp() + i
+            stamp = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+            block.append(f"{stamp} - {rng.choice(LOG_MESSAGES)}\n")
+        block = "".join(block).encode("utf-8")
+
+        with open(self.log_file, 'wb') as f:
+            written = 0
+            while written < size:
+                chunk = block[:size - written]
+                f.write(chunk)
+                written += len(chunk)
+
+
+def bench_status(app_module, env, client_counts, iterations):
+    results = {}
+    client = app_module.app.test_client()
+    for count in client_counts:
+        env.write_clients(count)
+        app_module.monitor.client_manager.load_clients()
+        results[f"clients_{count}"] = measure(lambda: client.get('/api/status'), iterations)
+        print(f"  /api/status clients={count}: {results[f'clients_{count}']['median_ms']} ms")
+    return results
+
+
+def bench_logs(app_module, env, log_sizes, iterations):
+    results = {}
+    client = app_module.app.test_client()
+    for size in log_sizes:
+        env.write_log(size)
+        for lines in (50, 1000):
+            key = f"{size}_bytes_{lines}_lines"
+            results[key] = measure(lambda: client.get(f'/api/logs?lines={lines}'), iterations)
+            print(f"  /api/logs size={size} lines={lines}: {results[key]['median_ms']} ms")
+    os.remove(env.log_file)
+    return results
+
+
+def bench_stream_fanout(app_module, env, subscriber_counts):
+    """Open N concurrent /api/logs/stream subscribers and time delivery of one line"""
+    results = {}
+    env.write_log(1024 * 1024)
+    for subscribers in subscriber_counts:
+        ready = threading.Barrier(subscribers + 1)
+        received = []
+        lock = threading.Lock()
+        written_at = {}
+
+        def subscribe():
+            client = app_module.app.test_client()
+            ready.wait()
+            # The test client returns once the first event has been produced
+            response = client.get('/api/logs/stream', buffered=False)
+            with lock:
+                received.append(time.perf_counter())
+            response.close()
+
+        threads = [threading.Thread(target=subscribe, daemon=True) for _ in range(subscribers)]
+        tracemalloc.start()
+        for thread in threads:
+            thread.start()
+        ready.wait()
+        # Let every generator reach the end of file before appending
+        time.sleep(1.5)
+
+        written_at["t"] = time.perf_counter()
+        with open(env.log_file, 'a', encoding='utf-8') as f:
+            f.write(f"{datetime.now():%Y-%m-%d %H:%M:%S} - 🟢 bench ONLINE\n")
+
+        for thread in threads:
+            thread.join(timeout=30)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        delays = [t - written_at["t"] for t in received]
+        result = summarize(delays) if delays else {"samples": 0}
+        result["subscribers"] = subscribers
+        result["delivered"] = len(delays)
+        result["peak_alloc_bytes"] = peak
+        results[f"subscribers_{subscribers}"] = result
+        print(f"  /api/logs/stream subscribers={subscribers}: delivered {len(delays)}")
+    os.remove(env.log_file)
+    return results
+
+
+def bench_client_lifecycle(app_module, env, client_counts, iterations):
+    results = {}
+    manager = app_module.monitor.client_manager
+    for count in client_counts:
+        env.write_clients(count)
+        manager.load_clients()
+        add_samples = []
+        remove_samples = []
+        tracemalloc.start()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            added = manager.add_client("127.0.0.1", 443, "benchpass", 40000)
+            add_samples.append(time.perf_counter() - start)
+            if not added["success"]:
+                raise RuntimeError(f"add_client failed: {added['error']}")
+
+            start = time.perf_counter()
+            manager.remove_client(added["client_id"])
+            remove_samples.append(time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[f"clients_{count}"] = {
+            "add_client": summarize(add_samples),
+            "remove_client": summarize(remove_samples),
+            "peak_alloc_bytes": peak
+        }
+        print(f"  add/remove clients={count}: "
+              f"{results[f'clients_{count}']['add_client']['median_ms']} / "
+              f"{results[f'clients_{count}']['remove_client']['median_ms']} ms")
+    return results
+
+
+def bench_server_setup(app_module, iterations):
+    manager = app_module.monitor.server_manager
+    # Public IP lookup would leave the machine; keep the run offline
+    manager.get_server_ip = lambda: "127.0.0.1"
+    result = measure(lambda: manager.setup_server(443, "benchpass"), iterations)
+    print(f"  setup_server: {result['median_ms']} ms")
+    return result
+
+
+def get_version():
+    """Describe the checked out version"""
+    try:
+        result = subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=ROOT_DIR,
+                              capture_output=True, text=True)
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except:
+        pass
+    return "unknown"
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="hysteria-bench-")
+    env = BenchEnvironment(workdir)
+    env.setup()
+
+    sys.path.insert(0, SRC_DIR)
+    import app as app_module
+
+    client_counts = [int(c) for c in args.clients.split(',')]
+    log_sizes = [parse_size(s) for s in args.log_sizes.split(',')]
+    subscriber_counts = [int(c) for c in args.subscribers.split(',')]
+
+    report = {
+        "version": args.label or get_version(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "clients": client_counts,
+            "log_sizes": log_sizes,
+            "subscribers": subscriber_counts,
+            "iterations": args.iterations
+        },
+        "results": {}
+    }
+
+    try:
+        print("Benchmarking /api/status")
+        report["results"]["api_status"] = bench_status(app_module, env, client_counts, args.iterations)
+        print("Benchmarking /api/logs")
+        report["results"]["api_logs"] = bench_logs(app_module, env, log_sizes, args.iterations)
+        print("Benchmarking /api/logs/stream fan-out")
+        report["results"]["api_logs_stream"] = bench_stream_fanout(app_module, env, subscriber_counts)
+        print("Benchmarking add_client/remove_client")
+        report["results"]["client_lifecycle"] = bench_client_lifecycle(app_module, env, client_counts,
+                                                                       args.iterations)
+        print("Benchmarking server setup")
+        report["results"]["server_setup"] = bench_server_setup(app_module, args.iterations)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{report['version']}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {output}")
+
+
+def flatten(results, prefix=""):
+    """Flatten nested results into {path: median_ms}"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            if "median_ms" in value:
+                flat[path] = value["median_ms"]
+            flat.update(flatten({k: v for k, v in value.items() if isinstance(v, dict)}, path))
+    return flat
+
+
+def compare(old_file, new_file, threshold):
+    """Compare two result files, return non-zero if a median regressed"""
+    with open(old_file, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_file, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    old_flat = flatten(old["results"])
+    new_flat = flatten(new["results"])
+    regressions = 0
+
+    print(f"{'benchmark':60} {old['version']:>14} {new['version']:>14} {'change':>9}")
+    for path in sorted(set(old_flat) & set(new_flat)):
+        before, after = old_flat[path], new_flat[path]
+        change = (after - before) / before * 100 if before else 0.0
+        marker = ""
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions += 1
+        print(f"{path:60} {before:>12.3f}ms {after:>12.3f}ms {change:>+8.1f}%{marker}")
+
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Hysteria2 Web Manager hot paths")
+    parser.add_argument('--clients', default="10,100,1000", help="Client store sizes")
+    parser.add_argument('--log-sizes', default="10M,100M", help="Monitor log sizes, e.g. 10M,1G,2G")
+    parser.add_argument('--subscribers', default="1,10,50", help="Concurrent log stream subscribers")
+    parser.add_argument('--iterations', type=int, default=10, help="Samples per benchmark")
+    parser.add_argument('--label', help="Version label stored in the results")
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="Compare two result files")
+    parser.add_argument('--threshold', type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(args.compare[0], args.compare[1], args.threshold))
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -88,13 +88,17 @@ copy_files() {
     
     # Copy source files if they exist
     if [ -f "app.py" ]; then
-        cp app.py /opt/hysteria-web/src/
+        cp *.py /opt/hysteria-web/src/
     fi
     
     if [ -d "templates" ]; then
         cp -r templates /opt/hysteria-web/src/
     fi
     
+    if [ -d "static" ]; then
+        cp -r static /opt/hysteria-web/src/
+    fi
+    
     if [ -f "requirements.txt" ]; then
         cp requirements.txt /opt/hysteria-web/
     fi
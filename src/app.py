@@ -8,13 +8,14 @@ Hysteria2 Complete Management Web Service
 A Flask web application to view logs, manage clients and servers
 """
 
-from flask import Flask, render_template, jsonify, request, Response
+from flask import Flask, render_template, jsonify, request, Response, abort, stream_with_context, g
 import os
 import json
 import subprocess
 import time
 from datetime import datetime, timedelta
 import re
+from collections import deque
 from threading import Thread
 import socket
 import yaml
@@ -22,22 +23,79 @@ import secrets
 import string
 import urllib.request
 import ssl
+import hmac
+import atexit
+import signal
+import sys
+from functools import wraps
+
+from quic_tuning import QuicTuner, PROFILE_PRESETS, DEFAULT_PROFILE
+from log_segments import LogRotator, LogSegmentReader, LogFollower
+from availability import AvailabilityRecorder
+from journal import JournalReader
+from service_control import ServiceControlQueue, ACTIONS
+from static_assets import StaticAssetPipeline, PageCache
+from fleet import FleetAggregator
+from migration import ClientMigrator
+from net_tuning import NetworkTuningAdvisor
+from socket_stats import SocketStatsCollector
+from cgroup_stats import UnitResourceCollector
+from request_profiler import RequestProfiler
 
 app = Flask(__name__, template_folder="templates")
 
-# Configuration
-LOG_FILE = "/var/log/hysteria-monitor.log"
+# Versioned, precompressed dashboard assets
+assets = StaticAssetPipeline(os.path.join(app.root_path, "static"))
+assets.build()
+app.jinja_env.globals['asset_url'] = assets.asset_url
+page_cache = PageCache()
+
+# Configuration (paths can be overridden from the environment)
+LOG_FILE = os.environ.get("HYSTERIA_WEB_LOG_FILE", "/var/log/hysteria-monitor.log")
 PORT = 8080
 HOST = "0.0.0.0"  # Listen on all interfaces
 MAX_LOG_LINES = 1000
-HYSTERIA_DIR = "/etc/hysteria"
-CLIENTS_CONFIG_FILE = "/opt/hysteria-web/clients.json"
-SERVER_CONFIG_FILE = "/opt/hysteria-web/server.json"
-HYSTERIA_BINARY = "/usr/local/bin/hysteria"
+HYSTERIA_DIR = os.environ.get("HYSTERIA_WEB_HYSTERIA_DIR", "/etc/hysteria")
+CLIENTS_CONFIG_FILE = os.environ.get("HYSTERIA_WEB_CLIENTS_FILE", "/opt/hysteria-web/clients.json")
+SERVER_CONFIG_FILE = os.environ.get("HYSTERIA_WEB_SERVER_FILE", "/opt/hysteria-web/server.json")
+HYSTERIA_BINARY = os.environ.get("HYSTERIA_WEB_BINARY", "/usr/local/bin/hysteria")
+SYSTEMD_DIR = os.environ.get("HYSTERIA_WEB_SYSTEMD_DIR", "/etc/systemd/system")
+AVAILABILITY_DB = os.environ.get("HYSTERIA_WEB_AVAILABILITY_DB", "/opt/hysteria-web/availability.db")
+AVAILABILITY_WINDOW = 7 * 86400  # Default query window in seconds
+AVAILABILITY_SAMPLE_INTERVAL = 30  # seconds between background status samples
+JOURNAL_CURSOR_FILE = os.environ.get("HYSTERIA_WEB_JOURNAL_CURSOR", "/opt/hysteria-web/journal.cursor")
+JOURNAL_ENTRIES_FILE = os.environ.get("HYSTERIA_WEB_JOURNAL_ENTRIES", "/opt/hysteria-web/journal.entries")
+JOURNALCTL_BINARY = os.environ.get("HYSTERIA_WEB_JOURNALCTL", "journalctl")
+SERVICE_MAX_PARALLEL = 2  # systemctl operations running at once
+SERVICE_DEBOUNCE = 1.0  # seconds a burst of requests is merged
+SERVICE_MIN_RESTART_INTERVAL = 10.0  # seconds between restarts of one unit
+AGENT_TOKEN = os.environ.get("HYSTERIA_WEB_AGENT_TOKEN", "")  # Agent API is disabled when empty
+ADMIN_TOKEN = os.environ.get("HYSTERIA_WEB_ADMIN_TOKEN", "")  # Admin API is disabled when empty
+PROFILE_SLOW_THRESHOLD_MS = 1000
+PROFILE_MAX_RECORDS = 20  # profiles kept in memory
+FLEET_CONFIG_FILE = os.environ.get("HYSTERIA_WEB_FLEET_FILE", "/opt/hysteria-web/fleet.json")
+FLEET_TIMEOUT = 5  # seconds per node
+FLEET_REFRESH_INTERVAL = 15  # seconds
+IMPORT_PROGRESS_DIR = os.environ.get("HYSTERIA_WEB_IMPORT_DIR", "/opt/hysteria-web/imports")
+IMPORT_MAX_BATCH_SIZE = 1000
+HOST_PROC_ROOT = os.environ.get("HYSTERIA_WEB_PROC_ROOT", "/proc")
+HOST_SYS_ROOT = os.environ.get("HYSTERIA_WEB_SYS_ROOT", "/sys")
+SYSCTL_DROPIN_FILE = os.environ.get("HYSTERIA_WEB_SYSCTL_DROPIN", "/etc/sysctl.d/99-hysteria-web.conf")
+ETHTOOL_BINARY = os.environ.get("HYSTERIA_WEB_ETHTOOL", "ethtool")
+CGROUP_ROOT = os.environ.get("HYSTERIA_WEB_CGROUP_ROOT", "/sys/fs/cgroup")
+RESOURCE_SAMPLE_INTERVAL = 10  # seconds
+RESOURCE_HISTORY_SIZE = 360  # samples kept per unit (1 hour)
+LOG_ROTATE_MAX_BYTES = 50 * 1024 * 1024
+LOG_ROTATE_MAX_AGE = 86400  # seconds
+LOG_ROTATE_KEEP = 10
+LOG_ROTATE_COMPRESSION = os.environ.get("HYSTERIA_WEB_LOG_COMPRESSION", "gzip")  # gzip or zstd
+SERVER_EXPECTED_CONNECTIONS = 16  # Peers sharing the server memory budget
+CLIENT_EXPECTED_CONNECTIONS = 16  # Client units sharing the host memory budget
 
 class HysteriaServerManager:
     def __init__(self):
         self.server_config_file = SERVER_CONFIG_FILE
+        self.tuner = QuicTuner()
         self.load_server_config()
     
     def load_server_config(self):
@@ -54,7 +112,7 @@ class HysteriaServerManager:
                     "port": 443,
                     "password": "",
                     "domain": "",
-                    "config_file": "/etc/hysteria/server.yaml"
+                    "config_file": f"{HYSTERIA_DIR}/server.yaml"
                 }
                 self.save_server_config()
         except Exception as e:
@@ -135,7 +193,7 @@ class HysteriaServerManager:
     def generate_self_signed_cert(self, domain):
         """Generate self-signed SSL certificate"""
         try:
-            cert_dir = "/etc/hysteria/certs"
+            cert_dir = f"{HYSTERIA_DIR}/certs"
             os.makedirs(cert_dir, exist_ok=True)
             
             cert_file = f"{cert_dir}/cert.pem"
@@ -161,10 +219,13 @@ class HysteriaServerManager:
         except Exception as e:
             return {"success": False, "error": f"Certificate error: {str(e)}"}
     
-    def create_server_config(self, port, password, domain=None):
+    def create_server_config(self, port, password, domain=None, tuning=None):
         """Create Hysteria2 server configuration"""
         server_ip = self.get_server_ip()
         
+        if tuning is None:
+            tuning = self.tuner.compute_profile(connections=SERVER_EXPECTED_CONNECTIONS)
+        
         if domain:
             # Generate self-signed certificate for domain
             cert_result = self.generate_self_signed_cert(domain)
@@ -194,22 +255,11 @@ auth:
 
 tls:{tls_config}
 
-# QUIC optimizations
-quic:
-  initStreamReceiveWindow: 67108864
-  maxStreamReceiveWindow: 67108864
-  initConnReceiveWindow: 134217728
-  maxConnReceiveWindow: 134217728
-  maxIncomingStreams: 4096
-  disablePathMTUDiscovery: false
-  keepAlivePeriod: 10s
-  handshakeIdleTimeout: 10s
-  maxIncomingUniStreams: 4096
+# QUIC optimizations ({tuning["profile"]} profile)
+{self.tuner.render_quic(tuning)}
 
 # Advanced settings
-bandwidth:
-  up: 1 gbps
-  down: 1 gbps
+{self.tuner.render_bandwidth(tuning)}
 
 # Enable UDP relay
 relay:
@@ -239,9 +289,9 @@ masquerade:
     url: https://www.bing.com
     rewriteHost: true
 """
-        return {"success": True, "config": config}
+        return {"success": True, "config": config, "tuning": tuning}
     
-    def setup_server(self, port, password, domain=None):
+    def setup_server(self, port, password, domain=None, tuning=None):
         """Set up Hysteria2 server"""
         try:
             # Check if Hysteria is installed
@@ -251,11 +301,11 @@ masquerade:
                     return install_result
             
             # Create server configuration
-            config_result = self.create_server_config(port, password, domain)
+            config_result = self.create_server_config(port, password, domain, tuning)
             if not config_result["success"]:
                 return config_result
             
-            config_file = "/etc/hysteria/server.yaml"
+            config_file = f"{HYSTERIA_DIR}/server.yaml"
             
             # Write configuration file
             with open(config_file, 'w', encoding='utf-8') as f:
@@ -289,7 +339,7 @@ ProtectControlGroups=yes
 WantedBy=multi-user.target
 """
             
-            service_file = "/etc/systemd/system/hysteria-server.service"
+            service_file = f"{SYSTEMD_DIR}/hysteria-server.service"
             with open(service_file, 'w', encoding='utf-8') as f:
                 f.write(service_content)
             
@@ -300,7 +350,8 @@ WantedBy=multi-user.target
                 "port": port,
                 "password": password,
                 "domain": domain or self.get_server_ip(),
-                "config_file": config_file
+                "config_file": config_file,
+                "tuning": config_result["tuning"]
             })
             self.save_server_config()
             
@@ -317,7 +368,8 @@ WantedBy=multi-user.target
                     "port": port,
                     "password": password,
                     "domain": domain
-                }
+                },
+                "tuning": config_result["tuning"]
             }
             
         except Exception as e:
@@ -335,7 +387,7 @@ WantedBy=multi-user.target
             running = result.returncode == 0
             
             # Check if configured
-            configured = os.path.exists("/etc/hysteria/server.yaml")
+            configured = os.path.exists(f"{HYSTERIA_DIR}/server.yaml")
             
             return {
                 "installed": installed,
@@ -352,8 +404,10 @@ WantedBy=multi-user.target
             }
 
 class HysteriaClientManager:
-    def __init__(self):
+    def __init__(self, server_manager=None):
         self.clients_file = CLIENTS_CONFIG_FILE
+        self.server_manager = server_manager
+        self.tuner = QuicTuner()
         self.load_clients()
     
     def load_clients(self):
@@ -370,7 +424,7 @@ class HysteriaClientManager:
                         "server": "138.197.130.170:443",
                         "port": 1090,
                         "service": "hysteria-client",
-                        "config_file": "/etc/hysteria/client.yaml",
+                        "config_file": f"{HYSTERIA_DIR}/client.yaml",
                         "status": "unknown",
                         "password": "pass1234"
                     },
@@ -379,7 +433,7 @@ class HysteriaClientManager:
                         "server": "185.55.241.111:443",
                         "port": 1080,
                         "service": "hysteria-client2",
-                        "config_file": "/etc/hysteria/client2.yaml",
+                        "config_file": f"{HYSTERIA_DIR}/client2.yaml",
                         "status": "unknown",
                         "password": "pass1234"
                     }
@@ -397,53 +451,65 @@ class HysteriaClientManager:
         except Exception as e:
             print(f"Error saving clients: {e}")
     
-    def get_next_available_port(self):
+    def get_used_ports(self, reserved=()):
+        """Ports of clients, the web manager and the Hysteria server"""
+        used_ports = {client["port"] for client in self.clients.values()} | set(reserved)
+        used_ports.add(PORT)
+        if self.server_manager:
+            try:
+                used_ports.add(int(self.server_manager.server_config.get("port")))
+            except (TypeError, ValueError):
+                pass
+        return used_ports
+    
+    def port_is_free(self, port):
+        """Check that a SOCKS5 listener could bind the port on this host"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind(('127.0.0.1', port))
+            except OSError:
+                return False
+        return True
+    
+    def is_port_available(self, port, reserved=()):
+        """Port is neither used by the manager nor held by another service"""
+        return port not in self.get_used_ports(reserved) and self.port_is_free(port)
+    
+    def get_next_available_port(self, reserved=()):
         """Get next available SOCKS5 port"""
-        used_ports = [client["port"] for client in self.clients.values()]
-        for port in range(1081, 1100):
-            if port not in used_ports:
+        used_ports = self.get_used_ports(reserved)
+        for port in range(1081, 65536):
+            if port not in used_ports and self.port_is_free(port):
                 return port
-        return 1081  # fallback
+        raise ValueError("No free SOCKS5 port left")
     
-    def get_next_client_id(self):
+    def get_next_client_id(self, reserved=()):
         """Get next available client ID"""
-        existing_nums = []
-        for client_id in self.clients.keys():
-            if client_id.startswith("client"):
-                try:
-                    num = int(client_id.replace("client", ""))
-                    existing_nums.append(num)
-                except:
-                    pass
-        
-        for i in range(1, 100):
-            if i not in existing_nums:
-                return f"client{i}"
-        return "client99"  # fallback
+        i = 1
+        while f"client{i}" in self.clients or f"client{i}" in reserved:
+            i += 1
+        return f"client{i}"
     
     def generate_password(self):
         """Generate random password"""
         return ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
     
-    def create_client_config(self, server_ip, server_port, socks_port, password):
+    def create_client_config(self, server_ip, server_port, socks_port, password, tuning=None):
         """Create Hysteria2 client configuration"""
+        if tuning is None:
+            tuning = self.tuner.compute_profile(connections=self.get_expected_connections())
+        
         config = f"""# Hysteria2 Client Configuration
 # Auto-generated configuration
 server: {server_ip}:{server_port}
 auth: {password}
 
-# تنظیمات QUIC حداکثری
-quic:
-  initStreamReceiveWindow: 67108864
-  maxStreamReceiveWindow: 67108864  
-  initConnReceiveWindow: 134217728
-  maxConnReceiveWindow: 134217728
-  maxIdleTimeout: 120s
-  maxIncomingStreams: 4096
-  disablePathMTUDiscovery: false
-  keepAlivePeriod: 10s
-  handshakeIdleTimeout: 10s
-  maxIncomingUniStreams: 4096
+# تنظیمات QUIC ({tuning["profile"]} profile)
+{self.tuner.render_quic(tuning, idle_timeout="120s")}
+
+# Bandwidth hints
+{self.tuner.render_bandwidth(tuning)}
 
 # حداکثر بهینه‌سازی اتصال  
 fastOpen: true
@@ -520,7 +586,50 @@ WantedBy=multi-user.target
 """
         return service_content
     
-    def add_client(self, server_ip, server_port, password, custom_port=None):
+    def compute_client_tuning(self, server_ip, profile=DEFAULT_PROFILE, bandwidth_mbps=None,
+                              rtt_ms=None, memory_budget_mb=None):
+        """Compute QUIC tuning for a client, measuring RTT when not given"""
+        if rtt_ms is None:
+            rtt_ms = self.tuner.measure_rtt(server_ip)
+        
+        return self.tuner.compute_profile(profile, bandwidth_mbps, rtt_ms, memory_budget_mb,
+                                          connections=self.get_expected_connections())
+    
+    def get_expected_connections(self):
+        """Client units sharing the host memory budget
+        
+        Configs are not re-rendered when clients are added, so every client is
+        sized for the same fixed share instead of for the current count.
+        """
+        return max(CLIENT_EXPECTED_CONNECTIONS, len(self.clients) + 1)
+    
+    def provision_clients(self, entries):
+        """Write configs and units for clients, then reload systemd once"""
+        for entry in entries:
+            client = entry["client"]
+            
+            # Write configuration file
+            with open(client["config_file"], 'w', encoding='utf-8') as f:
+                f.write(entry["config"])
+            
+            # Create systemd service
+            service_file = f"{SYSTEMD_DIR}/{client['service']}.service"
+            with open(service_file, 'w', encoding='utf-8') as f:
+                f.write(self.create_systemd_service(entry["client_id"], client["config_file"]))
+            
+            # Add to clients list
+            self.clients[entry["client_id"]] = client
+        
+        # Save clients configuration
+        self.save_clients()
+        
+        # Reload systemd and start services
+        services = [entry["client"]["service"] for entry in entries]
+        subprocess.run(['systemctl', 'daemon-reload'], check=True)
+        subprocess.run(['systemctl', 'enable'] + services, check=True)
+        subprocess.run(['systemctl', 'start'] + services, check=True)
+    
+    def add_client(self, server_ip, server_port, password, custom_port=None, tuning=None):
         """Add a new Hysteria2 client"""
         try:
             # Get next available identifiers
@@ -529,43 +638,32 @@ WantedBy=multi-user.target
             service_name = f"hysteria-{client_id}"
             config_file = f"{HYSTERIA_DIR}/{client_id}.yaml"
             
-            # Create client configuration
-            config_content = self.create_client_config(server_ip, server_port, socks_port, password)
-            
-            # Write configuration file
-            with open(config_file, 'w', encoding='utf-8') as f:
-                f.write(config_content)
+            if tuning is None:
+                tuning = self.compute_client_tuning(server_ip)
             
-            # Create systemd service
-            service_file = f"/etc/systemd/system/{service_name}.service"
-            service_content = self.create_systemd_service(client_id, config_file)
-            
-            with open(service_file, 'w', encoding='utf-8') as f:
-                f.write(service_content)
-            
-            # Add to clients list
-            self.clients[client_id] = {
-                "name": f"Client {client_id} ({server_ip})",
-                "server": f"{server_ip}:{server_port}",
-                "port": socks_port,
-                "service": service_name,
-                "config_file": config_file,
-                "status": "unknown",
-                "password": password
-            }
-            
-            # Save clients configuration
-            self.save_clients()
+            # Create client configuration
+            config_content = self.create_client_config(server_ip, server_port, socks_port, password, tuning)
             
-            # Reload systemd and start service
-            subprocess.run(['systemctl', 'daemon-reload'], check=True)
-            subprocess.run(['systemctl', 'enable', service_name], check=True)
-            subprocess.run(['systemctl', 'start', service_name], check=True)
+            self.provision_clients([{
+                "client_id": client_id,
+                "config": config_content,
+                "client": {
+                    "name": f"Client {client_id} ({server_ip})",
+                    "server": f"{server_ip}:{server_port}",
+                    "port": socks_port,
+                    "service": service_name,
+                    "config_file": config_file,
+                    "status": "unknown",
+                    "password": password,
+                    "tuning": tuning
+                }
+            }])
             
             return {
                 "success": True,
                 "client_id": client_id,
                 "socks_port": socks_port,
+                "tuning": tuning,
                 "message": f"Client {client_id} created successfully"
             }
             
@@ -584,7 +682,7 @@ WantedBy=multi-user.target
             client = self.clients[client_id]
             service_name = client["service"]
             config_file = client["config_file"]
-            service_file = f"/etc/systemd/system/{service_name}.service"
+            service_file = f"{SYSTEMD_DIR}/{service_name}.service"
             
             # Stop and disable service
             try:
@@ -622,8 +720,11 @@ WantedBy=multi-user.target
 
 class HysteriaMonitor:
     def __init__(self):
-        self.client_manager = HysteriaClientManager()
         self.server_manager = HysteriaServerManager()
+        self.client_manager = HysteriaClientManager(self.server_manager)
+        # States are trusted for three missed samples after the last heartbeat
+        self.availability = AvailabilityRecorder(AVAILABILITY_DB,
+                                                 heartbeat_timeout=3 * AVAILABILITY_SAMPLE_INTERVAL)
     
     def get_service_status(self, service_name):
         """Get systemd service status"""
@@ -656,11 +757,33 @@ class HysteriaMonitor:
             
             if service_status == "running" and proxy_status:
                 client["status"] = "online"
+                reason = "service running, proxy responding"
+            elif service_status != "running":
+                client["status"] = "offline"
+                reason = f"service {service_status}"
             else:
                 client["status"] = "offline"
+                reason = "proxy not responding"
+            
+            # Only state changes are stored
+            self.availability.observe(client_id, client["status"], reason)
         
         return clients
     
+    def sample_availability(self):
+        """Probe all clients and confirm the states with a heartbeat"""
+        self.get_clients_status()
+        self.availability.beat()
+    
+    def run(self):
+        """Availability sampling loop for a background thread"""
+        while True:
+            try:
+                self.sample_availability()
+            except Exception as e:
+                print(f"Error sampling client status: {e}")
+            time.sleep(AVAILABILITY_SAMPLE_INTERVAL)
+    
     def get_system_info(self):
         """Get system information"""
         try:
@@ -678,11 +801,67 @@ class HysteriaMonitor:
             return {"uptime": "Unknown", "memory": "Unknown"}
 
 monitor = HysteriaMonitor()
+log_reader = LogSegmentReader(LOG_FILE)
+log_rotator = LogRotator(LOG_FILE, LOG_ROTATE_MAX_BYTES, LOG_ROTATE_MAX_AGE,
+                         LOG_ROTATE_KEEP, LOG_ROTATE_COMPRESSION)
+
+def get_managed_units():
+    """Systemd units of the server and all clients"""
+    units = ['hysteria-server']
+    units += [client["service"] for client in monitor.client_manager.clients.values()]
+    return units
+
+journal_reader = JournalReader(get_managed_units, JOURNAL_CURSOR_FILE, JOURNALCTL_BINARY,
+                               entries_file=JOURNAL_ENTRIES_FILE)
+service_queue = ServiceControlQueue(SERVICE_MAX_PARALLEL, SERVICE_DEBOUNCE,
+                                    min_interval=SERVICE_MIN_RESTART_INTERVAL)
+fleet = FleetAggregator(FLEET_CONFIG_FILE, FLEET_TIMEOUT, FLEET_REFRESH_INTERVAL)
+migrator = ClientMigrator(monitor.client_manager, monitor.server_manager,
+                          HYSTERIA_DIR, IMPORT_PROGRESS_DIR)
+network_advisor = NetworkTuningAdvisor(HOST_PROC_ROOT, HOST_SYS_ROOT, SYSCTL_DROPIN_FILE, ETHTOOL_BINARY)
+socket_collector = SocketStatsCollector(HOST_PROC_ROOT, CGROUP_ROOT)
+resource_collector = UnitResourceCollector(get_managed_units, CGROUP_ROOT,
+                                           RESOURCE_SAMPLE_INTERVAL, RESOURCE_HISTORY_SIZE)
+profiler = RequestProfiler(PROFILE_SLOW_THRESHOLD_MS, PROFILE_MAX_RECORDS)
+
+def get_socket_stats():
+    """Socket statistics of all clients and the configured server port"""
+    server_config = monitor.server_manager.server_config
+    server_port = server_config.get("port") if server_config.get("configured") else None
+    return socket_collector.collect(dict(monitor.client_manager.clients), server_port)
+
+def parse_tuning_args(data):
+    """Extract QUIC tuning options from request data"""
+    args = {"profile": data.get('profile') or DEFAULT_PROFILE}
+    if args["profile"] not in PROFILE_PRESETS:
+        raise ValueError(f"Unknown tuning profile: {args['profile']}")
+    
+    for key in ('bandwidth_mbps', 'rtt_ms', 'memory_budget_mb'):
+        value = data.get(key)
+        if value in (None, ''):
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {key}")
+        if value <= 0:
+            raise ValueError(f"Invalid {key}")
+        args[key] = value
+    
+    return args
 
 @app.route('/')
 def index():
     """Main dashboard page"""
-    return render_template('index.html')
+    return page_cache.get('index.html', lambda: render_template('index.html'))
+
+@app.route('/assets/<path:filename>')
+def static_asset(filename):
+    """Versioned dashboard assets"""
+    response = assets.serve(filename)
+    if response is None:
+        abort(404)
+    return response
 
 @app.route('/api/status')
 def api_status():
@@ -693,23 +872,61 @@ def api_status():
     return jsonify({
         "clients": clients,
         "system": system_info,
+        "sockets": get_socket_stats(),
+        "resources": resource_collector.get_current(),
         "timestamp": datetime.now().isoformat()
     })
 
+def parse_log_line(line):
+    """Parse a monitor log line into a log entry (None if malformed)"""
+    parts = line.split(' - ', 1)
+    if len(parts) != 2:
+        return None
+    timestamp_str, message = parts
+    
+    # Determine log type based on message content
+    log_type = "info"
+    if "🟢" in message or "ONLINE" in message:
+        log_type = "success"
+    elif "🔴" in message or "OFFLINE" in message:
+        log_type = "error"
+    elif "⚠️" in message or "WARNING" in message or "WARN" in message:
+        log_type = "warning"
+    elif "🛑" in message or "ERROR" in message:
+        log_type = "error"
+    
+    return {
+        "timestamp": timestamp_str,
+        "message": message,
+        "type": log_type,
+        "raw": line
+    }
+
+def parse_time_arg(value):
+    """Parse an ISO timestamp query argument"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
 @app.route('/api/logs')
 def api_logs():
     """API endpoint for log data"""
-    lines = int(request.args.get('lines', 50))
+    lines = min(int(request.args.get('lines', 50)), MAX_LOG_LINES)
     filter_text = request.args.get('filter', '').lower()
     
     try:
-        if os.path.exists(LOG_FILE):
-            # Read log file
-            with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                all_lines = f.readlines()
-            
-            # Get last N lines
-            recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+        since = parse_time_arg(request.args.get('since'))
+        until = parse_time_arg(request.args.get('until'))
+    except ValueError:
+        return jsonify({"error": "Invalid since/until timestamp", "logs": []}), 400
+    
+    try:
+        if log_reader.exists():
+            if since or until:
+                # Last N lines of a time range, spanning rotated segments
+                recent_lines = deque(log_reader.read_range(since, until), maxlen=lines)
+            else:
+                recent_lines = log_reader.tail(lines)
             
             # Filter lines if filter text provided
             if filter_text:
@@ -718,34 +935,13 @@ def api_logs():
             # Parse and format logs
             formatted_logs = []
             for line in recent_lines:
-                line = line.strip()
-                if line:
-                    # Extract timestamp and message
-                    parts = line.split(' - ', 1)
-                    if len(parts) == 2:
-                        timestamp_str, message = parts
-                        
-                        # Determine log type based on message content
-                        log_type = "info"
-                        if "🟢" in message or "ONLINE" in message:
-                            log_type = "success"
-                        elif "🔴" in message or "OFFLINE" in message:
-                            log_type = "error"
-                        elif "⚠️" in message or "WARNING" in message or "WARN" in message:
-                            log_type = "warning"
-                        elif "🛑" in message or "ERROR" in message:
-                            log_type = "error"
-                        
-                        formatted_logs.append({
-                            "timestamp": timestamp_str,
-                            "message": message,
-                            "type": log_type,
-                            "raw": line
-                        })
+                entry = parse_log_line(line.strip())
+                if entry:
+                    formatted_logs.append(entry)
             
             return jsonify({
                 "logs": formatted_logs,
-                "total_lines": len(all_lines),
+                "total_lines": log_reader.count_lines(),
                 "filtered_lines": len(formatted_logs)
             })
         else:
@@ -754,6 +950,18 @@ def api_logs():
     except Exception as e:
         return jsonify({"error": f"Error reading logs: {str(e)}", "logs": []})
 
+@app.route('/api/logs/segments')
+def api_log_segments():
+    """API endpoint for rotated log segments"""
+    segments = []
+    for path, rotated in log_reader.segments():
+        segments.append({
+            "file": os.path.basename(path),
+            "rotated_at": rotated.isoformat(),
+            "size": os.path.getsize(path)
+        })
+    return jsonify({"segments": segments})
+
 @app.route('/api/logs/stream')
 def stream_logs():
     """Server-Sent Events endpoint for real-time logs"""
@@ -762,68 +970,135 @@ def stream_logs():
             yield "data: {\"error\": \"Log file not found\"}\n\n"
             return
         
-        # Start from end of file
-        with open(LOG_FILE, 'r', encoding='utf-8') as f:
-            # Go to end of file
-            f.seek(0, 2)
-            
-            while True:
-                line = f.readline()
-                if line:
-                    line = line.strip()
-                    if line:
-                        # Parse log line
-                        parts = line.split(' - ', 1)
-                        if len(parts) == 2:
-                            timestamp_str, message = parts
-                            
-                            log_type = "info"
-                            if "🟢" in message or "ONLINE" in message:
-                                log_type = "success"
-                            elif "🔴" in message or "OFFLINE" in message:
-                                log_type = "error"
-                            elif "⚠️" in message or "WARNING" in message:
-                                log_type = "warning"
-                            
-                            log_data = {
-                                "timestamp": timestamp_str,
-                                "message": message,
-                                "type": log_type,
-                                "raw": line
-                            }
-                            
-                            yield f"data: {json.dumps(log_data)}\n\n"
-                else:
-                    time.sleep(1)
+        # Start from end of file, following rotation
+        for line in LogFollower(LOG_FILE).follow():
+            log_data = parse_log_line(line.strip())
+            if log_data:
+                yield f"data: {json.dumps(log_data)}\n\n"
     
     return Response(generate(), mimetype='text/event-stream')
 
-@app.route('/api/restart/<client>')
-def restart_client(client):
-    """API endpoint to restart a client"""
+def resolve_journal_units(args):
+    """Units selected by the unit/client query arguments (None for all)"""
+    unit = args.get('unit', '').strip()
+    client = args.get('client', '').strip()
+    
+    if client:
+        if client == 'server':
+            return ['hysteria-server']
+        if client not in monitor.client_manager.clients:
+            raise ValueError("Invalid client")
+        return [monitor.client_manager.clients[client]["service"]]
+    if unit:
+        if unit not in get_managed_units():
+            raise ValueError("Unit is not managed")
+        return [unit]
+    return None
+
+@app.route('/api/journal')
+def api_journal():
+    """API endpoint for journald entries of managed units"""
+    try:
+        units = resolve_journal_units(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e), "logs": []}), 400
+    
+    lines = min(int(request.args.get('lines', 50)), MAX_LOG_LINES)
+    filter_text = request.args.get('filter', '').lower()
+    
+    journal_reader.refresh()
+    entries = [entry for _, entry in journal_reader.get_entries(units, lines=0)]
+    if filter_text:
+        entries = [entry for entry in entries if filter_text in entry["raw"].lower()]
+    entries = entries[-lines:]
+    
+    return jsonify({
+        "logs": entries,
+        "units": units or get_managed_units(),
+        "filtered_lines": len(entries)
+    })
+
+@app.route('/api/journal/stream')
+def stream_journal():
+    """Server-Sent Events endpoint for journald entries of managed units"""
+    try:
+        units = resolve_journal_units(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    def generate():
+        last = journal_reader.sequence
+        while True:
+            journal_reader.refresh()
+            journal_reader.wait(last, timeout=journal_reader.poll_interval)
+            # Entries of other units only advance the position
+            current = journal_reader.sequence
+            entries = journal_reader.get_entries(units, lines=0, after=last)
+            if not entries:
+                yield ": keep-alive\n\n"
+            for sequence, entry in entries:
+                yield f"data: {json.dumps(entry)}\n\n"
+                last = max(last, sequence)
+            last = max(last, current)
+    
+    return Response(generate(), mimetype='text/event-stream')
+
+def resolve_service_name(client):
+    """Systemd unit for a client id, 'server' or 'monitor' (None if invalid)"""
     clients = monitor.client_manager.clients
     
     if client == 'monitor':
-        service_name = 'hysteria-monitor'
+        return 'hysteria-monitor'
     elif client == 'server':
-        service_name = 'hysteria-server'
+        return 'hysteria-server'
     elif client in clients:
-        service_name = clients[client]["service"]
-    else:
+        return clients[client]["service"]
+    return None
+
+def submit_service_action(client, action):
+    """Queue a service action and build the API response"""
+    service_name = resolve_service_name(client)
+    if not service_name:
         return jsonify({"error": "Invalid client"}), 400
     
     try:
-        # Restart service
-        result = subprocess.run(['systemctl', 'restart', service_name], 
-                              capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            return jsonify({"success": f"{service_name} restarted successfully"})
-        else:
-            return jsonify({"error": f"Failed to restart {service_name}: {result.stderr}"}), 500
-    
+        operation = service_queue.submit(service_name, action)
+        return jsonify({
+            "success": f"{action.capitalize()} of {service_name} queued",
+            "operation": operation
+        }), 202
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": f"Error restarting service: {str(e)}"}), 500
+        return jsonify({"error": f"Error queueing {action}: {str(e)}"}), 500
+
+@app.route('/api/restart/<client>')
+def restart_client(client):
+    """API endpoint to restart a client"""
+    return submit_service_action(client, 'restart')
+
+@app.route('/api/service/<client>/<action>', methods=['POST'])
+def api_service_action(client, action):
+    """API endpoint to start, stop or restart a service"""
+    if action not in ACTIONS:
+        return jsonify({"error": "Invalid action"}), 400
+    return submit_service_action(client, action)
+
+@app.route('/api/operations/<int:operation_id>')
+def api_operation(operation_id):
+    """API endpoint for the state of a queued service operation"""
+    try:
+        wait = float(request.args.get('wait', 0))
+        if not wait >= 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "wait must be a number of seconds"}), 400
+    
+    wait = min(wait, 30)
+    operation = service_queue.wait(operation_id, wait) if wait else service_queue.get(operation_id)
+    if not operation:
+        return jsonify({"error": "Operation not found"}), 404
+    return jsonify(operation)
 
 # Client management endpoints
 @app.route('/api/clients', methods=['GET'])
@@ -871,8 +1146,14 @@ def api_add_client():
             except ValueError as e:
                 return jsonify({"error": str(e)}), 400
         
+        # QUIC tuning profile (RTT is measured when not given)
+        try:
+            tuning = monitor.client_manager.compute_client_tuning(server_ip, **parse_tuning_args(data))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         # Add client
-        result = monitor.client_manager.add_client(server_ip, server_port, password, custom_port)
+        result = monitor.client_manager.add_client(server_ip, server_port, password, custom_port, tuning)
         
         if result["success"]:
             return jsonify(result), 201
@@ -882,6 +1163,41 @@ def api_add_client():
     except Exception as e:
         return jsonify({"error": f"Error adding client: {str(e)}"}), 500
 
+@app.route('/api/clients/export', methods=['GET'])
+def api_export_clients():
+    """API endpoint to stream all clients as NDJSON"""
+    return Response(migrator.export_records(), mimetype='application/x-ndjson',
+                    headers={"Content-Disposition": "attachment; filename=clients.ndjson"})
+
+@app.route('/api/clients/import', methods=['POST'])
+def api_import_clients():
+    """API endpoint to provision clients from an NDJSON stream"""
+    try:
+        batch_size = int(request.args.get('batch_size', 100))
+        if not (1 <= batch_size <= IMPORT_MAX_BATCH_SIZE):
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": f"batch_size must be between 1-{IMPORT_MAX_BATCH_SIZE}"}), 400
+    
+    try:
+        progress = migrator.import_lines(request.stream, batch_size, request.args.get('import_id'))
+        first = next(progress)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Error importing clients: {str(e)}"}), 500
+    
+    def generate():
+        # One progress line per provisioned batch
+        yield json.dumps(first) + "\n"
+        try:
+            for item in progress:
+                yield json.dumps(item) + "\n"
+        except Exception as e:
+            yield json.dumps({"state": "failed", "error": str(e)}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/api/clients/<client_id>', methods=['DELETE'])
 def api_remove_client(client_id):
     """API endpoint to remove a client"""
@@ -931,8 +1247,16 @@ def api_setup_server():
         except:
             return jsonify({"error": "Invalid port"}), 400
         
+        # QUIC tuning profile, memory budget is shared by max_clients peers
+        try:
+            connections = int(data.get('max_clients') or SERVER_EXPECTED_CONNECTIONS)
+            tuning = monitor.server_manager.tuner.compute_profile(connections=connections,
+                                                                  **parse_tuning_args(data))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         # Set up server
-        result = monitor.server_manager.setup_server(port, password, domain or None)
+        result = monitor.server_manager.setup_server(port, password, domain or None, tuning)
         
         if result["success"]:
             return jsonify(result), 201
@@ -956,6 +1280,298 @@ def api_install_hysteria():
     except Exception as e:
         return jsonify({"error": f"Error installing Hysteria2: {str(e)}"}), 500
 
+# Availability endpoints
+def parse_window_args():
+    """Parse since/until query arguments (ISO timestamps) into epoch seconds"""
+    until = parse_time_arg(request.args.get('until'))
+    since = parse_time_arg(request.args.get('since'))
+    until = until.timestamp() if until else time.time()
+    since = since.timestamp() if since else until - AVAILABILITY_WINDOW
+    if since >= until:
+        raise ValueError("since must be before until")
+    return since, until
+
+@app.route('/api/availability', methods=['GET'])
+def api_availability():
+    """API endpoint for availability summaries of all clients"""
+    try:
+        since, until = parse_window_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        client_ids = set(monitor.client_manager.clients) | set(monitor.availability.get_clients())
+        summaries = {}
+        for client_id in sorted(client_ids):
+            summary = monitor.availability.get_availability(client_id, since, until)
+            summary["outages"] = len(summary["outages"])
+            summaries[client_id] = summary
+        
+        return jsonify({"since": since, "until": until, "clients": summaries})
+    except Exception as e:
+        return jsonify({"error": f"Error reading availability: {str(e)}"}), 500
+
+@app.route('/api/availability/<client_id>', methods=['GET'])
+def api_client_availability(client_id):
+    """API endpoint for availability, outages and transitions of a client"""
+    try:
+        since, until = parse_window_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        return jsonify(monitor.availability.get_availability(client_id, since, until,
+                                                             include_transitions=True))
+    except Exception as e:
+        return jsonify({"error": f"Error reading availability: {str(e)}"}), 500
+
+# Agent endpoints
+def bearer_token_matches(expected):
+    """Check the request's bearer token against a configured token"""
+    header = request.headers.get('Authorization', '')
+    if not expected or not header.startswith('Bearer '):
+        return False
+    return hmac.compare_digest(header[len('Bearer '):].encode(), expected.encode())
+
+def require_agent_token(view):
+    """Allow a view only with the agent bearer token"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not AGENT_TOKEN:
+            return jsonify({"error": "Agent mode is disabled"}), 404
+        
+        if not bearer_token_matches(AGENT_TOKEN):
+            return jsonify({"error": "Unauthorized"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+def public_clients(clients):
+    """Clients without their passwords"""
+    return {client_id: {k: v for k, v in client.items() if k != "password"}
+            for client_id, client in clients.items()}
+
+@app.route('/api/agent/status')
+@require_agent_token
+def api_agent_status():
+    """Agent endpoint for node status"""
+    server_status = monitor.server_manager.get_server_status()
+    server_status.pop("config", None)
+    
+    return jsonify({
+        "node": socket.gethostname(),
+        "clients": public_clients(monitor.get_clients_status()),
+        "server": server_status,
+        "system": monitor.get_system_info(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/api/agent/clients')
+@require_agent_token
+def api_agent_clients():
+    """Agent endpoint for configured clients"""
+    return jsonify(public_clients(monitor.client_manager.clients))
+
+@app.route('/api/agent/logs')
+@require_agent_token
+def api_agent_logs():
+    """Agent endpoint for monitor logs"""
+    return api_logs()
+
+# Fleet endpoints
+@app.route('/api/fleet', methods=['GET'])
+def api_fleet():
+    """API endpoint for the cached state of all fleet nodes"""
+    if request.args.get('refresh'):
+        fleet.refresh()
+    return jsonify({"nodes": fleet.get_fleet(), "timestamp": datetime.now().isoformat()})
+
+@app.route('/api/fleet/nodes', methods=['POST'])
+def api_add_fleet_node():
+    """API endpoint to add an agent node"""
+    try:
+        data = request.get_json()
+        name = data.get('name', '').strip()
+        url = data.get('url', '').strip()
+        token = data.get('token', '').strip()
+        
+        if not name or not token:
+            return jsonify({"error": "Node name and token are required"}), 400
+        if not url.startswith(('http://', 'https://')):
+            return jsonify({"error": "Node URL must start with http:// or https://"}), 400
+        
+        return jsonify(fleet.add_node(name, url, token)), 201
+    except Exception as e:
+        return jsonify({"error": f"Error adding node: {str(e)}"}), 500
+
+@app.route('/api/fleet/nodes/<name>', methods=['DELETE'])
+def api_remove_fleet_node(name):
+    """API endpoint to remove an agent node"""
+    result = fleet.remove_node(name)
+    return jsonify(result) if result["success"] else (jsonify(result), 404)
+
+@app.route('/api/sockets')
+def api_sockets():
+    """API endpoint for per-client connection and socket queue statistics"""
+    try:
+        return jsonify(dict(get_socket_stats(), timestamp=datetime.now().isoformat()))
+    except Exception as e:
+        return jsonify({"error": f"Error reading socket statistics: {str(e)}"}), 500
+
+# Unit resource endpoints
+@app.route('/api/resources')
+def api_resources():
+    """API endpoint for current CPU, memory and I/O of all managed units"""
+    try:
+        return jsonify({"units": resource_collector.get_current(),
+                        "interval": RESOURCE_SAMPLE_INTERVAL,
+                        "timestamp": datetime.now().isoformat()})
+    except Exception as e:
+        return jsonify({"error": f"Error reading unit resources: {str(e)}"}), 500
+
+@app.route('/api/resources/<name>')
+def api_unit_resources(name):
+    """API endpoint for the resource time series of a client, the server or a unit"""
+    unit = resolve_service_name(name)
+    if unit is None:
+        return jsonify({"error": "Unknown service"}), 404
+    
+    try:
+        since = parse_time_arg(request.args.get('since'))
+    except ValueError:
+        return jsonify({"error": "Invalid since timestamp"}), 400
+    
+    points = resource_collector.get_history(unit, since.timestamp() if since else None)
+    return jsonify({"unit": unit, "interval": RESOURCE_SAMPLE_INTERVAL, "points": points})
+
+# Request profiling
+@app.before_request
+def start_request_profile():
+    """Time every request and profile sampled or forced ones"""
+    if request.endpoint and request.endpoint.startswith('api_admin_profil'):
+        return
+    # Forcing a profile is an admin action
+    force = request.headers.get('X-Profile') == '1' and bearer_token_matches(ADMIN_TOKEN)
+    g.profile_state = profiler.start(request.endpoint, force)
+
+def finish_request_profile(status):
+    state = g.pop('profile_state', None)
+    if state is None:
+        return None
+    return profiler.finish(state, request.method, request.full_path.rstrip('?'),
+                           request.endpoint, status)
+
+@app.after_request
+def record_request_profile(response):
+    """Stop timing before the body is streamed, so streams do not hold the profiler"""
+    record = finish_request_profile(response.status_code)
+    if record and record["profiled"]:
+        response.headers['X-Profile-Id'] = str(record["id"])
+    return response
+
+@app.teardown_request
+def abort_request_profile(error):
+    """Release the profiler for requests that failed before after_request"""
+    if error is not None:
+        finish_request_profile(500)
+
+def require_admin_token(view):
+    """Allow a view only with the admin bearer token"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "Admin API is disabled"}), 404
+        
+        if not bearer_token_matches(ADMIN_TOKEN):
+            return jsonify({"error": "Unauthorized"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/api/admin/profiling', methods=['GET', 'POST'])
+@require_admin_token
+def api_admin_profiling():
+    """API endpoint for profiling settings and recent profiled/slow requests"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        unknown = set(data.get('routes') or {}) - set(app.view_functions)
+        if unknown:
+            return jsonify({"error": f"Unknown endpoints: {', '.join(sorted(unknown))}"}), 400
+        try:
+            profiler.configure(data.get('enabled'), data.get('sample_rate'),
+                               data.get('routes'), data.get('slow_threshold_ms'))
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+    
+    return jsonify(dict(profiler.list_records(), config=profiler.get_config(),
+                        endpoints=sorted(rule.endpoint for rule in app.url_map.iter_rules())))
+
+@app.route('/api/admin/profiling/<int:record_id>', methods=['GET'])
+@require_admin_token
+def api_admin_profile(record_id):
+    """API endpoint to inspect or download a captured request profile"""
+    record = profiler.get_record(record_id)
+    if record is None:
+        return jsonify({"error": "Profile not found"}), 404
+    
+    output = request.args.get('format', 'json')
+    if output == 'json':
+        return jsonify({key: value for key, value in record.items() if key != "pstats"})
+    if not record["profiled"]:
+        return jsonify({"error": "Request was not profiled"}), 404
+    if output == 'text':
+        try:
+            report = profiler.render_text(record, request.args.get('sort', 'cumulative'))
+        except KeyError:
+            return jsonify({"error": "Unknown sort key"}), 400
+        return Response(report, mimetype='text/plain')
+    if output == 'pstats':
+        # Loadable with: python -m pstats profile-<id>.pstats
+        return Response(record["pstats"], mimetype='application/octet-stream',
+                        headers={"Content-Disposition":
+                                 f"attachment; filename=profile-{record_id}.pstats"})
+    return jsonify({"error": "format must be json, text or pstats"}), 400
+
+# Host network tuning endpoints
+def get_required_conn_window():
+    """Largest QUIC connection window of the rendered configs"""
+    tunings = [monitor.server_manager.server_config.get("tuning")]
+    tunings += [client.get("tuning") for client in monitor.client_manager.clients.values()]
+    windows = [t["max_conn_window"] for t in tunings if t and "max_conn_window" in t]
+    if not windows:
+        # Configs rendered before tuning profiles used 128 MB windows
+        return 134217728
+    return max(windows)
+
+@app.route('/api/host/tuning', methods=['GET'])
+def api_host_tuning():
+    """API endpoint for host network settings compared with config needs"""
+    try:
+        return jsonify(network_advisor.analyze(get_required_conn_window()))
+    except Exception as e:
+        return jsonify({"error": f"Error checking host settings: {str(e)}"}), 500
+
+@app.route('/api/host/tuning/apply', methods=['POST'])
+def api_apply_host_tuning():
+    """API endpoint to persist recommended sysctl values"""
+    data = request.get_json(silent=True) or {}
+    result = network_advisor.apply(get_required_conn_window(), load=data.get('load', True))
+    return jsonify(result) if result["success"] else (jsonify(result), 500)
+
+# QUIC tuning endpoints
+@app.route('/api/tuning/profiles', methods=['GET'])
+def api_tuning_profiles():
+    """API endpoint to list tuning presets and preview computed values"""
+    try:
+        args = parse_tuning_args(request.args)
+        connections = int(request.args.get('connections', 1))
+        tuner = monitor.server_manager.tuner
+        
+        return jsonify({
+            "profiles": tuner.list_profiles(),
+            "preview": tuner.compute_profile(connections=connections, **args)
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 if __name__ == '__main__':
     print("🚀 Starting Hysteria2 Complete Management Web Service...")
     print(f"📊 Dashboard will be available at: http://localhost:{PORT}")
@@ -965,4 +1581,23 @@ if __name__ == '__main__':
     # Ensure hysteria directory exists
     os.makedirs(HYSTERIA_DIR, exist_ok=True)
     
+    # Sample client availability even when no dashboard is open
+    monitor.availability.mark_started()
+    Thread(target=monitor.run, daemon=True).start()
+    atexit.register(monitor.availability.mark_stopped)
+    # systemd stops the service with SIGTERM, exit cleanly so the marker is written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    # Rotate the monitor log in the background
+    Thread(target=log_rotator.run, daemon=True).start()
+    
+    # Ingest journald entries of the managed units incrementally
+    Thread(target=journal_reader.run, daemon=True).start()
+    
+    # Poll fleet agents into the cache
+    Thread(target=fleet.run, daemon=True).start()
+    
+    # Sample cgroup CPU, memory and I/O of the managed units
+    Thread(target=resource_collector.run, daemon=True).start()
+    
     app.run(host=HOST, port=PORT, debug=False, threaded=True)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Per-client availability history
+تاریخچه دسترس‌پذیری کلاینت‌ها
+
+Only state changes are stored (timestamp, client, old -> new state, reason)
+in SQLite. Uptime, MTBF/MTTR and outage lists for any window are computed
+from the transitions alone. While the monitor is not running clients are in
+the "unmonitored" state, which counts as neither uptime nor downtime; the
+sampler's heartbeat bounds how far the last known state is trusted.
+"""
+
+import os
+import sqlite3
+import time
+from threading import Lock
+
+ONLINE = "online"
+UNMONITORED = "unmonitored"
+
+
+class AvailabilityRecorder:
+    def __init__(self, db_file, heartbeat_timeout=None):
+        self.db_file = db_file
+        self.heartbeat_timeout = heartbeat_timeout
+        self.lock = Lock()
+        self.states = {}
+        self.heartbeat = None
+        self.init_db()
+
+    def connect(self):
+        return sqlite3.connect(self.db_file, timeout=10)
+
+    def init_db(self):
+        """Create the transition table and load the last known states"""
+        try:
+            os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+            with self.connect() as conn:
+                conn.execute("""CREATE TABLE IF NOT EXISTS transitions (
+                    ts REAL NOT NULL,
+                    client TEXT NOT NULL,
+                    old_state TEXT,
+                    new_state TEXT NOT NULL,
+                    reason TEXT
+                )""")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_transitions_client_ts "
+                             "ON transitions (client, ts)")
+                conn.execute("""CREATE TABLE IF NOT EXISTS heartbeat (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    ts REAL NOT NULL
+                )""")
+                row = conn.execute("SELECT ts FROM heartbeat WHERE id = 1").fetchone()
+                self.heartbeat = row[0] if row else None
+                rows = conn.execute("""SELECT client, new_state FROM transitions t
+                    WHERE ts = (SELECT MAX(ts) FROM transitions WHERE client = t.client)""")
+                self.states = dict(rows.fetchall())
+        except Exception as e:
+            print(f"Error opening availability database: {e}")
+
+    def observe(self, client_id, state, reason="", ts=None):
+        """Record a state sample, storing it only if the state changed"""
+        with self.lock:
+            old_state = self.states.get(client_id)
+            if old_state == state:
+                return False
+            try:
+                with self.connect() as conn:
+                    conn.execute("INSERT INTO transitions VALUES (?, ?, ?, ?, ?)",
+                                 (time.time() if ts is None else ts, client_id,
+                                  old_state, state, reason))
+                self.states[client_id] = state
+                return True
+            except Exception as e:
+                print(f"Error recording availability: {e}")
+                return False
+
+    def beat(self, ts=None):
+        """Record that the sampler observed all clients up to now"""
+        ts = time.time() if ts is None else ts
+        try:
+            with self.connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO heartbeat (id, ts) VALUES (1, ?)", (ts,))
+            self.heartbeat = ts
+        except Exception as e:
+            print(f"Error recording availability heartbeat: {e}")
+
+    def mark_unmonitored(self, reason, ts=None):
+        """Put every known client into the unmonitored state"""
+        for client_id in list(self.states):
+            self.observe(client_id, UNMONITORED, reason, ts)
+
+    def mark_started(self):
+        """Close the gap since the monitor last ran
+
+        States are only known up to the last heartbeat, also after a crash
+        that left no stop marker.
+        """
+        self.mark_unmonitored("monitor was not running", self.heartbeat)
+
+    def mark_stopped(self):
+        self.mark_unmonitored("monitor stopped")
+
+    def get_transitions(self, client_id, since, until):
+        """Transitions in [since, until] plus the last one before since"""
+        with self.connect() as conn:
+            before = conn.execute("""SELECT ts, old_state, new_state, reason FROM transitions
+                WHERE client = ? AND ts < ? ORDER BY ts DESC LIMIT 1""",
+                                  (client_id, since)).fetchone()
+            rows = conn.execute("""SELECT ts, old_state, new_state, reason FROM transitions
+                WHERE client = ? AND ts >= ? AND ts <= ? ORDER BY ts""",
+                                (client_id, since, until)).fetchall()
+        return before, rows
+
+    def get_clients(self):
+        """Clients with recorded history"""
+        with self.connect() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT client FROM transitions")]
+
+    def get_availability(self, client_id, since, until=None, include_transitions=False):
+        """Uptime, MTBF/MTTR and outages of a client over a window (epoch seconds)"""
+        until = until or time.time()
+        before, rows = self.get_transitions(client_id, since, until)
+
+        # The last state is only trusted up to the sampler's last heartbeat
+        observed_until = until
+        if self.heartbeat_timeout and self.heartbeat is not None \
+                and until > self.heartbeat + self.heartbeat_timeout:
+            observed_until = max(self.heartbeat, since)
+
+        # Walk the state intervals; time before the first sample is not counted
+        if before:
+            state, reason, start = before[2], before[3], since
+        else:
+            state, reason, start = None, "", since
+
+        intervals = []
+        for ts, _, new_state, new_reason in rows:
+            if state is not None and ts > start:
+                intervals.append((start, ts, state, reason))
+            state, reason, start = new_state, new_reason, ts
+        if state is not None and observed_until > start:
+            intervals.append((start, observed_until, state, reason))
+        intervals = [interval for interval in intervals if interval[2] != UNMONITORED]
+
+        uptime = sum(end - begin for begin, end, s, _ in intervals if s == ONLINE)
+        observed = sum(end - begin for begin, end, _, _ in intervals)
+
+        # Adjacent non-online intervals form one outage
+        outages = []
+        for begin, end, s, r in intervals:
+            if s == ONLINE:
+                continue
+            # Unmonitored gaps split outages
+            if outages and outages[-1]["end"] == begin:
+                outages[-1]["end"] = end
+                outages[-1]["duration"] = end - outages[-1]["start"]
+            else:
+                outages.append({"start": begin, "end": end, "duration": end - begin, "reason": r})
+        ongoing = bool(outages) and intervals[-1][2] != ONLINE and intervals[-1][1] == until
+        for outage in outages:
+            outage["ongoing"] = False
+        if ongoing:
+            outages[-1]["ongoing"] = True
+
+        downtime = observed - uptime
+        recovered = len(outages) - (1 if ongoing else 0)
+        result = {
+            "client": client_id,
+            "since": since,
+            "until": until,
+            "state": self.states.get(client_id),
+            "observed_seconds": observed,
+            "unobserved_seconds": (until - since) - observed,
+            "uptime_seconds": uptime,
+            "downtime_seconds": downtime,
+            "uptime_percent": round(uptime / observed * 100, 3) if observed else None,
+            "failures": len(outages),
+            "mtbf_seconds": uptime / len(outages) if outages else None,
+            "mttr_seconds": (downtime - (outages[-1]["duration"] if ongoing else 0)) / recovered
+                            if recovered else None,
+            "outages": outages
+        }
+        if include_transitions:
+            result["transitions"] = [
+                {"ts": ts, "old_state": old, "new_state": new, "reason": r}
+                for ts, old, new, r in rows
+            ]
+        return result
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Per-unit resource accounting from cgroup v2
+مصرف منابع هر سرویس از cgroup v2
+
+Reads cpu.stat, memory.current, memory.peak and io.stat of every managed
+systemd unit under system.slice. CPU percentage and I/O rates are computed
+from the counter deltas between two samples and kept as a bounded time
+series per unit. Only files are read, no processes are spawned.
+"""
+
+import os
+import time
+from collections import deque
+from threading import Lock
+
+
+def read_flat_keyed(path):
+    """Parse a "key value" per line cgroup file (empty if missing)"""
+    values = {}
+    try:
+        with open(path, 'r', encoding='ascii') as f:
+            for line in f:
+                key, _, value = line.partition(' ')
+                if value:
+                    values[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    return values
+
+
+def read_single_value(path):
+    """Parse a single value cgroup file (None if missing or "max")"""
+    try:
+        with open(path, 'r', encoding='ascii') as f:
+            value = f.read().strip()
+        return int(value) if value.isdigit() else None
+    except OSError:
+        return None
+
+
+def read_io_stat(path):
+    """Sum io.stat counters over all devices"""
+    totals = {"rbytes": 0, "wbytes": 0, "rios": 0, "wios": 0}
+    try:
+        with open(path, 'r', encoding='ascii') as f:
+            for line in f:
+                for field in line.split()[1:]:
+                    key, _, value = field.partition('=')
+                    if key in totals:
+                        totals[key] += int(value)
+    except (OSError, ValueError):
+        pass
+    return totals
+
+
+class UnitResourceCollector:
+    def __init__(self, units_provider, cgroup_root="/sys/fs/cgroup", interval=10, history_size=360):
+        self.units_provider = units_provider
+        self.cgroup_root = cgroup_root
+        self.interval = interval
+        self.lock = Lock()
+        self.counters = {}
+        self.current = {}
+        self.history = {}
+        self.history_size = history_size
+        self.last_sample = 0
+
+    def unit_dir(self, unit):
+        return os.path.join(self.cgroup_root, "system.slice", f"{unit}.service")
+
+    def read_unit(self, unit):
+        """Raw counters of a unit (None if its cgroup does not exist)"""
+        path = self.unit_dir(unit)
+        if not os.path.isdir(path):
+            return None
+        cpu = read_flat_keyed(os.path.join(path, "cpu.stat"))
+        io = read_io_stat(os.path.join(path, "io.stat"))
+        return {
+            "time": time.monotonic(),
+            "usage_usec": cpu.get("usage_usec", 0),
+            "user_usec": cpu.get("user_usec", 0),
+            "system_usec": cpu.get("system_usec", 0),
+            "throttled_usec": cpu.get("throttled_usec", 0),
+            "memory_current": read_single_value(os.path.join(path, "memory.current")),
+            "memory_peak": read_single_value(os.path.join(path, "memory.peak")),
+            **io
+        }
+
+    def compute_point(self, previous, counters):
+        """Rates between two raw samples of a unit"""
+        point = {
+            "timestamp": time.time(),
+            "cpu_percent": None,
+            "memory_current": counters["memory_current"],
+            "memory_peak": counters["memory_peak"],
+            "read_bps": None,
+            "write_bps": None,
+            "iops": None,
+            "throttled_usec": counters["throttled_usec"]
+        }
+        elapsed = counters["time"] - previous["time"] if previous else 0
+        # Counters restart from zero when a unit restarts
+        if elapsed > 0 and counters["usage_usec"] >= previous["usage_usec"]:
+            point["cpu_percent"] = round(
+                (counters["usage_usec"] - previous["usage_usec"]) / (elapsed * 1e6) * 100, 2)
+            point["read_bps"] = round(max(counters["rbytes"] - previous["rbytes"], 0) / elapsed)
+            point["write_bps"] = round(max(counters["wbytes"] - previous["wbytes"], 0) / elapsed)
+            ios = (counters["rios"] + counters["wios"]) - (previous["rios"] + previous["wios"])
+            point["iops"] = round(max(ios, 0) / elapsed, 1)
+        return point
+
+    def sample(self):
+        """Sample all managed units and append a point to their history"""
+        units = self.units_provider()
+        with self.lock:
+            current = {}
+            for unit in units:
+                counters = self.read_unit(unit)
+                if counters is None:
+                    self.counters.pop(unit, None)
+                    continue
+                point = self.compute_point(self.counters.get(unit), counters)
+                self.counters[unit] = counters
+                current[unit] = point
+                if point["cpu_percent"] is not None:
+                    history = self.history.setdefault(unit, deque(maxlen=self.history_size))
+                    history.append(point)
+
+            # Forget units that are no longer managed
+            for unit in set(self.history) - set(units):
+                del self.history[unit]
+            for unit in set(self.counters) - set(units):
+                del self.counters[unit]
+            self.current = current
+            self.last_sample = time.monotonic()
+            return current
+
+    def run(self):
+        """Sampling loop for a background thread"""
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Error sampling unit resources: {e}")
+            time.sleep(self.interval)
+
+    def get_current(self):
+        """Latest point per unit, sampling first if the last one is stale"""
+        if time.monotonic() - self.last_sample >= self.interval:
+            return self.sample()
+        with self.lock:
+            return dict(self.current)
+
+    def get_history(self, unit, since=None):
+        """Time series of a unit, optionally from an epoch timestamp on"""
+        with self.lock:
+            points = list(self.history.get(unit, ()))
+        if since is not None:
+            points = [point for point in points if point["timestamp"] >= since]
+        return points
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Multi-node fleet aggregation
+تجمیع وضعیت چند سرور
+
+Every manager can run as an agent (token-protected /api/agent/* endpoints).
+The aggregator polls all agents concurrently through one pooled keep-alive
+session with per-node timeouts and serves the cached last-known state, so
+the dashboard does not wait on slow or unreachable nodes.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class FleetAggregator:
+    def __init__(self, config_file, timeout=5, refresh_interval=15, max_workers=16):
+        self.config_file = config_file
+        self.timeout = timeout
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+        self.lock = Lock()
+        self.refresh_lock = Lock()
+        self.state = {}
+        self.nodes = []
+        self.load_config()
+
+        # One keep-alive pool shared by all nodes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def load_config(self):
+        """Load fleet nodes"""
+        try:
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    self.nodes = json.load(f).get("nodes", [])
+        except Exception as e:
+            print(f"Error loading fleet config: {e}")
+            self.nodes = []
+
+    def save_config(self):
+        """Save fleet nodes"""
+        try:
+            with open(self.config_file, 'w', encoding='utf-8') as f:
+                json.dump({"nodes": self.nodes}, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving fleet config: {e}")
+
+    def add_node(self, name, url, token):
+        """Add or replace an agent node"""
+        with self.lock:
+            self.nodes = [node for node in self.nodes if node["name"] != name]
+            self.nodes.append({"name": name, "url": url.rstrip('/'), "token": token})
+            self.save_config()
+        return {"success": True, "message": f"Node {name} added"}
+
+    def remove_node(self, name):
+        """Remove an agent node and its cached state"""
+        with self.lock:
+            if not any(node["name"] == name for node in self.nodes):
+                return {"success": False, "error": "Node not found"}
+            self.nodes = [node for node in self.nodes if node["name"] != name]
+            self.state.pop(name, None)
+            self.save_config()
+        return {"success": True, "message": f"Node {name} removed"}
+
+    def fetch_node(self, node):
+        """Fetch the status of one agent"""
+        started = time.time()
+        try:
+            response = self.session.get(f"{node['url']}/api/agent/status",
+                                        headers={"Authorization": f"Bearer {node['token']}"},
+                                        timeout=self.timeout)
+            response.raise_for_status()
+            return {
+                "online": True,
+                "status": response.json(),
+                "error": None,
+                "latency_ms": round((time.time() - started) * 1000, 1),
+                "fetched_at": time.time()
+            }
+        except Exception as e:
+            return {"online": False, "error": str(e),
+                    "latency_ms": round((time.time() - started) * 1000, 1)}
+
+    def refresh(self):
+        """Poll all nodes concurrently and update the cache"""
+        with self.refresh_lock:
+            with self.lock:
+                nodes = list(self.nodes)
+
+            futures = {node["name"]: self.executor.submit(self.fetch_node, node) for node in nodes}
+            for name, future in futures.items():
+                result = future.result()
+                with self.lock:
+                    previous = self.state.get(name, {})
+                    if not result["online"]:
+                        # Keep the last known status of unreachable nodes
+                        result["status"] = previous.get("status")
+                        result["fetched_at"] = previous.get("fetched_at")
+                    result["checked_at"] = time.time()
+                    self.state[name] = result
+            return len(futures)
+
+    def run(self):
+        """Refresh loop for a background thread"""
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing fleet: {e}")
+            time.sleep(self.refresh_interval)
+
+    def get_fleet(self):
+        """Cached state of all nodes (tokens are never returned)"""
+        now = time.time()
+        with self.lock:
+            fleet = {}
+            for node in self.nodes:
+                state = dict(self.state.get(node["name"], {"online": None, "status": None}))
+                fetched_at = state.get("fetched_at")
+                state["url"] = node["url"]
+                state["stale"] = not fetched_at or now - fetched_at > 2 * self.refresh_interval
+                fleet[node["name"]] = state
+            return fleet
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Incremental journald reader for the Hysteria units
+خواندن تدریجی لاگ‌های journald سرویس‌های هیستریا
+
+Entries are read with `journalctl -o json --after-cursor`, so each entry is
+parsed once. Recent entries are kept per unit in bounded buffers for the log
+views and streams; parsed entries are appended to an entries file and the
+cursor of the last one is persisted after them, so a restart restores the
+buffers and resumes after the cursor. Only the very first start (no cursor)
+backfills the buffers with the most recent entries of each unit, and only
+from the background thread.
+"""
+
+import json
+import os
+import subprocess
+import time
+from collections import deque
+from datetime import datetime
+from threading import Condition, Lock
+
+# journald PRIORITY -> dashboard log type
+PRIORITY_TYPES = {
+    0: "error", 1: "error", 2: "error", 3: "error",
+    4: "warning",
+    5: "info", 6: "info", 7: "info"
+}
+
+
+def unit_name(unit):
+    """Strip the .service suffix"""
+    return unit[:-len(".service")] if unit and unit.endswith(".service") else unit
+
+
+class JournalReader:
+    def __init__(self, units_provider, cursor_file, journalctl="journalctl",
+                 buffer_size=1000, poll_interval=2, entries_file=None):
+        self.units_provider = units_provider
+        self.cursor_file = cursor_file
+        self.entries_file = entries_file
+        self.journalctl = journalctl
+        self.buffer_size = buffer_size
+        self.poll_interval = poll_interval
+        self.buffers = {}
+        self.sequence = 0
+        self.last_poll = 0
+        self.poll_lock = Lock()
+        self.changed = Condition()
+        self.persisted = 0  # lines in the entries file
+        self.cursor = self.load_cursor()
+        if self.cursor:
+            self.load_entries()
+        # With a cursor there is a point to resume from, otherwise backfill
+        self.backfilled = self.cursor is not None
+
+    def load_cursor(self):
+        """Load the last processed cursor"""
+        try:
+            if os.path.exists(self.cursor_file):
+                with open(self.cursor_file, 'r', encoding='utf-8') as f:
+                    return f.read().strip() or None
+        except Exception as e:
+            print(f"Error loading journal cursor: {e}")
+        return None
+
+    def save_cursor(self):
+        """Persist the cursor atomically"""
+        try:
+            tmp_file = self.cursor_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(self.cursor or "")
+            os.replace(tmp_file, self.cursor_file)
+        except Exception as e:
+            print(f"Error saving journal cursor: {e}")
+
+    def load_entries(self):
+        """Restore the buffers from the entries file"""
+        if not self.entries_file or not os.path.exists(self.entries_file):
+            return
+        entries = []
+        try:
+            with open(self.entries_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # Partial last line after a crash
+                        continue
+        except Exception as e:
+            print(f"Error loading journal entries: {e}")
+        self.persisted = len(entries)
+
+        # Entries saved after the cursor are read from the journal again
+        cursors = [entry.get("cursor") for entry in entries]
+        if self.cursor in cursors:
+            entries = entries[:len(cursors) - cursors[::-1].index(self.cursor)]
+        for entry in entries:
+            self.add_entry(entry)
+
+    def save_entries(self, entries, rewrite=False):
+        """Append parsed entries, rewrite the file once it holds twice the buffers"""
+        if not self.entries_file:
+            return
+        try:
+            with self.changed:
+                buffered = sum(len(buffer) for buffer in self.buffers.values())
+                if rewrite or self.persisted + len(entries) > 2 * max(buffered, self.buffer_size):
+                    items = [item for buffer in self.buffers.values() for item in buffer]
+                    entries = [entry for _, entry in sorted(items, key=lambda item: item[0])]
+                    rewrite = True
+            if rewrite:
+                tmp_file = self.entries_file + ".tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps(entry) + "\n" for entry in entries)
+                os.replace(tmp_file, self.entries_file)
+                self.persisted = len(entries)
+            else:
+                with open(self.entries_file, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(entry) + "\n" for entry in entries)
+                self.persisted += len(entries)
+        except Exception as e:
+            print(f"Error saving journal entries: {e}")
+
+    def build_command(self, units, backfill=False):
+        command = [self.journalctl, '-o', 'json', '--no-pager']
+        if backfill or not self.cursor:
+            # Only backfill what fits in the buffers
+            command.append(f'--lines={self.buffer_size}')
+        else:
+            command.append(f'--after-cursor={self.cursor}')
+        for unit in units:
+            command += ['-u', unit]
+        return command
+
+    def read_records(self, command):
+        """Run journalctl, return (records, success)"""
+        records = []
+        process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, text=True)
+        try:
+            for line in process.stdout:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        finally:
+            process.stdout.close()
+            process.wait()
+        return records, process.returncode == 0
+
+    def read_backfill(self, units):
+        """Most recent entries of every unit, merged in time order
+
+        Each unit is read separately, so a busy unit cannot push the history
+        of the others out of a shared --lines window.
+        """
+        records = {}
+        for unit in units:
+            unit_records, success = self.read_records(self.build_command([unit], backfill=True))
+            if not success:
+                return [], False
+            for record in unit_records:
+                records[record.get("__CURSOR") or id(record)] = record
+
+        def realtime(record):
+            try:
+                return int(record.get("__REALTIME_TIMESTAMP", 0))
+            except ValueError:
+                return 0
+        return sorted(records.values(), key=realtime), True
+
+    def resolve_unit(self, record, managed):
+        """Unit an entry belongs to
+
+        systemd's own messages about a unit ("Started", "Main process exited")
+        come from init.scope and name the unit in UNIT/OBJECT_SYSTEMD_UNIT.
+        """
+        for field in ("UNIT", "OBJECT_SYSTEMD_UNIT"):
+            unit = unit_name(record.get(field))
+            if unit and unit in managed:
+                return unit
+        return unit_name(record.get("_SYSTEMD_UNIT") or record.get("UNIT") or "")
+
+    def parse_entry(self, record, managed=()):
+        """Convert a journal JSON record into a log entry"""
+        message = record.get("MESSAGE")
+        if isinstance(message, list):
+            # Non-UTF-8 messages are exported as byte arrays
+            message = bytes(message).decode('utf-8', errors='replace')
+        message = message or ""
+
+        try:
+            timestamp = datetime.fromtimestamp(int(record["__REALTIME_TIMESTAMP"]) / 1000000)
+        except (KeyError, ValueError):
+            timestamp = datetime.now()
+
+        try:
+            log_type = PRIORITY_TYPES.get(int(record.get("PRIORITY", 6)), "info")
+        except ValueError:
+            log_type = "info"
+
+        unit = self.resolve_unit(record, managed)
+        stamp = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        return {
+            "timestamp": stamp,
+            "message": message,
+            "type": log_type,
+            "raw": f"{stamp} - {unit}: {message}",
+            "unit": unit,
+            "cursor": record.get("__CURSOR")
+        }
+
+    def add_entry(self, entry):
+        """Append an entry to its unit's buffer"""
+        with self.changed:
+            self.sequence += 1
+            buffer = self.buffers.setdefault(entry["unit"], deque(maxlen=self.buffer_size))
+            buffer.append((self.sequence, entry))
+
+    def poll(self):
+        """Read entries after the cursor, return how many were added"""
+        units = self.units_provider()
+        if not units:
+            return 0
+
+        backfill = not self.backfilled
+        if backfill:
+            records, success = self.read_backfill(units)
+        else:
+            records, success = self.read_records(self.build_command(units))
+
+        managed = set(units)
+        entries = [self.parse_entry(record, managed) for record in records]
+        for entry in entries:
+            self.add_entry(entry)
+            if entry["cursor"]:
+                self.cursor = entry["cursor"]
+
+        if entries or (backfill and success):
+            # Entries first: a crash in between re-reads them instead of losing them
+            self.save_entries(entries, rewrite=backfill)
+            self.save_cursor()
+        self.backfilled = self.backfilled or success
+        if entries:
+            with self.changed:
+                self.changed.notify_all()
+        return len(entries)
+
+    def refresh(self, background=False):
+        """Poll unless another caller did so within the poll interval
+
+        The backfill runs one journalctl per unit, so it is left to the
+        background thread; until it is done other callers return right away.
+        """
+        if not self.backfilled and not background:
+            return 0
+        with self.poll_lock:
+            if time.time() - self.last_poll < self.poll_interval:
+                return 0
+            self.last_poll = time.time()
+            try:
+                return self.poll()
+            except Exception as e:
+                print(f"Error reading journal: {e}")
+                return 0
+
+    def run(self):
+        """Polling loop for a background thread"""
+        while True:
+            self.refresh(background=True)
+            time.sleep(self.poll_interval)
+
+    def get_entries(self, units=None, lines=50, after=0):
+        """Recent entries of the given units (all when None), oldest first"""
+        with self.changed:
+            selected = []
+            for unit, buffer in self.buffers.items():
+                if units is None or unit in units:
+                    selected.extend(item for item in buffer if item[0] > after)
+        selected.sort(key=lambda item: item[0])
+        return selected[-lines:] if lines else selected
+
+    def wait(self, after, timeout=15):
+        """Block until entries newer than the sequence number arrive"""
+        with self.changed:
+            if self.sequence <= after:
+                self.changed.wait(timeout)
+            return self.sequence
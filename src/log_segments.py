@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Log rotation and segment-aware reading for the monitor log
+چرخش لاگ و خواندن بخش‌های فشرده
+
+The live log is rotated copy-truncate style (the monitor keeps its file
+descriptor open) into timestamped, compressed segments:
+
+    hysteria-monitor.log
+    hysteria-monitor.log-20250101-120000.gz
+    hysteria-monitor.log-20250102-120000.zst
+
+Readers walk the live file and the segments lazily, one block at a time.
+"""
+
+import glob
+import gzip
+import io
+import os
+import shutil
+import time
+from collections import deque
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOCK_SIZE = 64 * 1024
+SEGMENT_TIME_FORMAT = "%Y%m%d-%H%M%S"
+ROTATION_STALL_TIMEOUT = 60  # seconds a .tmp segment may go without being written
+
+
+def parse_log_time(line):
+    """Parse the timestamp in front of ' - ' (None if missing)"""
+    stamp = line.split(' - ', 1)[0].strip()
+    try:
+        return datetime.fromisoformat(stamp)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S,%f")
+    except ValueError:
+        return None
+
+
+def open_segment(path, binary=False):
+    """Open a plain or compressed segment as a text (or binary) stream"""
+    if path.endswith(".gz"):
+        raw = gzip.open(path, 'rb')
+    elif path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard module is required to read .zst segments")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    else:
+        raw = open(path, 'rb')
+    if binary:
+        return raw
+    return io.TextIOWrapper(raw, encoding='utf-8', errors='replace')
+
+
+class LogRotator:
+    def __init__(self, log_file, max_bytes=50 * 1024 * 1024, max_age=86400, keep=10,
+                 compression="gzip"):
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        if compression == "zstd" and zstandard is None:
+            print("zstandard module not installed, compressing log segments with gzip")
+            compression = "gzip"
+        self.compression = compression
+
+    def segment_suffix(self):
+        return ".zst" if self.compression == "zstd" else ".gz"
+
+    def last_rotation_time(self):
+        """Time of the newest segment (None if never rotated)"""
+        segments = LogSegmentReader(self.log_file).segments()
+        return segments[-1][1] if segments else None
+
+    def should_rotate(self):
+        """Check size and age limits of the live file"""
+        try:
+            size = os.path.getsize(self.log_file)
+        except OSError:
+            return False
+        if size == 0:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        if self.max_age:
+            started = self.last_rotation_time() or self.first_line_time()
+            if started is None:
+                return False
+            return (datetime.now() - started).total_seconds() >= self.max_age
+        return False
+
+    def first_line_time(self):
+        """Timestamp of the first line in the live file"""
+        try:
+            with open(self.log_file, 'r', encoding='utf-8', errors='replace') as f:
+                return parse_log_time(f.readline())
+        except OSError:
+            return None
+
+    def rotate(self):
+        """Compress the live file into a new segment and truncate it"""
+        try:
+            stamp = datetime.now().strftime(SEGMENT_TIME_FORMAT)
+            segment = f"{self.log_file}-{stamp}{self.segment_suffix()}"
+            tmp_segment = segment + ".tmp"
+
+            with open(self.log_file, 'rb') as src:
+                if self.compression == "zstd":
+                    with open(tmp_segment, 'wb') as raw:
+                        with zstandard.ZstdCompressor().stream_writer(raw) as dst:
+                            shutil.copyfileobj(src, dst, BLOCK_SIZE)
+                else:
+                    with gzip.open(tmp_segment, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, BLOCK_SIZE)
+                copied = src.tell()
+
+            # Copy-truncate: keep whatever was appended while compressing
+            with open(self.log_file, 'r+b') as f:
+                f.seek(copied)
+                tail = f.read()
+                f.seek(0)
+                f.write(tail)
+                f.truncate()
+
+            os.replace(tmp_segment, segment)
+            self.prune()
+            return {"success": True, "segment": segment}
+        except Exception as e:
+            return {"success": False, "error": f"Log rotation failed: {str(e)}"}
+
+    def prune(self):
+        """Remove segments beyond the retention count"""
+        segments = LogSegmentReader(self.log_file).segments()
+        for path, _ in segments[:max(0, len(segments) - self.keep)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def run(self, interval=60):
+        """Rotation loop for a background thread"""
+        while True:
+            if self.should_rotate():
+                result = self.rotate()
+                if not result["success"]:
+                    print(result["error"])
+            time.sleep(interval)
+
+
+class LogSegmentReader:
+    def __init__(self, log_file):
+        self.log_file = log_file
+
+    def segments(self):
+        """Rotated segments as (path, rotation time), oldest first"""
+        segments = []
+        for path in glob.glob(f"{glob.escape(self.log_file)}-*"):
+            if path.endswith(".tmp"):
+                continue
+            stamp = os.path.basename(path)[len(os.path.basename(self.log_file)) + 1:].split('.', 1)[0]
+            try:
+                segments.append((path, datetime.strptime(stamp, SEGMENT_TIME_FORMAT)))
+            except ValueError:
+                continue
+        return sorted(segments, key=lambda s: s[1])
+
+    def exists(self):
+        return os.path.exists(self.log_file) or bool(self.segments())
+
+    def count_lines(self):
+        """Count lines in the live file without loading it"""
+        count = 0
+        try:
+            with open(self.log_file, 'rb') as f:
+                for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                    count += block.count(b'\n')
+        except OSError:
+            pass
+        return count
+
+    def _reverse_lines(self, path):
+        """Yield lines of a plain file from the end, one block at a time"""
+        with open(path, 'rb') as f:
+            f.seek(0, 2)
+            position = f.tell()
+            remainder = b''
+            while position > 0:
+                size = min(BLOCK_SIZE, position)
+                position -= size
+                f.seek(position)
+                parts = (f.read(size) + remainder).split(b'\n')
+                remainder = parts[0]
+                for part in reversed(parts[1:]):
+                    if part:
+                        yield part.decode('utf-8', errors='replace')
+            if remainder:
+                yield remainder.decode('utf-8', errors='replace')
+
+    def tail(self, count):
+        """Last count lines across the live file and segments"""
+        if count <= 0:
+            return []
+
+        lines = []
+        if os.path.exists(self.log_file):
+            for line in self._reverse_lines(self.log_file):
+                lines.append(line)
+                if len(lines) >= count:
+                    return lines[::-1]
+        lines.reverse()
+
+        # Older segments are only opened while more lines are needed
+        for path, _ in reversed(self.segments()):
+            needed = count - len(lines)
+            if needed <= 0:
+                break
+            window = deque(maxlen=needed)
+            with open_segment(path) as f:
+                for line in f:
+                    line = line.rstrip('\n')
+                    if line:
+                        window.append(line)
+            lines = list(window) + lines
+        return lines
+
+    def read_range(self, since=None, until=None):
+        """Yield lines with timestamps in [since, until], oldest first"""
+        sources = []
+        previous = None
+        for path, rotated in self.segments():
+            # A segment holds lines between the previous rotation and its own
+            if not (since and rotated < since) and not (until and previous and previous > until):
+                sources.append(path)
+            previous = rotated
+        if os.path.exists(self.log_file) and not (until and previous and previous > until):
+            sources.append(self.log_file)
+
+        for path in sources:
+            current = None
+            with open_segment(path) as f:
+                for line in f:
+                    line = line.rstrip('\n')
+                    if not line:
+                        continue
+                    # Continuation lines inherit the previous timestamp
+                    current = parse_log_time(line) or current
+                    if current is None or (since and current < since):
+                        continue
+                    if until and current > until:
+                        return
+                    yield line
+
+
+class LogFollower:
+    def __init__(self, log_file, poll_interval=1):
+        self.log_file = log_file
+        self.poll_interval = poll_interval
+        self.log_dir = os.path.dirname(os.path.abspath(log_file))
+        self.reader = LogSegmentReader(log_file)
+
+    def directory_state(self):
+        """Modification time of the log directory (changes when segments appear)"""
+        try:
+            return os.stat(self.log_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def rotation_in_progress(self):
+        """A segment is being written (ignores leftovers of failed rotations)"""
+        for path in glob.glob(f"{glob.escape(self.log_file)}-*.tmp"):
+            try:
+                if time.time() - os.stat(path).st_mtime < ROTATION_STALL_TIMEOUT:
+                    return True
+            except OSError:
+                continue
+        return False
+
+    def newest_segment(self):
+        segments = self.reader.segments()
+        return segments[-1][0] if segments else None
+
+    def follow(self):
+        """Yield new lines, following copy-truncate rotation and file replacement
+
+        Rotation is detected by a new segment appearing, not by the file
+        shrinking: the retained tail plus new writes can grow past the old
+        read offset before the next check. The segment holds the first
+        `copied` bytes of the old file and the live file restarts with the
+        bytes after them, so the read position maps over exactly.
+        """
+        f = open(self.log_file, 'rb')
+        f.seek(0, 2)
+        inode = os.fstat(f.fileno()).st_ino
+        segment = self.newest_segment()
+        directory = self.directory_state()
+        pending = b''
+        try:
+            while True:
+                state = self.directory_state()
+                if state != directory:
+                    if self.rotation_in_progress():
+                        # The live file may be truncated at any moment, wait for the segment
+                        time.sleep(min(self.poll_interval, 0.1))
+                        continue
+                    directory = state
+                    newest = self.newest_segment()
+                    if newest != segment:
+                        segment = newest
+                        position = f.tell()
+                        data, copied = self._segment_tail(newest, position)
+                        if copied is None:
+                            # Segment already pruned: resume where the live file allows
+                            f.seek(min(position, os.fstat(f.fileno()).st_size))
+                            continue
+                        if position < copied:
+                            data = pending + data
+                            *lines, pending = data.split(b'\n')
+                            for line in lines:
+                                if line:
+                                    yield line.decode('utf-8', errors='replace')
+                        f.seek(max(position - copied, 0))
+                        continue
+
+                position = f.tell()
+                chunk = f.read(BLOCK_SIZE)
+                if chunk:
+                    if self.directory_state() != directory:
+                        # Rotated while reading, the chunk may come from the new content
+                        f.seek(position)
+                        continue
+                    *lines, pending = (pending + chunk).split(b'\n')
+                    for line in lines:
+                        if line:
+                            yield line.decode('utf-8', errors='replace')
+                    continue
+
+                try:
+                    stat = os.stat(self.log_file)
+                except OSError:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                if stat.st_ino != inode:
+                    # Renamed away: the old descriptor is drained, switch over
+                    f.close()
+                    f = open(self.log_file, 'rb')
+                    inode = stat.st_ino
+                    continue
+
+                time.sleep(self.poll_interval)
+        finally:
+            f.close()
+
+    def _segment_tail(self, path, position):
+        """Bytes of a segment after an offset and its uncompressed length
+
+        Returns (b'', None) if the segment cannot be read.
+        """
+        try:
+            with open_segment(path, binary=True) as f:
+                # Compressed streams only seek forward by decompressing, skip in blocks
+                copied = 0
+                while copied < position:
+                    block = f.read(min(BLOCK_SIZE, position - copied))
+                    if not block:
+                        return b'', copied
+                    copied += len(block)
+
+                data = f.read()
+                return data, copied + len(data)
+        except (OSError, RuntimeError, EOFError):
+            return b'', None
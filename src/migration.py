@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Streaming NDJSON export/import of clients
+انتقال کلاینت‌ها بین سرورها با NDJSON
+
+Each line is one JSON record: a header, the server settings and one record
+per client with its config and a hysteria2:// share URI. Export and import
+both work line by line, so memory use does not grow with the fleet size.
+Imports are provisioned in batches and record their progress, so an
+interrupted import can be resumed with the same import id.
+
+Command line usage:
+    python migration.py export --url http://old-host:8080 -o clients.ndjson
+    python migration.py import --url http://new-host:8080 clients.ndjson
+"""
+
+import argparse
+import json
+import os
+import re
+import secrets
+import socket
+import sys
+from datetime import datetime
+from urllib.parse import quote
+
+import requests
+
+FORMAT_VERSION = 1
+CLIENT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+PASSWORD_PATTERN = re.compile(r'^[^\s\'"#:{}\[\],&*?|<>=!%@`]{1,128}$')
+HOST_PATTERN = re.compile(r'^[A-Za-z0-9.-]{1,253}$')
+
+
+def split_server(server):
+    """Split host:port (raises ValueError)"""
+    host, _, port = server.rpartition(':')
+    port = int(port)
+    if not HOST_PATTERN.match(host) or not (1 <= port <= 65535):
+        raise ValueError(f"Invalid server address: {server}")
+    return host, port
+
+
+def build_share_uri(client):
+    """hysteria2:// URI matching the generated client config"""
+    password = quote(client["password"], safe='')
+    return (f"hysteria2://{password}@{client['server']}/"
+            f"?obfs=salamander&obfs-password={password}&sni=cloudflare.com&insecure=1"
+            f"#{quote(client.get('name', ''), safe='')}")
+
+
+class ClientMigrator:
+    def __init__(self, client_manager, server_manager, hysteria_dir, progress_dir):
+        self.client_manager = client_manager
+        self.server_manager = server_manager
+        self.hysteria_dir = hysteria_dir
+        self.progress_dir = progress_dir
+
+    def export_records(self):
+        """Yield NDJSON lines for the server and every client"""
+        yield json.dumps({
+            "type": "header",
+            "version": FORMAT_VERSION,
+            "node": socket.gethostname(),
+            "exported_at": datetime.now().isoformat()
+        }) + "\n"
+
+        server = self.server_manager.server_config
+        if server.get("configured"):
+            yield json.dumps({
+                "type": "server",
+                "port": server.get("port"),
+                "password": server.get("password"),
+                "domain": server.get("domain"),
+                "tuning": server.get("tuning")
+            }, ensure_ascii=False) + "\n"
+
+        for client_id in list(self.client_manager.clients):
+            client = self.client_manager.clients.get(client_id)
+            if client is None:
+                continue
+
+            config = None
+            try:
+                with open(client["config_file"], 'r', encoding='utf-8') as f:
+                    config = f.read()
+            except OSError:
+                pass
+
+            yield json.dumps({
+                "type": "client",
+                "id": client_id,
+                "name": client.get("name"),
+                "server": client["server"],
+                "port": client["port"],
+                "password": client["password"],
+                "tuning": client.get("tuning"),
+                "uri": build_share_uri(client),
+                "config": config
+            }, ensure_ascii=False) + "\n"
+
+    def validate_client(self, record):
+        """Validate a client record, return (id, host, server_port, socks_port, password)"""
+        client_id = str(record.get("id", ""))
+        if not CLIENT_ID_PATTERN.match(client_id):
+            raise ValueError("Invalid client id")
+        host, server_port = split_server(str(record.get("server", "")))
+
+        socks_port = record.get("port")
+        if not isinstance(socks_port, int) or not (1024 <= socks_port <= 65535):
+            raise ValueError("Invalid SOCKS5 port")
+
+        password = str(record.get("password", ""))
+        if not PASSWORD_PATTERN.match(password):
+            raise ValueError("Invalid or unsafe password")
+        return client_id, host, server_port, socks_port, password
+
+    def progress_file(self, import_id):
+        return os.path.join(self.progress_dir, f"import-{import_id}.json")
+
+    def load_progress(self, import_id):
+        """Load progress of an earlier run of this import"""
+        try:
+            with open(self.progress_file(import_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"import_id": import_id, "line": 0, "imported": 0, "skipped": 0, "errors": []}
+
+    def save_progress(self, progress):
+        tmp_file = self.progress_file(progress["import_id"]) + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(progress, f, indent=2)
+        os.replace(tmp_file, self.progress_file(progress["import_id"]))
+
+    def prepare_client(self, record, reserved_ids, reserved_ports):
+        """Build a provisioning entry, None if the client already exists"""
+        client_id, host, server_port, socks_port, password = self.validate_client(record)
+        manager = self.client_manager
+        server = f"{host}:{server_port}"
+
+        existing = manager.clients.get(client_id)
+        if existing and existing["server"] == server and existing["password"] == password:
+            return None
+
+        # Keep the exported id and port unless they are taken on this host
+        if client_id in manager.clients or client_id in reserved_ids:
+            client_id = manager.get_next_client_id(reserved_ids)
+        if not manager.is_port_available(socks_port, reserved_ports):
+            socks_port = manager.get_next_available_port(reserved_ports)
+
+        # Configs are regenerated from the validated fields, tuning inputs are kept
+        tuning = record.get("tuning") or {}
+        tuning = manager.compute_client_tuning(
+            host,
+            tuning.get("profile") or "balanced",
+            tuning.get("bandwidth_mbps"),
+            tuning.get("rtt_ms") or 100
+        )
+        config_file = f"{self.hysteria_dir}/{client_id}.yaml"
+        return {
+            "client_id": client_id,
+            "config": manager.create_client_config(host, server_port, socks_port, password, tuning),
+            "client": {
+                "name": record.get("name") or f"Client {client_id} ({host})",
+                "server": server,
+                "port": socks_port,
+                "service": f"hysteria-{client_id}",
+                "config_file": config_file,
+                "status": "unknown",
+                "password": password,
+                "tuning": tuning
+            }
+        }
+
+    def import_lines(self, lines, batch_size=100, import_id=None):
+        """Provision clients from NDJSON lines, yielding progress per batch"""
+        import_id = import_id or secrets.token_hex(8)
+        if not CLIENT_ID_PATTERN.match(import_id):
+            raise ValueError("Invalid import id")
+        os.makedirs(self.progress_dir, exist_ok=True)
+        progress = self.load_progress(import_id)
+        resume_after = progress["line"]
+
+        batch = []
+        reserved_ids = set()
+        reserved_ports = set()
+
+        def commit(line_number):
+            if batch:
+                self.client_manager.provision_clients(batch)
+                progress["imported"] += len(batch)
+            progress["line"] = line_number
+            progress["errors"] = progress["errors"][-100:]
+            self.save_progress(progress)
+            batch.clear()
+            reserved_ids.clear()
+            reserved_ports.clear()
+            return dict(progress, state="running")
+
+        line_number = 0
+        for line_number, line in enumerate(lines, 1):
+            # Lines committed by an earlier run are not parsed again
+            if line_number <= resume_after:
+                continue
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', errors='replace')
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+                if record.get("type") != "client":
+                    continue
+                entry = self.prepare_client(record, reserved_ids, reserved_ports)
+            except (ValueError, AttributeError) as e:
+                progress["errors"].append({"line": line_number, "error": str(e)})
+                continue
+
+            if entry is None:
+                progress["skipped"] += 1
+                continue
+            batch.append(entry)
+            reserved_ids.add(entry["client_id"])
+            reserved_ports.add(entry["client"]["port"])
+
+            if len(batch) >= batch_size:
+                yield commit(line_number)
+
+        result = commit(max(line_number, resume_after))
+        result["state"] = "done"
+        yield result
+
+
+def cli_export(args):
+    """Stream an export from a manager into a file"""
+    output = open(args.output, 'w', encoding='utf-8') if args.output != '-' else sys.stdout
+    try:
+        with requests.get(f"{args.url.rstrip('/')}/api/clients/export", stream=True,
+                          timeout=args.timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    output.write(line + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def cli_import(args):
+    """Stream a file into a manager's import endpoint"""
+    source = open(args.file, 'rb') if args.file != '-' else sys.stdin.buffer
+    import_id = args.import_id or secrets.token_hex(8)
+    print(f"Import id: {import_id} (use --import-id {import_id} to resume)", file=sys.stderr)
+
+    try:
+        with requests.post(f"{args.url.rstrip('/')}/api/clients/import",
+                           params={"batch_size": args.batch_size, "import_id": import_id},
+                           data=iter(source.readline, b''),
+                           headers={"Content-Type": "application/x-ndjson"},
+                           stream=True, timeout=args.timeout) as response:
+            if response.status_code >= 400:
+                print(response.text, file=sys.stderr)
+                return 1
+            result = {}
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    result = json.loads(line)
+                    print(f"{result.get('state')}: line {result.get('line')}, "
+                          f"{result.get('imported')} imported, {result.get('skipped')} skipped, "
+                          f"{len(result.get('errors', []))} errors", file=sys.stderr)
+            return 0 if result.get("state") == "done" else 1
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import Hysteria2 clients as NDJSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export clients from a manager")
+    export_parser.add_argument('--url', required=True, help="Manager URL, e.g. http://host:8080")
+    export_parser.add_argument('-o', '--output', default='-', help="Output file (default: stdout)")
+
+    import_parser = commands.add_parser("import", help="Import clients into a manager")
+    import_parser.add_argument('--url', required=True, help="Manager URL, e.g. http://host:8080")
+    import_parser.add_argument('--batch-size', type=int, default=100, help="Clients per batch")
+    import_parser.add_argument('--import-id', help="Resume an earlier import")
+    import_parser.add_argument('file', help="NDJSON file (- for stdin)")
+
+    for sub in (export_parser, import_parser):
+        sub.add_argument('--timeout', type=float, default=300, help="Request timeout in seconds")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        cli_export(args)
+        return 0
+    return cli_import(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Host network tuning advisor for QUIC
+بررسی تنظیمات شبکه میزبان برای QUIC
+
+Reads UDP buffer limits, backlog, congestion control, conntrack usage and
+interface state from /proc and /sys, compares them with what the rendered
+Hysteria configs need and can persist corrections to a sysctl drop-in.
+The proc/sys roots are parameters so the checks can run against a fake tree.
+"""
+
+import os
+import subprocess
+
+MIB = 1024 * 1024
+
+# Socket buffers only have to absorb bursts, not the whole receive window
+MIN_UDP_BUFFER = 16 * MIB
+MAX_UDP_BUFFER = 64 * MIB
+MIN_NETDEV_BACKLOG = 5000
+CONNTRACK_USAGE_WARN = 0.8
+MIN_QUIC_MTU = 1280 + 48  # QUIC minimum plus IPv6/UDP headers
+
+# Keys that may be written to the drop-in
+SETTABLE_KEYS = (
+    "net.core.rmem_max",
+    "net.core.wmem_max",
+    "net.core.netdev_max_backlog",
+    "net.core.default_qdisc",
+    "net.ipv4.tcp_congestion_control",
+    "net.netfilter.nf_conntrack_max"
+)
+
+
+class NetworkTuningAdvisor:
+    def __init__(self, proc_root="/proc", sys_root="/sys",
+                 dropin_file="/etc/sysctl.d/99-hysteria-web.conf", ethtool="ethtool"):
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self.dropin_file = dropin_file
+        self.ethtool = ethtool
+
+    def read_file(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def read_sysctl(self, key):
+        """Read a sysctl value from <proc_root>/sys (None if missing)"""
+        return self.read_file(os.path.join(self.proc_root, "sys", *key.split('.')))
+
+    def read_int_sysctl(self, key):
+        value = self.read_sysctl(key)
+        try:
+            return int(value.split()[0]) if value else None
+        except ValueError:
+            return None
+
+    def get_default_interface(self):
+        """Interface of the IPv4 default route"""
+        routes = self.read_file(os.path.join(self.proc_root, "net", "route"))
+        for line in (routes or "").splitlines()[1:]:
+            fields = line.split()
+            if len(fields) > 1 and fields[1] == "00000000":
+                return fields[0]
+        return None
+
+    def get_offloads(self, interface):
+        """GSO/GRO offload state from ethtool -k (empty if unavailable)"""
+        try:
+            result = subprocess.run([self.ethtool, '-k', interface],
+                                  capture_output=True, text=True, timeout=5)
+            if result.returncode != 0:
+                return {}
+        except Exception:
+            return {}
+
+        offloads = {}
+        for line in result.stdout.splitlines():
+            name, _, state = line.partition(':')
+            if state:
+                offloads[name.strip()] = state.split()[0] == "on"
+        return offloads
+
+    def required_buffer(self, conn_window):
+        """UDP buffer size needed for a connection receive window"""
+        return max(MIN_UDP_BUFFER, min(conn_window or 0, MAX_UDP_BUFFER))
+
+    def check(self, key, current, recommended, ok, message, severity="warning", settable=True):
+        return {
+            "key": key,
+            "current": current,
+            "recommended": recommended,
+            "status": "unknown" if current is None else ("ok" if ok else severity),
+            "message": message,
+            "settable": settable and key in SETTABLE_KEYS
+        }
+
+    def analyze(self, conn_window=None):
+        """Compare host settings with what the configs need"""
+        checks = []
+        buffer = self.required_buffer(conn_window)
+
+        for key in ("net.core.rmem_max", "net.core.wmem_max"):
+            current = self.read_int_sysctl(key)
+            checks.append(self.check(
+                key, current, buffer, current is not None and current >= buffer,
+                f"UDP socket buffers are capped at {current} bytes, QUIC needs {buffer}"
+            ))
+
+        backlog = self.read_int_sysctl("net.core.netdev_max_backlog")
+        checks.append(self.check(
+            "net.core.netdev_max_backlog", backlog, MIN_NETDEV_BACKLOG,
+            backlog is not None and backlog >= MIN_NETDEV_BACKLOG,
+            "Small input backlog drops UDP packets at high packet rates"
+        ))
+
+        congestion = self.read_sysctl("net.ipv4.tcp_congestion_control")
+        available = (self.read_sysctl("net.ipv4.tcp_available_congestion_control") or "").split()
+        checks.append(self.check(
+            "net.ipv4.tcp_congestion_control", congestion, "bbr", congestion == "bbr",
+            "BBR improves the TCP side of proxied connections"
+            + ("" if "bbr" in available else " (tcp_bbr module not loaded)"),
+            severity="info", settable="bbr" in available
+        ))
+
+        qdisc = self.read_sysctl("net.core.default_qdisc")
+        checks.append(self.check(
+            "net.core.default_qdisc", qdisc, "fq", qdisc in ("fq", "fq_codel", "cake"),
+            "A fair queueing qdisc avoids bufferbloat under load", severity="info"
+        ))
+
+        conntrack_max = self.read_int_sysctl("net.netfilter.nf_conntrack_max")
+        conntrack_count = self.read_int_sysctl("net.netfilter.nf_conntrack_count")
+        if conntrack_max is not None:
+            usage = (conntrack_count or 0) / conntrack_max if conntrack_max else 1
+            checks.append(self.check(
+                "net.netfilter.nf_conntrack_max", conntrack_max,
+                max(conntrack_max, (conntrack_count or 0) * 2),
+                usage < CONNTRACK_USAGE_WARN,
+                f"Connection tracking table is {usage:.0%} full, new UDP flows get dropped when full"
+            ))
+
+        interface = self.get_default_interface()
+        if interface:
+            mtu = self.read_file(os.path.join(self.sys_root, "class", "net", interface, "mtu"))
+            mtu = int(mtu) if mtu and mtu.isdigit() else None
+            checks.append(self.check(
+                f"{interface}.mtu", mtu, MIN_QUIC_MTU, mtu is not None and mtu >= MIN_QUIC_MTU,
+                "QUIC needs a path MTU of at least 1280 bytes"
+            ))
+
+            offloads = self.get_offloads(interface)
+            for feature, label in (("generic-segmentation-offload", "GSO"),
+                                   ("generic-receive-offload", "GRO"),
+                                   ("tx-udp-segmentation", "UDP GSO")):
+                state = offloads.get(feature)
+                checks.append(self.check(
+                    f"{interface}.{feature}", state, True, bool(state),
+                    f"{label} batches UDP packets and lowers CPU per byte", severity="info"
+                ))
+
+        gaps = [c for c in checks if c["status"] in ("warning", "info")]
+        return {
+            "interface": interface,
+            "required_buffer": buffer,
+            "checks": checks,
+            "warnings": sum(1 for c in checks if c["status"] == "warning"),
+            "settable_gaps": [c["key"] for c in gaps if c["settable"]],
+            "dropin_file": self.dropin_file
+        }
+
+    def read_dropin(self):
+        """Values already persisted in the drop-in"""
+        values = {}
+        for line in (self.read_file(self.dropin_file) or "").splitlines():
+            key, _, value = line.partition('=')
+            key = key.strip()
+            if key in SETTABLE_KEYS and value.strip():
+                values[key] = value.strip()
+        return values
+
+    def apply(self, conn_window=None, load=True):
+        """Persist corrected values to the sysctl drop-in and optionally load it
+
+        Corrections from earlier runs stay in the drop-in, so values that are
+        already live are still applied again after a reboot.
+        """
+        try:
+            report = self.analyze(conn_window)
+            values = {c["key"]: c["recommended"] for c in report["checks"]
+                      if c["settable"] and c["status"] in ("warning", "info")}
+            if not values:
+                return {"success": True, "message": "Host settings already match", "values": {}}
+
+            persisted = self.read_dropin()
+            persisted.update(values)
+            lines = ["# Generated by Hysteria2 Web Manager for QUIC throughput"]
+            lines += [f"{key} = {value}" for key, value in persisted.items()]
+            os.makedirs(os.path.dirname(self.dropin_file), exist_ok=True)
+            with open(self.dropin_file, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+
+            if load:
+                result = subprocess.run(['sysctl', '-p', self.dropin_file],
+                                      capture_output=True, text=True)
+                if result.returncode != 0:
+                    return {"success": False, "values": values,
+                            "error": f"Drop-in written but sysctl failed: {result.stderr.strip()}"}
+
+            return {"success": True, "values": values, "persisted": persisted,
+                    "message": f"Wrote {len(values)} new settings to {self.dropin_file}"}
+        except Exception as e:
+            return {"success": False, "error": f"Applying host tuning failed: {str(e)}"}
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+On-demand request profiling and slow-request capture
+پروفایل درخواست‌ها و ثبت درخواست‌های کند
+
+Profiling is switched on at runtime, globally or per route with a sampling
+rate, or forced for a single request. Profiled requests run under cProfile;
+wall time spent in subprocesses, sockets and file I/O is derived from the
+pstats call graph, so no library is patched. Every request is timed, and
+requests slower than the threshold land in a bounded ring together with
+their profile when one was taken.
+"""
+
+import cProfile
+import io
+import itertools
+import marshal
+import pstats
+import random
+import time
+from collections import deque
+from datetime import datetime
+from threading import Lock
+
+IO_CATEGORIES = ("subprocess", "socket", "file")
+TOP_FUNCTIONS = 25
+
+
+def classify(func):
+    """I/O category of a pstats function key (None if not I/O)"""
+    filename, _, name = func
+    if filename.endswith("subprocess.py") or "_posixsubprocess" in name or "posix.waitpid" in name:
+        return "subprocess"
+    if (filename.endswith(("socket.py", "ssl.py")) or "_socket." in name
+            or "_ssl." in name or "getaddrinfo" in name):
+        return "socket"
+    if name in ("<built-in method io.open>", "<built-in method posix.stat>",
+                "<built-in method posix.scandir>", "<built-in method posix.listdir>") \
+            or "of '_io." in name:
+        return "file"
+    return None
+
+
+def summarize_io(stats):
+    """Wall seconds per I/O category from a pstats stats dict
+
+    Only calls entering a category from outside any I/O category count, so
+    nested calls (a pipe read inside subprocess.run) are not counted twice.
+    """
+    totals = dict.fromkeys(IO_CATEGORIES, 0.0)
+    for func, (_, _, _, cumtime, callers) in stats.items():
+        category = classify(func)
+        if category is None:
+            continue
+        if not callers:
+            totals[category] += cumtime
+            continue
+        for caller, edge in callers.items():
+            if classify(caller) is None:
+                totals[category] += edge[3]
+    return {f"{category}_ms": round(seconds * 1000, 2) for category, seconds in totals.items()}
+
+
+def top_functions(stats, limit=TOP_FUNCTIONS):
+    """Functions with the highest cumulative time"""
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{
+        "function": f"{filename}:{lineno}({name})",
+        "calls": calls,
+        "tottime_ms": round(tottime * 1000, 2),
+        "cumtime_ms": round(cumtime * 1000, 2)
+    } for (filename, lineno, name), (_, calls, tottime, cumtime, _) in rows]
+
+
+class RequestProfiler:
+    def __init__(self, slow_threshold_ms=1000, max_profiles=20, max_slow=100):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.routes = {}
+        self.slow_threshold_ms = slow_threshold_ms
+        self.lock = Lock()
+        # cProfile cannot profile two threads' requests at once
+        self.profile_lock = Lock()
+        self.profiles = deque(maxlen=max_profiles)
+        self.slow_requests = deque(maxlen=max_slow)
+        self.ids = itertools.count(1)
+
+    def configure(self, enabled=None, sample_rate=None, routes=None, slow_threshold_ms=None):
+        """Change settings at runtime (raises ValueError)"""
+        if sample_rate is not None:
+            sample_rate = float(sample_rate)
+            if not 0 <= sample_rate <= 1:
+                raise ValueError("sample_rate must be between 0 and 1")
+        if routes is not None:
+            routes = {str(route): float(rate) for route, rate in dict(routes).items()}
+            if any(not 0 <= rate <= 1 for rate in routes.values()):
+                raise ValueError("Route sampling rates must be between 0 and 1")
+        if slow_threshold_ms is not None:
+            slow_threshold_ms = float(slow_threshold_ms)
+            if slow_threshold_ms <= 0:
+                raise ValueError("slow_threshold_ms must be positive")
+
+        with self.lock:
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            if sample_rate is not None:
+                self.sample_rate = sample_rate
+            if routes is not None:
+                self.routes = routes
+            if slow_threshold_ms is not None:
+                self.slow_threshold_ms = slow_threshold_ms
+        return self.get_config()
+
+    def get_config(self):
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "sample_rate": self.sample_rate,
+                "routes": dict(self.routes),
+                "slow_threshold_ms": self.slow_threshold_ms
+            }
+
+    def should_profile(self, endpoint):
+        """Sampling decision for a request to an endpoint"""
+        with self.lock:
+            if not self.enabled:
+                return False
+            rate = self.routes.get(endpoint, self.sample_rate)
+        return rate > 0 and random.random() < rate
+
+    def start(self, endpoint, force=False):
+        """Begin timing a request, profiling it if sampled or forced"""
+        state = {"started": time.perf_counter(), "started_at": time.time(), "profile": None}
+        if (force or self.should_profile(endpoint)) and self.profile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                state["profile"] = profile
+            except ValueError:
+                # Another profiler is active in this process
+                self.profile_lock.release()
+        return state
+
+    def finish(self, state, method, path, endpoint, status):
+        """Stop timing a request and record it if profiled or slow"""
+        duration_ms = (time.perf_counter() - state["started"]) * 1000
+        profile = state["profile"]
+        stats = None
+        if profile is not None:
+            profile.disable()
+            self.profile_lock.release()
+            profile.create_stats()
+            stats = profile.stats
+
+        slow = duration_ms >= self.slow_threshold_ms
+        if stats is None and not slow:
+            return None
+
+        record = {
+            "id": next(self.ids),
+            "method": method,
+            "path": path,
+            "endpoint": endpoint,
+            "status": status,
+            "duration_ms": round(duration_ms, 2),
+            "started_at": datetime.fromtimestamp(state["started_at"]).isoformat(),
+            "slow": slow,
+            "profiled": stats is not None
+        }
+        if stats is not None:
+            record["io"] = summarize_io(stats)
+            record["top"] = top_functions(stats)
+            record["pstats"] = marshal.dumps(stats)
+
+        with self.lock:
+            if stats is not None:
+                self.profiles.append(record)
+            if slow:
+                self.slow_requests.append(record)
+        return record
+
+    def summary(self, record):
+        """Record without the raw profile"""
+        return {key: value for key, value in record.items() if key not in ("pstats", "top")}
+
+    def list_records(self):
+        """Recent profiled and slow requests, newest first"""
+        with self.lock:
+            return {
+                "profiles": [self.summary(record) for record in reversed(self.profiles)],
+                "slow_requests": [self.summary(record) for record in reversed(self.slow_requests)]
+            }
+
+    def get_record(self, record_id):
+        with self.lock:
+            for record in itertools.chain(self.profiles, self.slow_requests):
+                if record["id"] == record_id:
+                    return record
+        return None
+
+    def render_text(self, record, sort="cumulative", limit=50):
+        """pstats report of a profiled request"""
+        stats = pstats.Stats(LoadedProfile(marshal.loads(record["pstats"])), stream=io.StringIO())
+        stats.sort_stats(sort).print_stats(limit)
+        return stats.stream.getvalue()
+
+
+class LoadedProfile:
+    """Stored stats dict in the shape pstats.Stats loads from"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Coalescing service control queue
+صف کنترل سرویس‌ها با ادغام درخواست‌ها
+
+Start/stop/restart requests for a unit are debounced and merged into one
+pending operation, restarts of the same unit are rate limited and only a
+few systemctl calls run in parallel across units. Callers get an operation
+handle instead of blocking on systemctl.
+"""
+
+import itertools
+import subprocess
+import time
+from collections import OrderedDict
+from threading import Condition, Thread
+
+ACTIONS = ('start', 'stop', 'restart')
+
+
+class ServiceControlQueue:
+    def __init__(self, max_parallel=2, debounce=1.0, max_delay=5.0, min_interval=10.0,
+                 timeout=60, history_size=200):
+        self.max_parallel = max_parallel
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.history_size = history_size
+        self.operations = OrderedDict()
+        self.pending = {}
+        self.running = {}
+        self.last_finished = {}
+        self.ids = itertools.count(1)
+        self.cond = Condition()
+        self.dispatcher = None
+
+    def start(self):
+        """Start the dispatcher thread once"""
+        with self.cond:
+            if self.dispatcher is None:
+                self.dispatcher = Thread(target=self.dispatch, daemon=True)
+                self.dispatcher.start()
+
+    def submit(self, unit, action):
+        """Queue an action for a unit, merging with a pending one"""
+        if action not in ACTIONS:
+            raise ValueError(f"Invalid action: {action}")
+        self.start()
+
+        now = time.time()
+        with self.cond:
+            # A request arriving right after the same action started is already served
+            running = self.running.get(unit)
+            if running and running["action"] == action and now - running["started"] < self.debounce:
+                running["requests"] += 1
+                return dict(running)
+
+            operation = self.pending.get(unit)
+            if operation:
+                # Later requests win: stop followed by start becomes start
+                operation["action"] = action
+                operation["requests"] += 1
+                operation["due"] = min(now + self.debounce, operation["created"] + self.max_delay)
+            else:
+                operation = {
+                    "id": next(self.ids),
+                    "unit": unit,
+                    "action": action,
+                    "state": "queued",
+                    "requests": 1,
+                    "created": now,
+                    "due": now + self.debounce,
+                    "started": None,
+                    "finished": None,
+                    "error": None
+                }
+                self.pending[unit] = operation
+                self.operations[operation["id"]] = operation
+                self.trim_history()
+
+            # Never restart the same unit more often than min_interval
+            last = self.last_finished.get(unit)
+            if last and operation["action"] == "restart":
+                operation["due"] = max(operation["due"], last + self.min_interval)
+
+            self.cond.notify_all()
+            return dict(operation)
+
+    def get(self, operation_id):
+        """Operation handle by id (None if unknown or expired)"""
+        with self.cond:
+            operation = self.operations.get(operation_id)
+            return dict(operation) if operation else None
+
+    def wait(self, operation_id, timeout):
+        """Wait until an operation has finished or timeout expires"""
+        deadline = time.time() + timeout
+        with self.cond:
+            while True:
+                operation = self.operations.get(operation_id)
+                remaining = deadline - time.time()
+                if not operation or operation["state"] in ("done", "failed") or remaining <= 0:
+                    return dict(operation) if operation else None
+                self.cond.wait(remaining)
+
+    def trim_history(self):
+        """Drop the oldest finished operations"""
+        while len(self.operations) > self.history_size:
+            oldest_id, oldest = next(iter(self.operations.items()))
+            if oldest["state"] in ("queued", "running"):
+                break
+            del self.operations[oldest_id]
+
+    def dispatch(self):
+        """Start due operations while parallel slots are free"""
+        with self.cond:
+            while True:
+                now = time.time()
+                next_due = None
+                for unit, operation in list(self.pending.items()):
+                    if len(self.running) >= self.max_parallel:
+                        break
+                    if unit in self.running:
+                        continue
+                    if operation["due"] > now:
+                        next_due = min(next_due or operation["due"], operation["due"])
+                        continue
+
+                    del self.pending[unit]
+                    operation["state"] = "running"
+                    operation["started"] = now
+                    self.running[unit] = operation
+                    Thread(target=self.execute, args=(operation,), daemon=True).start()
+
+                self.cond.wait(max(0.05, next_due - now) if next_due else None)
+
+    def execute(self, operation):
+        """Run systemctl for an operation"""
+        try:
+            result = subprocess.run(['systemctl', operation["action"], operation["unit"]],
+                                  capture_output=True, text=True, timeout=self.timeout)
+            error = None if result.returncode == 0 else result.stderr.strip() or "systemctl failed"
+        except subprocess.TimeoutExpired:
+            error = f"systemctl {operation['action']} timed out"
+        except Exception as e:
+            error = str(e)
+
+        with self.cond:
+            operation["finished"] = time.time()
+            operation["state"] = "failed" if error else "done"
+            operation["error"] = error
+            del self.running[operation["unit"]]
+            self.last_finished[operation["unit"]] = operation["finished"]
+            self.cond.notify_all()
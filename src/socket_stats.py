@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Per-client socket statistics from /proc/net
+آمار سوکت‌های هر کلاینت از /proc/net
+
+Parses /proc/net/tcp{,6} and /proc/net/udp{,6} once per refresh without
+forking ss, and maps sockets to the client SOCKS5 ports and the server
+listen port. QUIC clients use unconnected UDP sockets, so their sockets are
+found by inode through /proc/<pid>/fd of the processes in the unit's cgroup.
+"""
+
+import os
+
+TCP_STATES = {
+    "01": "established", "02": "syn_sent", "03": "syn_recv", "04": "fin_wait1",
+    "05": "fin_wait2", "06": "time_wait", "07": "close", "08": "close_wait",
+    "09": "last_ack", "0A": "listen", "0B": "closing"
+}
+
+
+def empty_queue_stats():
+    return {"sockets": 0, "rx_queue": 0, "tx_queue": 0, "max_rx_queue": 0, "drops": 0}
+
+
+class SocketStatsCollector:
+    def __init__(self, proc_root="/proc", cgroup_root="/sys/fs/cgroup"):
+        self.proc_root = proc_root
+        self.cgroup_root = cgroup_root
+
+    def read_table(self, name):
+        """Yield the split rows of a /proc/net table"""
+        path = os.path.join(self.proc_root, "net", name)
+        try:
+            with open(path, 'r', encoding='ascii') as f:
+                next(f, None)
+                for line in f:
+                    yield line.split()
+        except OSError:
+            return
+
+    def add_queues(self, stats, fields, drops=0):
+        tx_queue, rx_queue = (int(q, 16) for q in fields[4].split(':'))
+        stats["sockets"] += 1
+        stats["rx_queue"] += rx_queue
+        stats["tx_queue"] += tx_queue
+        stats["max_rx_queue"] = max(stats["max_rx_queue"], rx_queue)
+        stats["drops"] += drops
+
+    def unit_socket_inodes(self, unit):
+        """Socket inodes held by the processes of a unit (None if unreadable)"""
+        procs = os.path.join(self.cgroup_root, "system.slice", f"{unit}.service", "cgroup.procs")
+        try:
+            with open(procs, 'r', encoding='ascii') as f:
+                pids = f.read().split()
+        except OSError:
+            return None
+
+        inodes = set()
+        for pid in pids:
+            fd_dir = os.path.join(self.proc_root, pid, "fd")
+            try:
+                fds = os.listdir(fd_dir)
+            except FileNotFoundError:
+                # Process exited since cgroup.procs was read
+                continue
+            except OSError:
+                return None
+            for fd in fds:
+                try:
+                    target = os.readlink(os.path.join(fd_dir, fd))
+                except OSError:
+                    continue
+                if target.startswith("socket:["):
+                    inodes.add(target[len("socket:["):-1])
+        return inodes
+
+    def count_conntrack_flows(self, port):
+        """UDP flows to a port in the conntrack table (None if unavailable)"""
+        path = os.path.join(self.proc_root, "net", "nf_conntrack")
+        if not os.path.exists(path):
+            return None
+        needle = f"dport={port}"
+        flows = 0
+        try:
+            with open(path, 'r', encoding='ascii') as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 3 or fields[2] != "udp":
+                        continue
+                    # The first dport is the original direction, the reply tuple follows
+                    dport = next((field for field in fields if field.startswith("dport=")), None)
+                    if dport == needle:
+                        flows += 1
+        except OSError:
+            return None
+        return flows
+
+    def collect(self, clients, server_port=None):
+        """Socket statistics per client and for the server port
+
+        clients maps client ids to their config (SOCKS5 port and service).
+        """
+        socks_ports = {}
+        quic_inodes = {}
+        result = {}
+        for client_id, client in clients.items():
+            socks_ports[client["port"]] = client_id
+            inodes = self.unit_socket_inodes(client["service"]) if client.get("service") else None
+            for inode in inodes or ():
+                quic_inodes[inode] = client_id
+            result[client_id] = {
+                "socks": {"listening": 0, "established": 0, "other": 0, "accept_queue": 0,
+                          "rx_queue": 0, "tx_queue": 0, "max_rx_queue": 0},
+                # None when the unit's processes cannot be inspected
+                "quic": empty_queue_stats() if inodes is not None else None
+            }
+
+        # TCP: SOCKS5 listeners and their connections
+        for table in ("tcp", "tcp6"):
+            for fields in self.read_table(table):
+                if len(fields) < 5:
+                    continue
+                local_port = int(fields[1].rsplit(':', 1)[1], 16)
+                client_id = socks_ports.get(local_port)
+                if client_id is None:
+                    continue
+
+                socks = result[client_id]["socks"]
+                state = TCP_STATES.get(fields[3], "other")
+                tx_queue, rx_queue = (int(q, 16) for q in fields[4].split(':'))
+                if state == "listen":
+                    # For listeners rx_queue is the pending accept queue
+                    socks["listening"] += 1
+                    socks["accept_queue"] += rx_queue
+                    continue
+                socks["established" if state == "established" else "other"] += 1
+                socks["rx_queue"] += rx_queue
+                socks["tx_queue"] += tx_queue
+                socks["max_rx_queue"] = max(socks["max_rx_queue"], rx_queue)
+
+        # UDP: client QUIC sockets (by inode) and the server listener
+        server = empty_queue_stats()
+        for table in ("udp", "udp6"):
+            for fields in self.read_table(table):
+                if len(fields) < 5:
+                    continue
+                drops = int(fields[-1]) if len(fields) >= 13 and fields[-1].isdigit() else 0
+                local_port = int(fields[1].rsplit(':', 1)[1], 16)
+                if server_port and local_port == server_port:
+                    self.add_queues(server, fields, drops)
+                    continue
+                if len(fields) < 10:
+                    continue
+                client_id = quic_inodes.get(fields[9])
+                if client_id is not None:
+                    self.add_queues(result[client_id]["quic"], fields, drops)
+
+        stats = {"clients": result}
+        if server_port:
+            server["port"] = server_port
+            server["flows"] = self.count_conntrack_flows(server_port)
+            stats["server"] = server
+        return stats
@@ -0,0 +1,794 @@
+let autoRefresh = true;
+let refreshInterval;
+let eventSource;
+let clientToDelete = null;
+let availability = {};
+let lastStatus = null;
+
+// Initialize the dashboard
+document.addEventListener('DOMContentLoaded', function() {
+    loadStatus();
+    loadAvailability();
+    loadLogs();
+    loadClientsList();
+    loadServerStatus();
+    startAutoRefresh();
+    connectEventSource();
+});
+
+// Main tab management
+function showMainTab(tabName) {
+    // Hide all main content sections
+    document.querySelectorAll('.main-content').forEach(content => {
+        content.classList.remove('active');
+    });
+    document.querySelectorAll('.main-tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // Show selected tab
+    document.getElementById(tabName).classList.add('active');
+    event.target.classList.add('active');
+
+    if (tabName === 'server') {
+        loadServerStatus();
+    }
+    if (tabName === 'fleet') {
+        loadFleet();
+    }
+}
+
+// Load cached fleet state
+function loadFleet() {
+    fetch('/api/fleet')
+        .then(response => response.json())
+        .then(data => {
+            displayFleet(data.nodes);
+        })
+        .catch(error => {
+            console.error('Error loading fleet:', error);
+        });
+}
+
+// Display fleet nodes
+function displayFleet(nodes) {
+    const container = document.getElementById('fleetStatus');
+    container.innerHTML = '';
+
+    if (Object.keys(nodes).length === 0) {
+        container.innerHTML = '<p>هنوز سروری اضافه نشده است</p>';
+        return;
+    }
+
+    Object.entries(nodes).forEach(([name, node]) => {
+        const status = node.status || {};
+        const clients = Object.values(status.clients || {});
+        const online = clients.filter(client => client.status === 'online').length;
+        const statusClass = node.online ? 'status-online' : 'status-offline';
+        const statusIcon = node.online ? '✅' : '❌';
+
+        container.innerHTML += `
+            <div class="status-item ${statusClass}">
+                <div class="client-actions">
+                    <button class="btn-small" onclick="removeNode('${name}')" title="حذف سرور">
+                        <i class="fas fa-trash"></i>
+                    </button>
+                </div>
+                <h4>${statusIcon} ${name}</h4>
+                <p>${node.url}</p>
+                <p>کلاینت‌ها: ${online} / ${clients.length} آنلاین</p>
+                <p>سرور: ${status.server && status.server.running ? 'در حال اجرا' : 'متوقف'}</p>
+                ${node.latency_ms !== undefined ? `<p>تاخیر: ${node.latency_ms} ms</p>` : ''}
+                ${node.stale ? '<p>⚠️ اطلاعات قدیمی</p>' : ''}
+                ${node.error ? `<p>خطا: ${node.error}</p>` : ''}
+            </div>
+        `;
+    });
+}
+
+// Add a fleet node
+document.getElementById('addNodeForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    fetch('/api/fleet/nodes', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({
+            name: document.getElementById('node_name').value,
+            url: document.getElementById('node_url').value,
+            token: document.getElementById('node_token').value
+        })
+    })
+        .then(response => response.json())
+        .then(data => {
+            const container = document.getElementById('addNodeMessage');
+            if (data.success) {
+                container.innerHTML = `<div class="success-message">${data.message}</div>`;
+                document.getElementById('addNodeForm').reset();
+                fetch('/api/fleet?refresh=1')
+                    .then(response => response.json())
+                    .then(data => displayFleet(data.nodes));
+            } else {
+                container.innerHTML = `<div class="error-message">${data.error}</div>`;
+            }
+        })
+        .catch(error => {
+            console.error('Error adding node:', error);
+        });
+});
+
+// Remove a fleet node
+function removeNode(name) {
+    if (!confirm('آیا از حذف این سرور اطمینان دارید؟')) {
+        return;
+    }
+
+    fetch(`/api/fleet/nodes/${encodeURIComponent(name)}`, {method: 'DELETE'})
+        .then(response => response.json())
+        .then(() => loadFleet())
+        .catch(error => {
+            console.error('Error removing node:', error);
+        });
+}
+
+// Sub tab management
+function showTab(tabName) {
+    // Get the parent section to target the correct tabs
+    const parentSection = event.target.closest('.server-section, .clients-section');
+    
+    // Hide all tabs in this section
+    parentSection.querySelectorAll('.tab-content').forEach(tab => {
+        tab.classList.remove('active');
+    });
+    parentSection.querySelectorAll('.tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // Show selected tab
+    document.getElementById(tabName).classList.add('active');
+    event.target.classList.add('active');
+
+    if (tabName === 'manage-clients') {
+        loadClientsList();
+    }
+}
+
+// Load server status
+function loadServerStatus() {
+    fetch('/api/server/status')
+        .then(response => response.json())
+        .then(data => {
+            displayServerStatus(data);
+        })
+        .catch(error => {
+            console.error('Error loading server status:', error);
+        });
+}
+
+// Display server status
+function displayServerStatus(data) {
+    const container = document.getElementById('serverStatus');
+    const infoContainer = document.getElementById('serverInfo');
+    
+    container.innerHTML = `
+        <div class="server-status-item ${data.installed ? 'online' : 'offline'}">
+            <h4>${data.installed ? '✅' : '❌'} هسته</h4>
+            <p>${data.installed ? 'نصب شده' : 'نصب نشده'}</p>
+        </div>
+        <div class="server-status-item ${data.configured ? 'online' : 'offline'}">
+            <h4>${data.configured ? '⚙️' : '❌'} کانفیگ</h4>
+            <p>${data.configured ? 'تنظیم شده' : 'تنظیم نشده'}</p>
+        </div>
+        <div class="server-status-item ${data.running ? 'online' : 'offline'}">
+            <h4>${data.running ? '🟢' : '🔴'} وضعیت</h4>
+            <p>${data.running ? 'در حال اجرا' : 'متوقف'}</p>
+        </div>
+    `;
+
+    // Show server info if configured
+    if (data.configured && data.config) {
+        infoContainer.style.display = 'block';
+        infoContainer.innerHTML = `
+            <h4>اطلاعات سرور:</h4>
+            <p><strong>IP سرور:</strong> ${data.config.domain || 'نامشخص'}</p>
+            <p><strong>پورت:</strong> ${data.config.port || 'نامشخص'}</p>
+            <p><strong>رمز عبور:</strong> ${data.config.password || 'نامشخص'}</p>
+            <p><strong>فایل کانفیگ:</strong> ${data.config.config_file || 'نامشخص'}</p>
+        `;
+    } else {
+        infoContainer.style.display = 'none';
+    }
+}
+
+// Install Hysteria
+function installHysteria() {
+    const progressDiv = document.getElementById('installProgress');
+    const progressFill = document.getElementById('progressFill');
+    const messageDiv = document.getElementById('installMessage');
+    
+    progressDiv.style.display = 'block';
+    progressFill.style.width = '10%';
+    messageDiv.innerHTML = '';
+
+    fetch('/api/server/install', {
+        method: 'POST'
+    })
+    .then(response => {
+        progressFill.style.width = '50%';
+        return response.json();
+    })
+    .then(result => {
+        progressFill.style.width = '100%';
+        
+        setTimeout(() => {
+            progressDiv.style.display = 'none';
+            
+            if (result.success) {
+                messageDiv.innerHTML = `<div class="success-message">
+                    <i class="fas fa-check"></i> ${result.message}
+                </div>`;
+                setTimeout(() => loadServerStatus(), 2000);
+            } else {
+                messageDiv.innerHTML = `<div class="error-message">
+                    <i class="fas fa-times"></i> خطا: ${result.error}
+                </div>`;
+            }
+        }, 1000);
+    })
+    .catch(error => {
+        progressDiv.style.display = 'none';
+        console.error('Error installing Hysteria:', error);
+        messageDiv.innerHTML = '<div class="error-message"><i class="fas fa-times"></i> خطا در نصب</div>';
+    });
+}
+
+// Setup server
+document.getElementById('serverSetupForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+    
+    const data = {
+        port: parseInt(document.getElementById('server_port').value),
+        password: document.getElementById('server_password').value.trim(),
+        domain: document.getElementById('server_domain').value.trim()
+    };
+
+    document.getElementById('serverSetupMessage').innerHTML = '<p style="color: #f39c12;">در حال راه‌اندازی سرور...</p>';
+
+    fetch('/api/server/setup', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            document.getElementById('serverSetupMessage').innerHTML = 
+                `<div class="success-message">
+                    <i class="fas fa-check"></i> ${result.message}<br>
+                    <strong>IP سرور:</strong> ${result.server_info.ip}<br>
+                    <strong>پورت:</strong> ${result.server_info.port}<br>
+                    <strong>رمز عبور:</strong> ${result.server_info.password}
+                </div>`;
+            
+            // Refresh server status
+            setTimeout(() => {
+                loadServerStatus();
+            }, 2000);
+        } else {
+            document.getElementById('serverSetupMessage').innerHTML = 
+                `<div class="error-message"><i class="fas fa-times"></i> خطا: ${result.error}</div>`;
+        }
+    })
+    .catch(error => {
+        console.error('Error setting up server:', error);
+        document.getElementById('serverSetupMessage').innerHTML = 
+            '<div class="error-message"><i class="fas fa-times"></i> خطا در راه‌اندازی سرور</div>';
+    });
+});
+
+// Load client status
+function loadStatus() {
+    fetch('/api/status')
+        .then(response => response.json())
+        .then(data => {
+            displayStatus(data);
+        })
+        .catch(error => {
+            console.error('Error loading status:', error);
+            showError('خطا در بارگیری وضعیت');
+        });
+}
+
+// Load 7-day availability summaries
+function loadAvailability() {
+    fetch('/api/availability')
+        .then(response => response.json())
+        .then(data => {
+            availability = data.clients || {};
+            if (lastStatus) {
+                displayStatus(lastStatus);
+            }
+        })
+        .catch(error => {
+            console.error('Error loading availability:', error);
+        });
+}
+
+// Format seconds as a short duration
+function formatDuration(seconds) {
+    if (seconds === null || seconds === undefined) return '-';
+    if (seconds < 60) return `${Math.round(seconds)}s`;
+    if (seconds < 3600) return `${Math.round(seconds / 60)}m`;
+    if (seconds < 86400) return `${(seconds / 3600).toFixed(1)}h`;
+    return `${(seconds / 86400).toFixed(1)}d`;
+}
+
+// Availability line for a client card
+function availabilityText(clientId) {
+    const summary = availability[clientId];
+    if (!summary || summary.uptime_percent === null) return '';
+    return `
+        <p title="MTBF: ${formatDuration(summary.mtbf_seconds)} | MTTR: ${formatDuration(summary.mttr_seconds)}">
+            دسترس‌پذیری ۷ روز: ${summary.uptime_percent.toFixed(2)}% (قطعی: ${summary.outages})
+        </p>`;
+}
+
+// Connection line for a client card
+function socketsText(sockets, clientId) {
+    const stats = sockets && sockets.clients ? sockets.clients[clientId] : null;
+    if (!stats) return '';
+    const socks = stats.socks;
+    const queued = socks.accept_queue + socks.rx_queue + socks.tx_queue;
+    const drops = stats.quic ? stats.quic.drops : null;
+    return `
+        <p title="Accept queue: ${socks.accept_queue} | RX: ${socks.rx_queue} B | TX: ${socks.tx_queue} B | UDP drops: ${drops === null ? '-' : drops}">
+            اتصالات: ${socks.established}${queued > 0 ? ' (صف: ' + queued + ')' : ''}${drops > 0 ? ' ⚠️' : ''}
+        </p>`;
+}
+
+// Format bytes as a short size
+function formatBytes(bytes) {
+    if (bytes === null || bytes === undefined) return '-';
+    if (bytes < 1024) return `${bytes} B`;
+    if (bytes < 1048576) return `${(bytes / 1024).toFixed(1)} KB`;
+    return `${(bytes / 1048576).toFixed(1)} MB`;
+}
+
+// Resource line for a client card
+function resourcesText(resources, unit) {
+    const point = resources ? resources[unit] : null;
+    if (!point) return '';
+    const cpu = point.cpu_percent === null ? '-' : `${point.cpu_percent.toFixed(1)}%`;
+    return `
+        <p title="Peak: ${formatBytes(point.memory_peak)} | Read: ${formatBytes(point.read_bps)}/s | Write: ${formatBytes(point.write_bps)}/s">
+            CPU: ${cpu} | حافظه: ${formatBytes(point.memory_current)}
+        </p>`;
+}
+
+// Display client status
+function displayStatus(data) {
+    const container = document.getElementById('clientsStatus');
+    const systemContainer = document.getElementById('systemInfo');
+    const serviceButtons = document.getElementById('serviceButtons');
+    lastStatus = data;
+    
+    // Display clients
+    container.innerHTML = '';
+    serviceButtons.innerHTML = '';
+    
+    Object.entries(data.clients).forEach(([clientId, client]) => {
+        const statusClass = `status-${client.status}`;
+        const statusIcon = client.status === 'online' ? '✅' : 
+                         client.status === 'offline' ? '❌' : '⚠️';
+        const statusText = client.status === 'online' ? 'آنلاین' : 
+                         client.status === 'offline' ? 'آفلاین' : 'نامشخص';
+        
+        // Client status card
+        const canDelete = !['client1', 'client2'].includes(clientId);
+        container.innerHTML += `
+            <div class="status-item ${statusClass}">
+                ${canDelete ? `
+                <div class="client-actions">
+                    <button class="btn-small" onclick="deleteClient('${clientId}')" title="حذف کلاینت">
+                        <i class="fas fa-trash"></i>
+                    </button>
+                </div>` : ''}
+                <h4>${statusIcon} ${client.name}</h4>
+                <p>سرور: ${client.server}</p>
+                <p>پورت SOCKS5: ${client.port}</p>
+                <p>${statusText}</p>
+                ${availabilityText(clientId)}
+                ${socketsText(data.sockets, clientId)}
+                ${resourcesText(data.resources, client.service)}
+            </div>
+        `;
+
+        // Service restart button
+        serviceButtons.innerHTML += `
+            <button class="btn-restart" onclick="restartService('${clientId}')">
+                <i class="fas fa-redo"></i> راه‌اندازی مجدد ${client.name}
+            </button>
+        `;
+    });
+
+    // Add server and monitor restart buttons
+    serviceButtons.innerHTML += `
+        <button class="btn-restart" onclick="restartService('server')">
+            <i class="fas fa-redo"></i> راه‌اندازی مجدد سرور
+        </button>
+        <button class="btn-restart" onclick="restartService('monitor')">
+            <i class="fas fa-redo"></i> راه‌اندازی مجدد مانیتور
+        </button>
+    `;
+
+    // Display system info
+    systemContainer.innerHTML = `
+        <div>
+            <strong>مدت فعالیت:</strong>
+            <span>${data.system.uptime}</span>
+        </div>
+        <div>
+            <strong>آخرین بروزرسانی:</strong>
+            <span>${new Date(data.timestamp).toLocaleString('fa-IR')}</span>
+        </div>
+    `;
+}
+
+// Load clients list for management
+function loadClientsList() {
+    fetch('/api/clients')
+        .then(response => response.json())
+        .then(clients => {
+            const container = document.getElementById('clientsList');
+            container.innerHTML = '';
+
+            Object.entries(clients).forEach(([clientId, client]) => {
+                const canDelete = !['client1', 'client2'].includes(clientId);
+                const statusColor = client.status === 'online' ? '#27ae60' : 
+                                  client.status === 'offline' ? '#e74c3c' : '#f39c12';
+
+                container.innerHTML += `
+                    <div style="background: #f8f9fa; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
+                        <div style="display: flex; justify-content: space-between; align-items: center;">
+                            <div>
+                                <h4 style="color: ${statusColor};">${client.name}</h4>
+                                <p><strong>سرور:</strong> ${client.server}</p>
+                                <p><strong>پورت SOCKS5:</strong> ${client.port}</p>
+                                <p><strong>سرویس:</strong> ${client.service}</p>
+                            </div>
+                            <div>
+                                ${canDelete ? `
+                                <button class="btn-danger btn-small" onclick="deleteClient('${clientId}')">
+                                    <i class="fas fa-trash"></i> حذف
+                                </button>` : `
+                                <span style="color: #666; font-size: 0.9rem;">کلاینت پیش‌فرض</span>`}
+                            </div>
+                        </div>
+                    </div>
+                `;
+            });
+
+            if (Object.keys(clients).length === 0) {
+                container.innerHTML = '<p style="text-align: center; color: #666;">هیچ کلاینتی یافت نشد</p>';
+            }
+        })
+        .catch(error => {
+            console.error('Error loading clients:', error);
+            document.getElementById('clientsList').innerHTML = '<p style="color: red;">خطا در بارگیری کلاینت‌ها</p>';
+        });
+}
+
+// Add new client
+document.getElementById('addClientForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+    
+    const data = {
+        server_ip: document.getElementById('client_server_ip').value.trim(),
+        server_port: parseInt(document.getElementById('client_server_port').value),
+        password: document.getElementById('client_password').value.trim(),
+        custom_port: document.getElementById('client_custom_port').value ? parseInt(document.getElementById('client_custom_port').value) : null
+    };
+
+    document.getElementById('addClientMessage').innerHTML = '<p style="color: #f39c12;">در حال ایجاد کلاینت...</p>';
+
+    fetch('/api/clients', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(data)
+    })
+    .then(response => response.json())
+    .then(result => {
+        if (result.success) {
+            document.getElementById('addClientMessage').innerHTML = 
+                `<div class="success-message">
+                    <i class="fas fa-check"></i> ${result.message}<br>
+                    <strong>پورت SOCKS5:</strong> ${result.socks_port}
+                </div>`;
+            
+            // Reset form
+            document.getElementById('addClientForm').reset();
+            document.getElementById('client_server_port').value = '443';
+            
+            // Refresh status
+            setTimeout(() => {
+                loadStatus();
+                loadClientsList();
+            }, 2000);
+        } else {
+            document.getElementById('addClientMessage').innerHTML = 
+                `<div class="error-message"><i class="fas fa-times"></i> خطا: ${result.error}</div>`;
+        }
+    })
+    .catch(error => {
+        console.error('Error adding client:', error);
+        document.getElementById('addClientMessage').innerHTML = 
+            '<div class="error-message"><i class="fas fa-times"></i> خطا در ایجاد کلاینت</div>';
+    });
+});
+
+// Delete client
+function deleteClient(clientId) {
+    clientToDelete = clientId;
+    document.getElementById('deleteModal').style.display = 'block';
+}
+
+function confirmDelete() {
+    if (clientToDelete) {
+        fetch(`/api/clients/${clientToDelete}`, {
+            method: 'DELETE'
+        })
+        .then(response => response.json())
+        .then(result => {
+            if (result.success) {
+                loadStatus();
+                loadClientsList();
+                showMessage(result.message, 'success');
+            } else {
+                showMessage('خطا: ' + result.error, 'error');
+            }
+        })
+        .catch(error => {
+            console.error('Error deleting client:', error);
+            showMessage('خطا در حذف کلاینت', 'error');
+        });
+    }
+    closeDeleteModal();
+}
+
+function closeDeleteModal() {
+    document.getElementById('deleteModal').style.display = 'none';
+    clientToDelete = null;
+}
+
+// Close modal when clicking outside
+window.onclick = function(event) {
+    const modal = document.getElementById('deleteModal');
+    if (event.target == modal) {
+        closeDeleteModal();
+    }
+}
+
+// Show message
+function showMessage(message, type) {
+    const messageClass = type === 'success' ? 'success-message' : 'error-message';
+    const icon = type === 'success' ? 'fas fa-check' : 'fas fa-times';
+    
+    const messageDiv = document.createElement('div');
+    messageDiv.className = messageClass;
+    messageDiv.innerHTML = `<i class="${icon}"></i> ${message}`;
+    messageDiv.style.position = 'fixed';
+    messageDiv.style.top = '20px';
+    messageDiv.style.right = '20px';
+    messageDiv.style.zIndex = '9999';
+    messageDiv.style.minWidth = '300px';
+    
+    document.body.appendChild(messageDiv);
+    
+    setTimeout(() => {
+        messageDiv.remove();
+    }, 5000);
+}
+
+// Load logs
+function loadLogs() {
+    const lines = document.getElementById('logLines').value;
+    const filter = document.getElementById('logFilter').value;
+    
+    fetch(`/api/logs?lines=${lines}&filter=${encodeURIComponent(filter)}`)
+        .then(response => response.json())
+        .then(data => {
+            displayLogs(data);
+            updateStats(data.total_lines, data.filtered_lines);
+        })
+        .catch(error => {
+            console.error('Error loading logs:', error);
+            showError('خطا در بارگیری لاگ‌ها');
+        });
+}
+
+// Display logs
+function displayLogs(data) {
+    const container = document.getElementById('logsContainer');
+    
+    if (data.error) {
+        container.innerHTML = `<div class="error-message">${data.error}</div>`;
+        return;
+    }
+    
+    container.innerHTML = '';
+    data.logs.forEach(log => {
+        const logEntry = document.createElement('div');
+        logEntry.className = `log-entry log-${log.type}`;
+        logEntry.innerHTML = `
+            <span class="log-timestamp">${log.timestamp}</span>
+            ${log.message}
+        `;
+        container.appendChild(logEntry);
+    });
+    
+    // Scroll to bottom
+    container.scrollTop = container.scrollHeight;
+}
+
+// Update statistics
+function updateStats(total, filtered) {
+    document.getElementById('totalLogs').textContent = total;
+    document.getElementById('filteredLogs').textContent = filtered;
+    document.getElementById('lastUpdate').textContent = new Date().toLocaleTimeString('fa-IR');
+}
+
+// Connect to Server-Sent Events for real-time logs
+function connectEventSource() {
+    if (eventSource) {
+        eventSource.close();
+    }
+    
+    eventSource = new EventSource('/api/logs/stream');
+    
+    eventSource.onmessage = function(event) {
+        const log = JSON.parse(event.data);
+        
+        if (log.error) {
+            console.error('Stream error:', log.error);
+            return;
+        }
+        
+        // Add new log entry
+        const container = document.getElementById('logsContainer');
+        const logEntry = document.createElement('div');
+        logEntry.className = `log-entry log-${log.type}`;
+        logEntry.innerHTML = `
+            <span class="log-timestamp">${log.timestamp}</span>
+            ${log.message}
+        `;
+        container.appendChild(logEntry);
+        
+        // Scroll to bottom
+        container.scrollTop = container.scrollHeight;
+        
+        // Update last update time
+        document.getElementById('lastUpdate').textContent = new Date().toLocaleTimeString('fa-IR');
+    };
+    
+    eventSource.onerror = function() {
+        console.error('EventSource connection error');
+        setTimeout(connectEventSource, 5000); // Reconnect after 5 seconds
+    };
+}
+
+// Start auto refresh
+function startAutoRefresh() {
+    refreshInterval = setInterval(() => {
+        if (autoRefresh) {
+            loadStatus();
+            if (document.getElementById('server').classList.contains('active')) {
+                loadServerStatus();
+            }
+            if (document.getElementById('fleet').classList.contains('active')) {
+                loadFleet();
+            }
+        }
+    }, 10000); // Refresh every 10 seconds
+
+    setInterval(() => {
+        if (autoRefresh) {
+            loadAvailability();
+        }
+    }, 60000); // Availability changes slowly, refresh every minute
+}
+
+// Toggle auto refresh
+function toggleAutoRefresh() {
+    autoRefresh = !autoRefresh;
+    const btn = document.getElementById('autoRefreshBtn');
+    
+    if (autoRefresh) {
+        btn.innerHTML = '<i class="fas fa-pause"></i> توقف خودکار';
+    } else {
+        btn.innerHTML = '<i class="fas fa-play"></i> شروع خودکار';
+    }
+}
+
+// Clear logs display
+function clearLogs() {
+    document.getElementById('logsContainer').innerHTML = '';
+    updateStats(0, 0);
+}
+
+// Restart service
+function restartService(client) {
+    if (!confirm('آیا از راه‌اندازی مجدد این سرویس اطمینان دارید؟')) {
+        return;
+    }
+    
+    fetch(`/api/restart/${client}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showMessage(data.success, 'success');
+                waitForOperation(data.operation.id, client);
+            } else {
+                showMessage('خطا: ' + data.error, 'error');
+            }
+        })
+        .catch(error => {
+            console.error('Error restarting service:', error);
+            showMessage('خطا در راه‌اندازی مجدد سرویس', 'error');
+        });
+}
+
+// Follow a queued service operation until it finishes
+function waitForOperation(operationId, client) {
+    fetch(`/api/operations/${operationId}?wait=20`)
+        .then(response => response.json())
+        .then(operation => {
+            if (operation.state === 'queued' || operation.state === 'running') {
+                waitForOperation(operationId, client);
+                return;
+            }
+            if (operation.state === 'done') {
+                showMessage(`${operation.unit} restarted successfully`, 'success');
+            } else {
+                showMessage('خطا: ' + (operation.error || 'Operation failed'), 'error');
+            }
+            loadStatus();
+            if (client === 'server') {
+                loadServerStatus();
+            }
+        })
+        .catch(error => {
+            console.error('Error checking operation:', error);
+        });
+}
+
+// Show error message
+function showError(message) {
+    const container = document.getElementById('logsContainer');
+    container.innerHTML = `<div class="error-message">${message}</div>`;
+}
+
+// Event listeners
+document.getElementById('logLines').addEventListener('change', loadLogs);
+document.getElementById('logFilter').addEventListener('input', debounce(loadLogs, 500));
+
+// Close modal with X button
+document.querySelector('.close').onclick = function() {
+    closeDeleteModal();
+}
+
+// Debounce function
+function debounce(func, wait) {
+    let timeout;
+    return function executedFunction(...args) {
+        const later = () => {
+            clearTimeout(timeout);
+            func(...args);
+        };
+        clearTimeout(timeout);
+        timeout = setTimeout(later, wait);
+    };
+}
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Precompressed, content-hashed static assets
+فایل‌های استاتیک نسخه‌دار و از پیش فشرده
+
+At startup every file under static/ gets a content-hash filename
+(dashboard.3f2a9c1b7d4e.css) and is compressed once with gzip and, when the
+brotli module is installed, brotli. Hashed URLs never change content, so
+they are served with immutable cache headers.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+def compress_variants(content):
+    """Precompressed variants of content by encoding"""
+    variants = {"identity": content, "gzip": gzip.compress(content, compresslevel=9)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(content, quality=11)
+    # Tiny files can grow when compressed
+    return {encoding: data for encoding, data in variants.items()
+            if encoding == "identity" or len(data) < len(content)}
+
+
+def negotiate(variants):
+    """Pick the best encoding the client accepts"""
+    accepted = request.headers.get('Accept-Encoding', '').lower()
+    for encoding in ("br", "gzip"):
+        if encoding in variants and encoding in accepted:
+            return encoding
+    return "identity"
+
+
+def encoded_response(variants, mimetype, etag, cache_control):
+    """Response for precompressed variants, 304 if the ETag matches"""
+    encoding = negotiate(variants)
+    etag = f'"{etag}-{encoding}"'
+
+    if etag in request.headers.get('If-None-Match', ''):
+        response = Response(status=304)
+    else:
+        response = Response(variants[encoding], mimetype=mimetype)
+        if encoding != "identity":
+            response.headers['Content-Encoding'] = encoding
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+class StaticAssetPipeline:
+    def __init__(self, static_dir, url_prefix="/assets"):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix
+        self.assets = {}
+        self.manifest = {}
+
+    def build(self):
+        """Hash and precompress every static file"""
+        self.assets = {}
+        self.manifest = {}
+        for root, _, files in os.walk(self.static_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.static_dir).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    content = f.read()
+
+                digest = hashlib.sha256(content).hexdigest()[:12]
+                base, ext = os.path.splitext(name)
+                versioned = f"{base}.{digest}{ext}"
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+                self.assets[versioned] = {
+                    "variants": compress_variants(content),
+                    "mimetype": mimetype,
+                    "etag": digest
+                }
+                self.manifest[name] = versioned
+        return self.manifest
+
+    def asset_url(self, name):
+        """Versioned URL of a static file (for templates)"""
+        return f"{self.url_prefix}/{self.manifest.get(name, name)}"
+
+    def serve(self, filename):
+        """Response for a versioned asset (None if unknown)"""
+        asset = self.assets.get(filename)
+        if not asset:
+            return None
+        return encoded_response(asset["variants"], asset["mimetype"], asset["etag"], IMMUTABLE_CACHE)
+
+
+class PageCache:
+    def __init__(self):
+        self.pages = {}
+
+    def get(self, name, render):
+        """Render a page once and keep its precompressed variants"""
+        page = self.pages.get(name)
+        if page is None:
+            content = render().encode('utf-8')
+            page = {
+                "variants": compress_variants(content),
+                "etag": hashlib.sha256(content).hexdigest()[:12]
+            }
+            self.pages[name] = page
+        # The shell references hashed assets, so browsers only revalidate it
+        return encoded_response(page["variants"], 'text/html', page["etag"], "no-cache")
+
+    def clear(self):
+        self.pages = {}
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Shared test setup
+تنظیمات مشترک تست‌ها
+
+app.py reads its paths from the environment at import time, so every path
+is pointed at a temporary directory before the app is imported.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(TESTS_DIR, "fixtures")
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+
+STATE_DIR = tempfile.mkdtemp(prefix="hysteria-web-tests-")
+for name, path in {
+    "LOG_FILE": "hysteria-monitor.log",
+    "HYSTERIA_DIR": "hysteria",
+    "CLIENTS_FILE": "clients.json",
+    "SERVER_FILE": "server.json",
+    "SYSTEMD_DIR": "systemd",
+    "AVAILABILITY_DB": "availability.db",
+    "JOURNAL_CURSOR": "journal.cursor",
+    "JOURNAL_ENTRIES": "journal.entries",
+    "FLEET_FILE": "fleet.json",
+    "IMPORT_DIR": "imports",
+    "SYSCTL_DROPIN": "sysctl.d/99-hysteria-web.conf",
+    "CGROUP_ROOT": "cgroup",
+    "PROC_ROOT": "proc",
+    "SYS_ROOT": "sys"
+}.items():
+    os.environ.setdefault(f"HYSTERIA_WEB_{name}", os.path.join(STATE_DIR, path))
+os.environ.setdefault("HYSTERIA_WEB_JOURNALCTL", os.path.join(FIXTURES_DIR, "journalctl"))
+os.environ.setdefault("HYSTERIA_WEB_ETHTOOL", os.path.join(FIXTURES_DIR, "ethtool"))
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def systemctl(tmp_path, monkeypatch):
+    """Stand-in systemctl first on PATH, returns its recorded calls"""
+    args_log = tmp_path / "systemctl-args.log"
+    monkeypatch.setenv("PATH", FIXTURES_DIR + os.pathsep + os.environ.get("PATH", ""))
+    monkeypatch.setenv("SYSTEMCTL_ARGS_LOG", str(args_log))
+
+    def calls():
+        if not args_log.exists():
+            return []
+        with open(args_log, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    return calls
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for availability accounting across monitor gaps
+"""
+
+import pytest
+
+from availability import AvailabilityRecorder, UNMONITORED
+
+HOUR = 3600
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "availability.db")
+
+
+def test_uptime_from_transitions(db_file):
+    recorder = AvailabilityRecorder(db_file)
+    recorder.observe("client1", "online", ts=0)
+    recorder.observe("client1", "offline", "proxy not responding", ts=3 * HOUR)
+    recorder.observe("client1", "online", ts=4 * HOUR)
+
+    summary = recorder.get_availability("client1", 0, 8 * HOUR)
+    assert summary["uptime_seconds"] == 7 * HOUR
+    assert summary["downtime_seconds"] == HOUR
+    assert summary["failures"] == 1
+    assert summary["mttr_seconds"] == HOUR
+    assert summary["outages"][0]["reason"] == "proxy not responding"
+
+
+def test_last_state_is_not_stretched_past_heartbeat(db_file):
+    recorder = AvailabilityRecorder(db_file, heartbeat_timeout=90)
+    recorder.observe("client1", "online", ts=0)
+    recorder.beat(ts=2 * HOUR)
+
+    summary = recorder.get_availability("client1", 0, 24 * HOUR)
+    assert summary["uptime_seconds"] == 2 * HOUR
+    assert summary["observed_seconds"] == 2 * HOUR
+    assert summary["unobserved_seconds"] == 22 * HOUR
+    assert summary["uptime_percent"] == 100
+
+    # Within the timeout the current state still counts
+    summary = recorder.get_availability("client1", 0, 2 * HOUR + 60)
+    assert summary["observed_seconds"] == 2 * HOUR + 60
+
+
+def test_restart_marks_gap_since_last_heartbeat(db_file):
+    recorder = AvailabilityRecorder(db_file, heartbeat_timeout=90)
+    recorder.observe("client1", "offline", "service stopped", ts=0)
+    recorder.beat(ts=HOUR)
+
+    # Crash without a stop marker, restart five hours later
+    restarted = AvailabilityRecorder(db_file, heartbeat_timeout=90)
+    assert restarted.heartbeat == HOUR
+    restarted.mark_started()
+    assert restarted.states["client1"] == UNMONITORED
+    restarted.observe("client1", "offline", "service stopped", ts=6 * HOUR)
+    restarted.observe("client1", "online", ts=7 * HOUR)
+    restarted.beat(ts=8 * HOUR)
+
+    summary = restarted.get_availability("client1", 0, 8 * HOUR, include_transitions=True)
+    assert summary["downtime_seconds"] == 2 * HOUR
+    assert summary["uptime_seconds"] == HOUR
+    assert summary["unobserved_seconds"] == 5 * HOUR
+    # The gap splits the outage and hides whether it recovered in between
+    assert [(o["start"], o["end"]) for o in summary["outages"]] == [(0, HOUR), (6 * HOUR, 7 * HOUR)]
+    assert summary["transitions"][1] == {"ts": HOUR, "old_state": "offline",
+                                         "new_state": UNMONITORED,
+                                         "reason": "monitor was not running"}
+
+
+def test_stop_marker_ends_observation(db_file):
+    recorder = AvailabilityRecorder(db_file)
+    recorder.observe("client1", "offline", ts=0)
+    recorder.observe("client2", "online", ts=0)
+    recorder.mark_unmonitored("monitor stopped", ts=HOUR)
+
+    for client_id in ("client1", "client2"):
+        summary = recorder.get_availability(client_id, 0, 3 * HOUR)
+        assert summary["observed_seconds"] == HOUR
+    offline = recorder.get_availability("client1", 0, 3 * HOUR)
+    assert offline["outages"][0]["ongoing"] is False
+
+
+def test_sampler_records_states_and_heartbeat(app_module, monkeypatch, tmp_path):
+    recorder = AvailabilityRecorder(str(tmp_path / "sampler.db"), heartbeat_timeout=90)
+    monkeypatch.setattr(app_module.monitor, "availability", recorder)
+    monkeypatch.setattr(app_module.monitor, "get_service_status", lambda service: "running")
+    monkeypatch.setattr(app_module.monitor, "test_proxy", lambda port: True)
+
+    app_module.monitor.sample_availability()
+    assert recorder.heartbeat is not None
+    assert set(recorder.states.values()) == {"online"}
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for per-unit cgroup v2 resource sampling against a fake tree
+"""
+
+import os
+
+import pytest
+
+import cgroup_stats
+from cgroup_stats import UnitResourceCollector
+
+MIB = 1024 * 1024
+
+
+class Clock:
+    """Stand-in for the time module with a clock the test advances"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1760000000.0 + self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cgroup_stats, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cgroup(tmp_path):
+    """Writes the accounting files of a unit"""
+    root = tmp_path / "cgroup"
+
+    def write_unit(unit, usage_usec, memory, peak, rbytes=0, wbytes=0, rios=0, wios=0):
+        path = root / "system.slice" / f"{unit}.service"
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "cpu.stat").write_text(
+            f"usage_usec {usage_usec}\nuser_usec {usage_usec * 3 // 4}\n"
+            f"system_usec {usage_usec // 4}\nnr_periods 0\nnr_throttled 0\nthrottled_usec 0\n")
+        (path / "memory.current").write_text(f"{memory}\n")
+        (path / "memory.peak").write_text(f"{peak}\n")
+        # Two devices, summed
+        (path / "io.stat").write_text(
+            f"8:0 rbytes={rbytes // 2} wbytes={wbytes // 2} rios={rios // 2} wios={wios // 2} dbytes=0 dios=0\n"
+            f"259:0 rbytes={rbytes - rbytes // 2} wbytes={wbytes - wbytes // 2} "
+            f"rios={rios - rios // 2} wios={wios - wios // 2} dbytes=0 dios=0\n")
+    write_unit.root = str(root)
+    return write_unit
+
+
+@pytest.fixture
+def units():
+    return ["hysteria-server", "hysteria-client"]
+
+
+@pytest.fixture
+def collector(cgroup, units):
+    return UnitResourceCollector(lambda: list(units), cgroup.root, interval=10, history_size=3)
+
+
+def test_rates_from_counter_deltas(collector, cgroup, clock):
+    cgroup("hysteria-server", 1000000, 20 * MIB, 24 * MIB, rbytes=1000, wbytes=4000, rios=2, wios=8)
+    first = collector.sample()["hysteria-server"]
+    assert first["cpu_percent"] is None
+    assert first["memory_current"] == 20 * MIB
+    assert collector.get_history("hysteria-server") == []
+
+    # 10 s later: 2.5 s of CPU, 10 MB read, 20 MB written, 300 I/Os
+    clock.sleep(10)
+    cgroup("hysteria-server", 3500000, 30 * MIB, 32 * MIB,
+           rbytes=10001000, wbytes=20004000, rios=102, wios=208)
+    point = collector.sample()["hysteria-server"]
+
+    assert point["cpu_percent"] == 25.0
+    assert point["read_bps"] == 1000000
+    assert point["write_bps"] == 2000000
+    assert point["iops"] == 30.0
+    assert point["memory_current"] == 30 * MIB
+    assert point["memory_peak"] == 32 * MIB
+    assert collector.get_history("hysteria-server") == [point]
+
+
+def test_unit_restart_resets_the_rates(collector, cgroup, clock):
+    cgroup("hysteria-client", 5000000, 20 * MIB, 40 * MIB, rbytes=5000000, rios=500)
+    collector.sample()
+    clock.sleep(10)
+    cgroup("hysteria-client", 6000000, 20 * MIB, 40 * MIB, rbytes=6000000, rios=600)
+    assert collector.sample()["hysteria-client"]["cpu_percent"] == 10.0
+
+    # Restarted: counters start from zero again
+    clock.sleep(10)
+    cgroup("hysteria-client", 200000, 8 * MIB, 8 * MIB, rbytes=1000, rios=1)
+    point = collector.sample()["hysteria-client"]
+    assert point["cpu_percent"] is None
+    assert point["read_bps"] is None
+    assert point["memory_peak"] == 8 * MIB
+    assert len(collector.get_history("hysteria-client")) == 1
+
+    # The next sample measures from the restarted counters
+    clock.sleep(10)
+    cgroup("hysteria-client", 700000, 8 * MIB, 8 * MIB, rbytes=101000, rios=11)
+    point = collector.sample()["hysteria-client"]
+    assert point["cpu_percent"] == 5.0
+    assert point["read_bps"] == 10000
+    assert point["iops"] == 1.0
+
+
+def test_history_is_bounded_and_pruned(collector, cgroup, clock, units):
+    for usage in range(0, 6000000, 1000000):
+        cgroup("hysteria-server", usage, MIB, MIB)
+        cgroup("hysteria-client", usage, MIB, MIB)
+        collector.sample()
+        clock.sleep(10)
+    history = collector.get_history("hysteria-server")
+    assert len(history) == 3
+    assert [point["timestamp"] for point in history] == [1760001030.0, 1760001040.0, 1760001050.0]
+    assert len(collector.get_history("hysteria-server", since=1760001045.0)) == 1
+
+    # A stopped unit keeps its history, a removed one is forgotten
+    os.rename(os.path.join(cgroup.root, "system.slice", "hysteria-server.service"),
+              os.path.join(cgroup.root, "stopped"))
+    units.remove("hysteria-client")
+    current = collector.sample()
+    assert current == {}
+    assert len(collector.get_history("hysteria-server")) == 3
+    assert collector.get_history("hysteria-client") == []
+    assert set(collector.counters) == set()
+
+
+def test_current_values_are_resampled_when_stale(collector, cgroup, clock):
+    cgroup("hysteria-server", 0, MIB, MIB)
+    assert "hysteria-server" in collector.get_current()
+    cgroup("hysteria-client", 0, MIB, MIB)
+    # Within the interval the cached sample is returned
+    clock.sleep(5)
+    assert "hysteria-client" not in collector.get_current()
+    clock.sleep(5)
+    assert "hysteria-client" in collector.get_current()
+
+
+def test_resources_endpoint(client, app_module, collector, cgroup, clock, monkeypatch):
+    monkeypatch.setattr(app_module, "resource_collector", collector)
+    cgroup("hysteria-server", 0, MIB, MIB)
+    collector.sample()
+    clock.sleep(10)
+    cgroup("hysteria-server", 1000000, MIB, MIB)
+
+    units = client.get('/api/resources').get_json()["units"]
+    assert units["hysteria-server"]["cpu_percent"] == 10.0
+    points = client.get('/api/resources/server').get_json()["points"]
+    assert [point["cpu_percent"] for point in points] == [10.0]
+    assert client.get('/api/resources/server?since=bad').status_code == 400
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for fleet aggregation against several local agent instances
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+import requests
+from werkzeug.serving import make_server
+
+from fleet import FleetAggregator
+
+TOKEN = "agent-test-token"
+TIMEOUT = 0.5
+REFRESH_INTERVAL = 0.2
+
+
+@pytest.fixture
+def agent_mode(app_module, monkeypatch):
+    """Agent API enabled with cheap service probes"""
+    monkeypatch.setattr(app_module, "AGENT_TOKEN", TOKEN)
+    monkeypatch.setattr(app_module.monitor, "get_service_status", lambda service: "running")
+    monkeypatch.setattr(app_module.monitor, "test_proxy", lambda port: True)
+    return app_module
+
+
+@pytest.fixture
+def start_agent(agent_mode):
+    """Start threaded instances of the app, returns (url, stop)"""
+    servers = []
+
+    def start():
+        server = make_server('127.0.0.1', 0, agent_mode.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append(server)
+
+        def stop():
+            if server in servers:
+                servers.remove(server)
+                server.shutdown()
+                server.server_close()
+        return f"http://127.0.0.1:{server.server_port}", stop
+
+    yield start
+    for server in list(servers):
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def silent_node():
+    """A node that accepts connections but never answers"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(16)
+    yield f"http://127.0.0.1:{listener.getsockname()[1]}"
+    listener.close()
+
+
+@pytest.fixture
+def aggregator(agent_mode, monkeypatch, tmp_path):
+    fleet = FleetAggregator(str(tmp_path / "fleet.json"), TIMEOUT, REFRESH_INTERVAL)
+    monkeypatch.setattr(agent_mode, "fleet", fleet)
+    yield fleet
+    fleet.executor.shutdown(wait=False)
+
+
+def test_fleet_aggregates_all_agents(client, start_agent, aggregator):
+    for name in ("node-a", "node-b", "node-c"):
+        url, _ = start_agent()
+        response = client.post('/api/fleet/nodes', json={"name": name, "url": url, "token": TOKEN})
+        assert response.status_code == 201
+
+    nodes = client.get('/api/fleet?refresh=1').get_json()["nodes"]
+    assert sorted(nodes) == ["node-a", "node-b", "node-c"]
+    for node in nodes.values():
+        assert node["online"] is True
+        assert node["stale"] is False
+        assert node["error"] is None
+        assert "token" not in node
+        status = node["status"]
+        assert status["node"] == socket.gethostname()
+        assert {client["status"] for client in status["clients"].values()} == {"online"}
+        assert all("password" not in client for client in status["clients"].values())
+
+
+def test_nodes_are_polled_concurrently_with_per_node_timeout(start_agent, silent_node, aggregator):
+    url, _ = start_agent()
+    aggregator.add_node("healthy", url, TOKEN)
+    for index in range(3):
+        aggregator.add_node(f"silent-{index}", silent_node, TOKEN)
+
+    started = time.time()
+    assert aggregator.refresh() == 4
+    elapsed = time.time() - started
+
+    # Three silent nodes cost one timeout, not three
+    assert elapsed < 2 * TIMEOUT + 0.5
+    fleet = aggregator.get_fleet()
+    assert fleet["healthy"]["online"] is True
+    for index in range(3):
+        node = fleet[f"silent-{index}"]
+        assert node["online"] is False
+        assert node["status"] is None
+        assert node["stale"] is True
+        assert node["latency_ms"] >= TIMEOUT * 1000 * 0.9
+
+
+def test_stopped_node_keeps_last_known_state(start_agent, aggregator):
+    url_a, _ = start_agent()
+    url_b, stop_b = start_agent()
+    aggregator.add_node("node-a", url_a, TOKEN)
+    aggregator.add_node("node-b", url_b, TOKEN)
+
+    aggregator.refresh()
+    before = aggregator.get_fleet()["node-b"]
+    assert before["online"] is True
+
+    stop_b()
+    time.sleep(2 * REFRESH_INTERVAL + 0.1)
+    aggregator.refresh()
+
+    fleet = aggregator.get_fleet()
+    assert fleet["node-a"]["online"] is True
+    assert fleet["node-a"]["stale"] is False
+    node = fleet["node-b"]
+    assert node["online"] is False
+    assert node["error"]
+    assert node["stale"] is True
+    assert node["status"] == before["status"]
+    assert node["fetched_at"] == before["fetched_at"]
+
+
+def test_node_with_wrong_token_is_reported(start_agent, aggregator):
+    url, _ = start_agent()
+    aggregator.add_node("node-a", url, "wrong-token")
+    aggregator.refresh()
+
+    node = aggregator.get_fleet()["node-a"]
+    assert node["online"] is False
+    assert "401" in node["error"]
+
+
+@pytest.mark.parametrize("header", [
+    None,
+    "Bearer wrong-token",
+    f"Token {TOKEN}",
+    f"XXXXXXX{TOKEN}",
+    f"bearer {TOKEN}",
+    "Bearer ",
+])
+def test_agent_rejects_bad_authorization(start_agent, header):
+    url, _ = start_agent()
+    headers = {"Authorization": header} if header is not None else {}
+    response = requests.get(f"{url}/api/agent/status", headers=headers, timeout=5)
+    assert response.status_code == 401
+
+
+def test_agent_accepts_token(start_agent):
+    url, _ = start_agent()
+    for path in ("status", "clients", "logs"):
+        response = requests.get(f"{url}/api/agent/{path}",
+                                headers={"Authorization": f"Bearer {TOKEN}"}, timeout=5)
+        assert response.status_code == 200
+
+
+def test_agent_api_disabled_without_token(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "AGENT_TOKEN", "")
+    response = client.get('/api/agent/status', headers={"Authorization": "Bearer "})
+    assert response.status_code == 404
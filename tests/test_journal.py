@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the incremental journald reader against a stand-in journalctl
+"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from journal import JournalReader
+
+UNITS = ['hysteria-server', 'hysteria-client', 'hysteria-client2']
+LAST_CURSOR = "s=7d1f;i=108;b=3a9c;m=1a32;t=5f1e2d3c4b5a8;x=18"
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    """Writable copy of the recorded entries and the stand-in's argument log"""
+    fixture = tmp_path / "journal.json"
+    shutil.copy(os.path.join(FIXTURES_DIR, "journal.json"), fixture)
+    args_log = tmp_path / "journalctl-args.log"
+    monkeypatch.setenv("JOURNAL_FIXTURE", str(fixture))
+    monkeypatch.setenv("JOURNAL_ARGS_LOG", str(args_log))
+
+    class Journal:
+        cursor_file = str(tmp_path / "journal.cursor")
+        entries_file = str(tmp_path / "journal.entries")
+
+        def reader(self, units=UNITS, **kwargs):
+            kwargs.setdefault("entries_file", self.entries_file)
+            return JournalReader(lambda: list(units), self.cursor_file,
+                                 os.path.join(FIXTURES_DIR, "journalctl"), **kwargs)
+
+        def append(self, unit, message, index):
+            record = {
+                "__CURSOR": f"s=7d1f;i={index};b=3a9c",
+                "__REALTIME_TIMESTAMP": str(1760000100000000 + index),
+                "PRIORITY": "6",
+                "_SYSTEMD_UNIT": f"{unit}.service",
+                "MESSAGE": message
+            }
+            with open(fixture, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+            return record["__CURSOR"]
+
+        def calls(self):
+            if not args_log.exists():
+                return []
+            with open(args_log, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f]
+
+    return Journal()
+
+
+def messages(reader, units=None):
+    return [entry["message"] for _, entry in reader.get_entries(units, lines=0)]
+
+
+def test_backfill_reads_entries_of_managed_units(journal):
+    reader = journal.reader()
+    assert reader.poll() == 7
+
+    assert messages(reader, ['hysteria-server']) == ['server up and running {"listen": ":443"}']
+    assert len(messages(reader, ['hysteria-client'])) == 1
+    # Non-UTF-8 messages arrive as byte arrays
+    assert messages(reader, ['hysteria-client2'])[-1] == "client � ready"
+    assert '--lines=1000' in journal.calls()[0]
+
+
+def test_systemd_messages_are_filed_under_their_unit(journal):
+    reader = journal.reader()
+    reader.poll()
+
+    client2 = messages(reader, ['hysteria-client2'])
+    assert "hysteria-client2.service: Main process exited, code=exited, status=1/FAILURE" in client2
+    assert "hysteria-client2.service: Failed with result 'exit-code'." in client2
+    assert "Started hysteria-client2.service - Hysteria2 Client 2." in client2
+    assert 'init.scope' not in reader.buffers
+
+    entry = reader.get_entries(['hysteria-client2'], lines=0)[0][1]
+    assert entry["type"] == "error"
+    assert entry["raw"].startswith("2025-")
+    assert "- hysteria-client2: failed to initialize client" in entry["raw"]
+
+
+def test_parse_entry_falls_back_to_the_emitting_unit():
+    reader = JournalReader(lambda: UNITS, "/nonexistent/cursor")
+    record = {"_SYSTEMD_UNIT": "init.scope", "UNIT": "cron.service", "MESSAGE": "Started cron"}
+    assert reader.parse_entry(record, set(UNITS))["unit"] == "init.scope"
+
+    record = {"_SYSTEMD_UNIT": "init.scope", "OBJECT_SYSTEMD_UNIT": "hysteria-server.service",
+              "MESSAGE": "Reloaded"}
+    assert reader.parse_entry(record, set(UNITS))["unit"] == "hysteria-server"
+
+
+def test_cursor_is_persisted_and_used_for_incremental_reads(journal):
+    reader = journal.reader()
+    reader.poll()
+    with open(journal.cursor_file, 'r', encoding='utf-8') as f:
+        assert f.read() == LAST_CURSOR
+
+    assert reader.poll() == 0
+    assert f'--after-cursor={LAST_CURSOR}' in journal.calls()[-1]
+
+    cursor = journal.append('hysteria-client', "connected to server", 200)
+    assert reader.poll() == 1
+    assert messages(reader, ['hysteria-client'])[-1] == "connected to server"
+    with open(journal.cursor_file, 'r', encoding='utf-8') as f:
+        assert f.read() == cursor
+
+
+def test_restart_resumes_after_saved_cursor(journal):
+    journal.reader().poll()
+    calls = len(journal.calls())
+
+    restarted = journal.reader()
+    assert restarted.cursor == LAST_CURSOR
+    assert restarted.backfilled
+    # Buffers come back from the entries file without running journalctl
+    assert len(journal.calls()) == calls
+    assert len(messages(restarted, ['hysteria-client2'])) == 5
+
+    # Nothing is parsed again, only what was logged after the cursor
+    journal.append('hysteria-server', "client connected", 201)
+    assert restarted.poll() == 1
+    assert journal.calls()[-1][3] == f'--after-cursor={LAST_CURSOR}'
+    assert all(not arg.startswith('--lines') for call in journal.calls()[calls:] for arg in call)
+    assert messages(restarted, ['hysteria-server'])[-1] == "client connected"
+
+
+def test_restart_without_entries_file_keeps_the_cursor(journal):
+    journal.reader().poll()
+    os.remove(journal.entries_file)
+
+    restarted = journal.reader()
+    assert restarted.poll() == 0
+    assert f'--after-cursor={LAST_CURSOR}' in journal.calls()[-1]
+    assert restarted.buffers == {}
+
+
+def test_entries_saved_after_the_cursor_are_not_duplicated(journal):
+    reader = journal.reader()
+    reader.poll()
+    # Crash between writing the entries and the cursor
+    with open(journal.cursor_file, 'w', encoding='utf-8') as f:
+        f.write("s=7d1f;i=105;b=3a9c;m=1a2f;t=5f1e2d3c4b5a5;x=15")
+    with open(journal.entries_file, 'a', encoding='utf-8') as f:
+        f.write('{"partial')
+
+    restarted = journal.reader()
+    assert restarted.poll() == 2
+    assert len(messages(restarted)) == 7
+
+
+def test_entries_file_is_compacted(journal):
+    reader = journal.reader(buffer_size=2)
+    reader.poll()
+    for index in range(200, 220):
+        journal.append('hysteria-server', f"line {index}", index)
+        reader.poll()
+
+    with open(journal.entries_file, 'r', encoding='utf-8') as f:
+        assert len(f.readlines()) <= 2 * len(messages(reader))
+    restarted = journal.reader(buffer_size=2)
+    assert messages(restarted, ['hysteria-server']) == ["line 218", "line 219"]
+
+
+def test_backfill_only_runs_in_the_background(journal):
+    reader = journal.reader()
+    assert reader.refresh() == 0
+    assert journal.calls() == []
+
+    assert reader.refresh(background=True) == 7
+    reader.last_poll = 0
+    journal.append('hysteria-client', "connected to server", 200)
+    assert reader.refresh() == 1
+
+
+def test_failed_backfill_is_retried(journal, monkeypatch):
+    reader = journal.reader()
+    monkeypatch.setenv("JOURNAL_FAIL", "1")
+    assert reader.poll() == 0
+    assert not reader.backfilled
+
+    monkeypatch.delenv("JOURNAL_FAIL")
+    assert reader.poll() == 7
+    assert all('--lines=1000' in call for call in journal.calls())
+
+
+def test_buffers_are_bounded_per_unit(journal):
+    reader = journal.reader(buffer_size=2)
+    reader.poll()
+    assert len(messages(reader, ['hysteria-client2'])) == 2
+    assert len(messages(reader, ['hysteria-server'])) == 1
+
+
+@pytest.fixture
+def app_journal(app_module, journal, monkeypatch):
+    """The app's journal reader replaced by one reading the recorded entries"""
+    reader = journal.reader(units=app_module.get_managed_units(), poll_interval=0.05)
+    reader.units_provider = app_module.get_managed_units
+    # What the background thread does after the start
+    reader.refresh(background=True)
+    monkeypatch.setattr(app_module, 'journal_reader', reader)
+    return reader
+
+
+def test_journal_view_per_client_and_unit(client, app_journal):
+    response = client.get('/api/journal?client=client2&lines=10')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["units"] == ['hysteria-client2']
+    assert [entry["unit"] for entry in data["logs"]] == ['hysteria-client2'] * 5
+    assert "Main process exited" in data["logs"][1]["message"]
+
+    data = client.get('/api/journal?client=server').get_json()
+    assert [entry["unit"] for entry in data["logs"]] == ['hysteria-server']
+
+    data = client.get('/api/journal?unit=hysteria-client&filter=CONNECTED').get_json()
+    assert data["filtered_lines"] == 1
+
+    data = client.get('/api/journal?lines=3').get_json()
+    assert len(data["logs"]) == 3
+    assert data["logs"][-1]["message"] == "client � ready"
+
+
+def test_journal_view_rejects_unknown_units(client, app_journal):
+    assert client.get('/api/journal?client=client99').status_code == 400
+    assert client.get('/api/journal?unit=sshd').status_code == 400
+
+
+def test_journal_stream_sends_new_entries_of_selected_client(client, app_journal, journal):
+    response = client.get('/api/journal/stream?client=client2', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = response.response
+
+    # Entries of other units only advance the stream position
+    journal.append('hysteria-server', "server reloaded", 300)
+    journal.append('hysteria-client2', "client2 reconnected", 301)
+
+    events = []
+    for _ in range(50):
+        chunk = next(chunks)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith('data: '):
+            events.append(json.loads(chunk[len('data: '):]))
+            break
+    response.close()
+
+    assert [event["message"] for event in events] == ["client2 reconnected"]
+    assert events[0]["unit"] == 'hysteria-client2'
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for following the monitor log across copy-truncate rotations
+"""
+
+import threading
+
+from log_segments import LogFollower, LogRotator
+
+
+def write_lines(path, start, count):
+    with open(path, 'a', encoding='utf-8') as f:
+        for i in range(start, start + count):
+            f.write(f"2025-01-01 12:00:00,000 - line {i:05d}\n")
+
+
+def expected(start, count):
+    return [f"2025-01-01 12:00:00,000 - line {i:05d}" for i in range(start, start + count)]
+
+
+def take(lines, count, timeout=10):
+    """Next count lines of a follower, failing instead of blocking forever"""
+    result = []
+
+    def consume():
+        for _ in range(count):
+            result.append(next(lines))
+
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"follower stalled after {len(result)} of {count} lines"
+    return result
+
+
+def start_follower(log_file):
+    """Follower that has opened the log (it starts lazily at the end of the file)"""
+    lines = LogFollower(str(log_file), poll_interval=0.01).follow()
+    first = []
+    thread = threading.Thread(target=lambda: first.append(next(lines)), daemon=True)
+    thread.start()
+    marker = 0
+    while thread.is_alive():
+        marker += 1
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write(f"2025-01-01 12:00:00,000 - marker {marker}\n")
+        thread.join(0.05)
+    # Markers written while the first one was being read are still pending
+    received = int(first[0].rsplit(' ', 1)[1])
+    take(lines, marker - received)
+    return lines
+
+
+def test_follower_reads_new_lines(tmp_path):
+    log_file = tmp_path / "hysteria-monitor.log"
+    write_lines(log_file, 0, 3)
+    lines = start_follower(log_file)
+
+    write_lines(log_file, 3, 2)
+    assert take(lines, 2) == expected(3, 2)
+
+
+def test_rotation_is_detected_when_file_grows_past_old_offset(tmp_path):
+    log_file = tmp_path / "hysteria-monitor.log"
+    log_file.touch()
+    rotator = LogRotator(str(log_file))
+    lines = start_follower(log_file)
+
+    write_lines(log_file, 0, 10)
+    assert take(lines, 10) == expected(0, 10)
+
+    # Unread lines, rotation and more writes than before, all between two polls
+    write_lines(log_file, 10, 5)
+    assert rotator.rotate()["success"]
+    write_lines(log_file, 15, 50)
+
+    assert take(lines, 55) == expected(10, 55)
+
+
+def test_rotation_with_partial_line_at_segment_end(tmp_path):
+    log_file = tmp_path / "hysteria-monitor.log"
+    log_file.touch()
+    rotator = LogRotator(str(log_file))
+    lines = start_follower(log_file)
+
+    write_lines(log_file, 0, 2)
+    assert take(lines, 2) == expected(0, 2)
+
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write("2025-01-01 12:00:00,000 - split ")
+    assert rotator.rotate()["success"]
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write("line\n")
+    write_lines(log_file, 2, 3)
+
+    assert take(lines, 4) == ["2025-01-01 12:00:00,000 - split line"] + expected(2, 3)
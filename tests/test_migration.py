@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the resumable NDJSON client import
+"""
+
+import json
+import socket
+
+import pytest
+
+from migration import ClientMigrator
+
+
+def client_line(client_id, port, server="203.0.113.10:443", password="secret123", **extra):
+    record = {"type": "client", "id": client_id, "server": server, "port": port,
+              "password": password, "tuning": {"profile": "balanced", "rtt_ms": 80}}
+    record.update(extra)
+    return json.dumps(record) + "\n"
+
+
+@pytest.fixture
+def manager(app_module, systemctl, tmp_path, monkeypatch):
+    """Client manager with an empty client list and configs in a temp dir"""
+    clients_file = tmp_path / "clients.json"
+    clients_file.write_text("{}")
+    (tmp_path / "systemd").mkdir()
+    monkeypatch.setattr(app_module, "CLIENTS_CONFIG_FILE", str(clients_file))
+    monkeypatch.setattr(app_module, "SYSTEMD_DIR", str(tmp_path / "systemd"))
+    server_manager = app_module.monitor.server_manager
+    monkeypatch.setitem(server_manager.server_config, "port", 443)
+    return app_module.HysteriaClientManager(server_manager)
+
+
+@pytest.fixture
+def migrator(manager, tmp_path):
+    (tmp_path / "hysteria").mkdir()
+    return ClientMigrator(manager, manager.server_manager,
+                          str(tmp_path / "hysteria"), str(tmp_path / "imports"))
+
+
+def run_import(migrator, lines, **kwargs):
+    return list(migrator.import_lines(lines, **kwargs))
+
+
+def test_import_provisions_clients_in_batches(migrator, manager, systemctl, tmp_path):
+    lines = [json.dumps({"type": "header", "version": 1}) + "\n"]
+    lines += [client_line(f"node{i}", 20000 + i) for i in range(5)]
+    progress = run_import(migrator, lines, batch_size=2)
+
+    assert [item["state"] for item in progress] == ["running", "running", "done"]
+    assert progress[-1]["imported"] == 5
+    assert sorted(manager.clients) == [f"node{i}" for i in range(5)]
+    assert manager.clients["node3"]["port"] == 20003
+    assert (tmp_path / "systemd" / "hysteria-node3.service").exists()
+    config = (tmp_path / "hysteria" / "node3.yaml").read_text()
+    assert "server: 203.0.113.10:443" in config
+    assert "listen: 127.0.0.1:20003" in config
+    # One daemon-reload and start per batch, not per client
+    assert [call[0] for call in systemctl()].count("daemon-reload") == 3
+    assert ["start", "hysteria-node4"] in systemctl()
+
+
+def test_invalid_records_are_reported_and_skipped(migrator, manager):
+    lines = [
+        "{not json\n",
+        client_line("bad id", 20001),
+        client_line("node1", 20002, server="203.0.113.10"),
+        client_line("node2", 80),
+        client_line("node3", 20004, password="x: y"),
+        client_line("node4", 20005),
+    ]
+    result = run_import(migrator, lines)[-1]
+
+    assert [error["line"] for error in result["errors"]] == [1, 2, 3, 4, 5]
+    assert result["imported"] == 1
+    assert list(manager.clients) == ["node4"]
+
+
+def test_identical_clients_are_skipped(migrator, manager):
+    run_import(migrator, [client_line("node1", 20001)])
+    result = run_import(migrator, [client_line("node1", 20001)])[-1]
+    assert result["skipped"] == 1
+    assert result["imported"] == 0
+    assert list(manager.clients) == ["node1"]
+
+
+def test_taken_ids_and_ports_are_reassigned(migrator, manager):
+    run_import(migrator, [client_line("node1", 20001)])
+    lines = [
+        # Same id, different server: imported under a new id and port
+        client_line("node1", 20001, server="198.51.100.7:443"),
+        # Same port as an earlier record of the same batch
+        client_line("node2", 20002),
+        client_line("node3", 20002),
+        # Ports of the web manager and the Hysteria server are never used
+        client_line("node4", 8080),
+        client_line("node5", 1443),
+    ]
+    migrator.server_manager.server_config["port"] = 1443
+    run_import(migrator, lines)
+
+    ports = [client["port"] for client in manager.clients.values()]
+    assert len(set(ports)) == len(ports) == 6
+    assert manager.clients["node1"]["server"] == "203.0.113.10:443"
+    moved = [client for client in manager.clients.values() if client["server"] == "198.51.100.7:443"]
+    assert len(moved) == 1 and moved[0]["port"] != 20001
+    assert manager.clients["node2"]["port"] == 20002
+    assert manager.clients["node3"]["port"] != 20002
+    assert manager.clients["node4"]["port"] != 8080
+    assert manager.clients["node5"]["port"] != 1443
+
+
+def test_ports_held_by_other_services_are_skipped(manager):
+    first = manager.get_next_available_port()
+    assert first not in (8080, 443)
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        try:
+            listener.bind(('127.0.0.1', first))
+        except OSError:
+            pytest.skip(f"port {first} became busy")
+        listener.listen(1)
+        assert not manager.is_port_available(first)
+        assert manager.get_next_available_port() != first
+    assert manager.is_port_available(first)
+
+
+def test_interrupted_import_resumes_with_same_id(migrator, manager, systemctl):
+    lines = [client_line(f"node{i}", 20000 + i) for i in range(6)]
+    progress = migrator.import_lines(lines, batch_size=2, import_id="move-1")
+    assert next(progress)["line"] == 2
+    # The connection drops after the first batch
+    progress.close()
+    assert sorted(manager.clients) == ["node0", "node1"]
+
+    result = run_import(migrator, lines, batch_size=2, import_id="move-1")[-1]
+    assert result["state"] == "done"
+    assert result["imported"] == 6
+    assert result["skipped"] == 0
+    assert sorted(manager.clients) == [f"node{i}" for i in range(6)]
+    started = [call[1:] for call in systemctl() if call[0] == "start"]
+    assert sorted(unit for units in started for unit in units) == [f"hysteria-node{i}" for i in range(6)]
+
+
+def test_invalid_import_id_is_rejected(migrator):
+    with pytest.raises(ValueError):
+        run_import(migrator, [], import_id="../etc")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the host network tuning advisor against a fake /proc and /sys tree
+"""
+
+import os
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from net_tuning import MIB, MIN_UDP_BUFFER, NetworkTuningAdvisor
+
+ROUTE = """Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT
+eth0\t00000000\t0102A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0
+eth0\t0002A8C0\t00000000\t0001\t0\t0\t100\t00FFFFFF\t0\t0\t0
+"""
+
+SYSCTLS = {
+    "net.core.rmem_max": "212992",
+    "net.core.wmem_max": "67108864",
+    "net.core.netdev_max_backlog": "1000",
+    "net.core.default_qdisc": "fq_codel",
+    "net.ipv4.tcp_congestion_control": "cubic",
+    "net.ipv4.tcp_available_congestion_control": "reno cubic bbr",
+    "net.netfilter.nf_conntrack_max": "1000",
+    "net.netfilter.nf_conntrack_count": "900"
+}
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content + "\n")
+
+
+@pytest.fixture
+def host(tmp_path):
+    """Fake proc/sys roots, returns a function setting sysctls"""
+    proc = tmp_path / "proc"
+    sys_root = tmp_path / "sys"
+    write(str(proc / "net" / "route"), ROUTE)
+    write(str(sys_root / "class" / "net" / "eth0" / "mtu"), "1500")
+
+    def set_sysctl(key, value):
+        write(str(proc.joinpath("sys", *key.split('.'))), value)
+
+    for key, value in SYSCTLS.items():
+        set_sysctl(key, value)
+    set_sysctl.proc = str(proc)
+    set_sysctl.sys = str(sys_root)
+    return set_sysctl
+
+
+@pytest.fixture
+def advisor(host, tmp_path):
+    return NetworkTuningAdvisor(host.proc, host.sys, str(tmp_path / "sysctl.d" / "99-hysteria-web.conf"),
+                                os.path.join(FIXTURES_DIR, "ethtool"))
+
+
+def checks(report):
+    return {check["key"]: check for check in report["checks"]}
+
+
+def test_analyze_reports_statuses_and_recommendations(advisor):
+    report = advisor.analyze(32 * MIB)
+    by_key = checks(report)
+
+    assert report["interface"] == "eth0"
+    assert report["required_buffer"] == 32 * MIB
+    assert by_key["net.core.rmem_max"]["status"] == "warning"
+    assert by_key["net.core.rmem_max"]["recommended"] == 32 * MIB
+    assert by_key["net.core.wmem_max"]["status"] == "ok"
+    assert by_key["net.core.netdev_max_backlog"]["status"] == "warning"
+    assert by_key["net.ipv4.tcp_congestion_control"]["status"] == "info"
+    assert by_key["net.ipv4.tcp_congestion_control"]["settable"] is True
+    assert by_key["net.core.default_qdisc"]["status"] == "ok"
+    # 90% full, recommend twice the current count
+    assert by_key["net.netfilter.nf_conntrack_max"]["status"] == "warning"
+    assert by_key["net.netfilter.nf_conntrack_max"]["recommended"] == 1800
+    assert by_key["eth0.mtu"]["current"] == 1500
+    assert by_key["eth0.mtu"]["status"] == "ok"
+    assert by_key["eth0.mtu"]["settable"] is False
+
+    # Offloads come from the stand-in ethtool, not the host
+    assert by_key["eth0.generic-segmentation-offload"]["status"] == "ok"
+    assert by_key["eth0.generic-receive-offload"]["status"] == "info"
+    assert by_key["eth0.tx-udp-segmentation"]["current"] is False
+
+    assert report["warnings"] == 3
+    assert report["settable_gaps"] == [
+        "net.core.rmem_max", "net.core.netdev_max_backlog",
+        "net.ipv4.tcp_congestion_control", "net.netfilter.nf_conntrack_max"
+    ]
+
+
+def test_buffer_recommendation_is_bounded(advisor):
+    assert advisor.analyze(None)["required_buffer"] == MIN_UDP_BUFFER
+    assert advisor.analyze(1024 * MIB)["required_buffer"] == 64 * MIB
+
+
+def test_missing_values_are_unknown(advisor, host, tmp_path):
+    os.remove(os.path.join(host.proc, "sys", "net", "core", "rmem_max"))
+    os.remove(os.path.join(host.proc, "sys", "net", "ipv4", "tcp_available_congestion_control"))
+    by_key = checks(advisor.analyze())
+
+    assert by_key["net.core.rmem_max"]["status"] == "unknown"
+    # BBR cannot be set without the module
+    assert by_key["net.ipv4.tcp_congestion_control"]["settable"] is False
+    assert "not loaded" in by_key["net.ipv4.tcp_congestion_control"]["message"]
+
+    bare = NetworkTuningAdvisor(str(tmp_path / "none"), str(tmp_path / "none"),
+                                str(tmp_path / "dropin.conf"), os.path.join(FIXTURES_DIR, "ethtool"))
+    report = bare.analyze()
+    assert report["interface"] is None
+    assert report["warnings"] == 0
+    assert "net.netfilter.nf_conntrack_max" not in checks(report)
+
+
+def test_unknown_interface_has_no_offload_state(advisor, host):
+    write(os.path.join(host.proc, "net", "route"), ROUTE.replace("eth0", "ens3"))
+    write(os.path.join(host.sys, "class", "net", "ens3", "mtu"), "1200")
+    by_key = checks(advisor.analyze())
+
+    assert by_key["ens3.mtu"]["status"] == "warning"
+    assert by_key["ens3.generic-receive-offload"]["status"] == "unknown"
+
+
+def test_apply_writes_only_settable_gaps(advisor):
+    result = advisor.apply(32 * MIB, load=False)
+    assert result["success"]
+    assert result["values"] == {
+        "net.core.rmem_max": 32 * MIB,
+        "net.core.netdev_max_backlog": 5000,
+        "net.ipv4.tcp_congestion_control": "bbr",
+        "net.netfilter.nf_conntrack_max": 1800
+    }
+    with open(advisor.dropin_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    assert content.startswith("# Generated by Hysteria2 Web Manager")
+    assert f"net.core.rmem_max = {32 * MIB}\n" in content
+    assert "net.core.wmem_max" not in content
+
+
+def test_apply_keeps_earlier_dropin_keys(advisor, host):
+    advisor.apply(32 * MIB, load=False)
+
+    # The earlier fixes are live now, only the qdisc drifted
+    host("net.core.rmem_max", str(32 * MIB))
+    host("net.core.netdev_max_backlog", "5000")
+    host("net.ipv4.tcp_congestion_control", "bbr")
+    host("net.netfilter.nf_conntrack_max", "1800")
+    host("net.core.default_qdisc", "pfifo_fast")
+    result = advisor.apply(32 * MIB, load=False)
+
+    assert result["values"] == {"net.core.default_qdisc": "fq"}
+    assert advisor.read_dropin() == {
+        "net.core.rmem_max": str(32 * MIB),
+        "net.core.netdev_max_backlog": "5000",
+        "net.ipv4.tcp_congestion_control": "bbr",
+        "net.netfilter.nf_conntrack_max": "1800",
+        "net.core.default_qdisc": "fq"
+    }
+
+
+def test_apply_without_gaps_leaves_the_dropin_alone(advisor, host):
+    for key, value in (("net.core.rmem_max", str(64 * MIB)), ("net.core.netdev_max_backlog", "5000"),
+                       ("net.ipv4.tcp_congestion_control", "bbr"),
+                       ("net.netfilter.nf_conntrack_count", "10")):
+        host(key, value)
+    result = advisor.apply(load=False)
+    assert result == {"success": True, "message": "Host settings already match", "values": {}}
+    assert not os.path.exists(advisor.dropin_file)
+
+
+def test_host_tuning_endpoint_uses_configured_roots(client):
+    report = client.get('/api/host/tuning').get_json()
+    assert report["interface"] is None
+    assert all(check["status"] == "unknown" for check in report["checks"])
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for BDP-based QUIC window sizing and the shared memory budget
+"""
+
+import pytest
+
+from quic_tuning import KIB, MIB, PROFILE_PRESETS, QuicTuner
+
+
+@pytest.fixture
+def tuner(tmp_path):
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemTotal:        1048576 kB\nMemFree:          524288 kB\n")
+    return QuicTuner(str(meminfo))
+
+
+def test_windows_follow_the_bandwidth_delay_product(tuner):
+    # 400 Mbps x 100 ms = 5 MB, balanced uses 1.5x BDP, aligned to 64 KiB
+    tuning = tuner.compute_profile("balanced", 400, 100, memory_budget_mb=1024)
+    assert tuning["bdp_bytes"] == 5000000
+    assert tuning["max_stream_window"] == 114 * 64 * KIB
+    assert tuning["max_conn_window"] == 228 * 64 * KIB
+    assert tuning["init_stream_window"] == 57 * 64 * KIB
+    assert tuning["memory_limited"] is False
+    assert tuning["bandwidth_up"] == "360 mbps"
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILE_PRESETS))
+def test_stream_window_is_clamped_to_the_preset(tuner, profile):
+    preset = PROFILE_PRESETS[profile]
+    small = tuner.compute_profile(profile, 1, 1, memory_budget_mb=4096)
+    large = tuner.compute_profile(profile, 10000, 1000, memory_budget_mb=4096)
+    assert small["max_stream_window"] == preset["min_stream_window"]
+    assert large["max_stream_window"] == preset["max_stream_window"]
+    assert large["max_incoming_streams"] == preset["max_streams"]
+
+
+def test_connections_share_the_memory_budget(tuner):
+    tuning = tuner.compute_profile("high-bdp", 1000, 200, memory_budget_mb=64, connections=16)
+    assert tuning["memory_limited"] is True
+    assert tuning["max_conn_window"] == 4 * MIB
+    assert tuning["max_stream_window"] <= tuning["max_conn_window"]
+    assert 16 * tuning["max_conn_window"] <= 64 * MIB
+    # 4 MiB per connection leaves room for 64 streams of 64 KiB
+    assert tuning["max_incoming_streams"] == 64
+
+
+def test_tiny_budgets_keep_minimum_windows(tuner):
+    tuning = tuner.compute_profile("low-memory", 1000, 100, memory_budget_mb=1, connections=100)
+    assert tuning["max_conn_window"] == 256 * KIB
+    assert tuning["max_stream_window"] == 256 * KIB
+    assert tuning["init_stream_window"] == 64 * KIB
+    assert tuning["max_incoming_streams"] == 16
+
+
+def test_default_budget_is_a_share_of_host_memory(tuner, tmp_path):
+    tuning = tuner.compute_profile("low-memory")
+    assert tuning["memory_budget_bytes"] == int(1024 * MIB * 0.10)
+    assert tuning["bandwidth_mbps"] == 1000
+    assert tuning["rtt_ms"] == 100
+
+    unknown = QuicTuner(str(tmp_path / "missing")).compute_profile("balanced", 100, 50)
+    assert unknown["memory_budget_bytes"] is None
+    assert unknown["memory_limited"] is False
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"profile": "turbo"},
+    {"bandwidth_mbps": -10},
+    {"rtt_ms": -1},
+])
+def test_invalid_inputs_are_rejected(tuner, kwargs):
+    with pytest.raises(ValueError):
+        tuner.compute_profile(**kwargs)
+
+
+def test_client_windows_fit_the_budget_together(app_module, monkeypatch):
+    manager = app_module.monitor.client_manager
+    monkeypatch.setattr(manager, "clients", {})
+    budget_mb = 256
+
+    windows = []
+    for index in range(app_module.CLIENT_EXPECTED_CONNECTIONS):
+        tuning = manager.compute_client_tuning("203.0.113.10", "high-bdp", 1000, 300, budget_mb)
+        windows.append(tuning["max_conn_window"])
+        manager.clients[f"client{index}"] = {"port": 20000 + index, "tuning": tuning}
+
+    # Clients added later are not sized larger than the first one
+    assert len(set(windows)) == 1
+    assert sum(windows) <= budget_mb * MIB
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for request sampling, forced profiles and the slow-request ring
+"""
+
+import cProfile
+import marshal
+import pstats
+import subprocess
+
+import pytest
+
+from request_profiler import RequestProfiler, summarize_io
+
+TOKEN = "admin-test-token"
+ADMIN = {"Authorization": f"Bearer {TOKEN}"}
+ROUTE = '/api/tuning/profiles'
+
+
+@pytest.fixture
+def profiler(app_module, monkeypatch):
+    """Fresh profiler with the admin API enabled"""
+    profiler = RequestProfiler(slow_threshold_ms=60000, max_profiles=5, max_slow=3)
+    monkeypatch.setattr(app_module, "profiler", profiler)
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", TOKEN)
+    return profiler
+
+
+def configure(client, **settings):
+    response = client.post('/api/admin/profiling', json=settings, headers=ADMIN)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_requests_are_not_profiled_by_default(client, profiler):
+    response = client.get(ROUTE)
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+    assert profiler.list_records() == {"profiles": [], "slow_requests": []}
+
+
+def test_sampling_globally_and_per_route(client, profiler):
+    configure(client, enabled=True, sample_rate=1)
+    assert 'X-Profile-Id' in client.get(ROUTE).headers
+
+    # A route rate overrides the global one
+    configure(client, routes={"api_tuning_profiles": 0})
+    assert 'X-Profile-Id' not in client.get(ROUTE).headers
+    assert 'X-Profile-Id' in client.get('/api/clients').headers
+
+    configure(client, enabled=False)
+    assert 'X-Profile-Id' not in client.get('/api/clients').headers
+    assert [record["endpoint"] for record in profiler.list_records()["profiles"]] == \
+        ["api_get_clients", "api_tuning_profiles"]
+
+
+def test_invalid_settings_are_rejected(client, profiler):
+    for settings in ({"sample_rate": 2}, {"routes": {"api_status": -1}},
+                     {"routes": {"no_such_view": 1}}, {"slow_threshold_ms": 0},
+                     {"sample_rate": "often"}):
+        response = client.post('/api/admin/profiling', json=settings, headers=ADMIN)
+        assert response.status_code == 400
+    assert profiler.get_config()["sample_rate"] == 0.0
+
+
+@pytest.mark.parametrize("headers, profiled", [
+    ({"X-Profile": "1", **ADMIN}, True),
+    ({"X-Profile": "1"}, False),
+    ({"X-Profile": "1", "Authorization": "Bearer wrong"}, False),
+    ({"X-Profile": "0", **ADMIN}, False),
+])
+def test_forced_profile_needs_the_admin_token(client, profiler, headers, profiled):
+    response = client.get(ROUTE, headers=headers)
+    assert ('X-Profile-Id' in response.headers) is profiled
+    assert len(profiler.list_records()["profiles"]) == int(profiled)
+
+
+def test_forced_profile_is_ignored_without_admin_api(client, profiler, monkeypatch, app_module):
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "")
+    response = client.get(ROUTE, headers={"X-Profile": "1", "Authorization": "Bearer "})
+    assert 'X-Profile-Id' not in response.headers
+    assert client.get('/api/admin/profiling', headers=ADMIN).status_code == 404
+
+
+def test_admin_api_requires_the_token(client, profiler):
+    assert client.get('/api/admin/profiling').status_code == 401
+    assert client.get('/api/admin/profiling', headers={"Authorization": TOKEN}).status_code == 401
+    assert client.get('/api/admin/profiling/1', headers={"Authorization": "Bearer x"}).status_code == 401
+
+
+def test_slow_request_ring_is_bounded(client, profiler):
+    configure(client, slow_threshold_ms=0.001)
+    for _ in range(5):
+        client.get('/api/clients')
+
+    slow = profiler.list_records()["slow_requests"]
+    assert len(slow) == 3
+    assert [record["id"] for record in slow] == [5, 4, 3]
+    assert all(record["slow"] and not record["profiled"] for record in slow)
+    assert all(record["path"] == '/api/clients' for record in slow)
+    # Unprofiled slow requests have no profile to download
+    response = client.get(f'/api/admin/profiling/{slow[0]["id"]}?format=text', headers=ADMIN)
+    assert response.status_code == 404
+
+
+def test_profile_downloads(client, profiler, tmp_path):
+    record_id = client.get(ROUTE, headers={"X-Profile": "1", **ADMIN}).headers['X-Profile-Id']
+    url = f'/api/admin/profiling/{record_id}'
+
+    record = client.get(url, headers=ADMIN).get_json()
+    assert record["endpoint"] == "api_tuning_profiles"
+    assert record["status"] == 200
+    assert record["top"] and "pstats" not in record
+    assert set(record["io"]) == {"subprocess_ms", "socket_ms", "file_ms"}
+
+    text = client.get(f'{url}?format=text&sort=tottime', headers=ADMIN)
+    assert text.mimetype == 'text/plain'
+    assert "Ordered by: internal time" in text.get_data(as_text=True)
+    assert client.get(f'{url}?format=text&sort=bogus', headers=ADMIN).status_code == 400
+
+    download = client.get(f'{url}?format=pstats', headers=ADMIN)
+    assert download.headers['Content-Disposition'] == f"attachment; filename=profile-{record_id}.pstats"
+    path = tmp_path / "profile.pstats"
+    path.write_bytes(download.data)
+    stats = pstats.Stats(str(path))
+    assert any(name == "api_tuning_profiles" for _, _, name in stats.stats)
+
+    assert client.get(f'{url}?format=xml', headers=ADMIN).status_code == 400
+    assert client.get('/api/admin/profiling/999', headers=ADMIN).status_code == 404
+
+
+def test_io_time_is_attributed_to_categories(tmp_path):
+    path = tmp_path / "data"
+    path.write_text("x" * 1000)
+
+    profile = cProfile.Profile()
+    profile.enable()
+    subprocess.run(['sleep', '0.05'], check=True)
+    with open(path, 'r', encoding='utf-8') as f:
+        f.read()
+    profile.disable()
+    profile.create_stats()
+
+    io = summarize_io(marshal.loads(marshal.dumps(profile.stats)))
+    assert io["subprocess_ms"] >= 50
+    # The pipe reads inside subprocess.run are not counted as file I/O twice
+    assert io["file_ms"] < io["subprocess_ms"]
+    assert io["socket_ms"] == 0
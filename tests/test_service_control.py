@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the coalescing service control queue against a stand-in systemctl
+"""
+
+import time
+
+import pytest
+
+from service_control import ServiceControlQueue
+
+DEBOUNCE = 0.2
+
+
+@pytest.fixture
+def queue(systemctl):
+    return ServiceControlQueue(max_parallel=2, debounce=DEBOUNCE, max_delay=2.0, min_interval=1.0)
+
+
+def finish(queue, operation, timeout=10):
+    operation = queue.wait(operation["id"], timeout)
+    assert operation["state"] in ("done", "failed"), operation
+    return operation
+
+
+def test_burst_becomes_one_operation(queue, systemctl):
+    operations = [queue.submit("hysteria-client3", "restart") for _ in range(20)]
+    assert len({operation["id"] for operation in operations}) == 1
+
+    operation = finish(queue, operations[-1])
+    assert operation["state"] == "done"
+    assert operation["requests"] == 20
+    assert systemctl() == [["restart", "hysteria-client3"]]
+
+
+def test_later_action_wins(queue, systemctl):
+    queue.submit("hysteria-client3", "stop")
+    operation = queue.submit("hysteria-client3", "start")
+    assert operation["action"] == "start"
+
+    finish(queue, operation)
+    assert systemctl() == [["start", "hysteria-client3"]]
+
+
+def test_requests_while_the_same_action_starts_are_merged(queue, systemctl, monkeypatch):
+    monkeypatch.setenv("SYSTEMCTL_DELAY", "0.5")
+    operation = queue.submit("hysteria-client3", "restart")
+    while queue.get(operation["id"])["state"] == "queued":
+        time.sleep(0.01)
+
+    again = queue.submit("hysteria-client3", "restart")
+    assert again["id"] == operation["id"]
+    assert finish(queue, operation)["requests"] == 2
+    assert len(systemctl()) == 1
+
+
+def test_parallel_systemctl_calls_are_capped(queue, systemctl, monkeypatch):
+    monkeypatch.setenv("SYSTEMCTL_DELAY", "0.3")
+    operations = [queue.submit(f"hysteria-client{i}", "start") for i in range(6)]
+    operations = [finish(queue, operation) for operation in operations]
+
+    assert all(operation["state"] == "done" for operation in operations)
+    events = sorted([(op["started"], 1) for op in operations] + [(op["finished"], -1) for op in operations])
+    running = peak = 0
+    for _, change in events:
+        running += change
+        peak = max(peak, running)
+    assert peak == 2
+    assert len(systemctl()) == 6
+
+
+def test_restarts_of_a_unit_are_rate_limited(queue, systemctl):
+    first = finish(queue, queue.submit("hysteria-client3", "restart"))
+
+    second = queue.submit("hysteria-client3", "restart")
+    assert second["id"] != first["id"]
+    assert second["due"] >= first["finished"] + 1.0
+    second = finish(queue, second)
+    assert second["started"] - first["finished"] >= 1.0
+
+    # Other actions and other units are not held back
+    started = time.time()
+    finish(queue, queue.submit("hysteria-client4", "restart"))
+    finish(queue, queue.submit("hysteria-client3", "stop"))
+    assert time.time() - started < 1.0
+    assert [call[0] for call in systemctl()] == ["restart", "restart", "restart", "stop"]
+
+
+def test_failed_operations_report_the_error(queue, monkeypatch):
+    monkeypatch.setenv("SYSTEMCTL_FAIL", "1")
+    operation = finish(queue, queue.submit("hysteria-client9", "start"))
+    assert operation["state"] == "failed"
+    assert "Unit not found" in operation["error"]
+
+
+def test_invalid_action_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit("hysteria-client3", "reload")
+
+
+def test_operation_endpoint_validates_wait(client, app_module, systemctl, monkeypatch):
+    monkeypatch.setattr(app_module, "service_queue", ServiceControlQueue(debounce=DEBOUNCE))
+    response = client.post('/api/service/client1/restart')
+    assert response.status_code == 202
+    operation_id = response.get_json()["operation"]["id"]
+
+    for wait in ("abc", "-1", "nan"):
+        response = client.get(f'/api/operations/{operation_id}?wait={wait}')
+        assert response.status_code == 400
+        assert "wait" in response.get_json()["error"]
+
+    operation = client.get(f'/api/operations/{operation_id}?wait=5').get_json()
+    assert operation["state"] == "done"
+    assert client.get('/api/operations/9999').status_code == 404
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the /proc/net socket statistics collector against a fake tree
+"""
+
+import os
+
+import pytest
+
+from socket_stats import SocketStatsCollector
+
+TCP = """  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode
+   0: 0100007F:0439 00000000:0000 0A 00000080:00000002 00:00000000 00000000     0        0 1001 1
+   1: 0100007F:0439 0100007F:C350 01 00000010:00000020 00:00000000 00000000     0        0 1002 1
+   2: 0100007F:0439 0100007F:C351 06 00000000:00000000 00:00000000 00000000     0        0 0 1
+   3: 0100007F:0438 00000000:0000 0A 00000080:00000000 00:00000000 00000000     0        0 1003 1
+"""
+
+UDP = """   sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode ref pointer drops
+  100: 00000000:01BB 00000000:0000 07 00000000:00000100 00:00000000 00000000     0        0 2001 2 0000000000000000 7
+  101: 00000000:D431 00000000:0000 07 00000000:00000040 00:00000000 00000000     0        0 2002 2 0000000000000000 3
+  102: 00000000:D432 00000000:0000 07 00000000:00000000 00:00000000 00000000     0        0 2003 2 0000000000000000 0
+  103: 00000000:D433 00000000:0000 07 00000000:00000000 00:00000000 00000000     0        0 2004 2 0000000000000000 5
+"""
+
+UDP6 = """  sl  local_address                         remote_address                        st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode ref pointer drops
+  1: 00000000000000000000000000000000:01BB 00000000000000000000000000000000:0000 07 00000000:00000000 00:00000000 00000000     0        0 2005 2 0000000000000000 1
+"""
+
+CONNTRACK = """ipv4     2 udp      17 29 src=1.1.1.1 dst=10.2.3.4 sport=5000 dport=443 src=10.2.3.4 dst=1.1.1.1 sport=443 dport=5000 mark=0 use=2
+ipv4     2 udp      17 29 src=1.1.1.2 dst=10.2.3.4 sport=5001 dport=443 src=10.2.3.4 dst=1.1.1.2 sport=443 dport=5001 mark=0 use=2
+ipv4     2 udp      17 29 src=1.1.1.1 dst=10.2.3.4 sport=443 dport=53 src=10.2.3.4 dst=1.1.1.1 sport=53 dport=443 mark=0 use=2
+ipv4     2 tcp      6 29 ESTABLISHED src=1.1.1.1 dst=10.2.3.4 sport=5002 dport=443 src=10.2.3.4 dst=1.1.1.1 sport=443 dport=5002 mark=0 use=2
+"""
+
+CLIENTS = {
+    "client1": {"port": 1081, "service": "hysteria-client1"},
+    "client2": {"port": 1080, "service": "hysteria-client2"},
+    "client3": {"port": 1082, "service": "hysteria-client3"}
+}
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='ascii') as f:
+        f.write(content)
+
+
+def add_process(proc, cgroup, unit, pid, inodes):
+    """A unit process holding sockets with the given inodes"""
+    procs = os.path.join(cgroup, "system.slice", f"{unit}.service", "cgroup.procs")
+    existing = open(procs).read() if os.path.exists(procs) else ""
+    write(procs, existing + f"{pid}\n")
+    fd_dir = os.path.join(proc, str(pid), "fd")
+    os.makedirs(fd_dir)
+    os.symlink("/dev/null", os.path.join(fd_dir, "0"))
+    for fd, inode in enumerate(inodes, 3):
+        os.symlink(f"socket:[{inode}]", os.path.join(fd_dir, str(fd)))
+
+
+@pytest.fixture
+def collector(tmp_path):
+    proc = str(tmp_path / "proc")
+    cgroup = str(tmp_path / "cgroup")
+    write(os.path.join(proc, "net", "tcp"), TCP)
+    write(os.path.join(proc, "net", "udp"), UDP)
+    write(os.path.join(proc, "net", "udp6"), UDP6)
+    write(os.path.join(proc, "net", "nf_conntrack"), CONNTRACK)
+    # Both clients talk to the same server; client3's unit is not running
+    add_process(proc, cgroup, "hysteria-client1", 845, [1001, 1002, 2002])
+    add_process(proc, cgroup, "hysteria-client2", 851, [1003, 2003])
+    add_process(proc, cgroup, "hysteria-client2", 852, [2004])
+    return SocketStatsCollector(proc, cgroup)
+
+
+def test_socks_connections_per_client(collector):
+    clients = collector.collect(CLIENTS)["clients"]
+    assert clients["client1"]["socks"] == {
+        "listening": 1, "established": 1, "other": 1, "accept_queue": 2,
+        "rx_queue": 32, "tx_queue": 16, "max_rx_queue": 32
+    }
+    assert clients["client2"]["socks"]["listening"] == 1
+    assert clients["client2"]["socks"]["established"] == 0
+
+
+def test_udp_sockets_are_mapped_by_inode(collector):
+    clients = collector.collect(CLIENTS, 443)["clients"]
+    assert clients["client1"]["quic"] == {
+        "sockets": 1, "rx_queue": 64, "tx_queue": 0, "max_rx_queue": 64, "drops": 3
+    }
+    # Sockets of every process in the unit count
+    assert clients["client2"]["quic"]["sockets"] == 2
+    assert clients["client2"]["quic"]["drops"] == 5
+
+
+def test_uninspectable_unit_reports_no_udp_stats(collector):
+    clients = collector.collect(CLIENTS)["clients"]
+    assert clients["client3"]["quic"] is None
+
+
+def test_server_listen_port_and_flows(collector):
+    server = collector.collect(CLIENTS, 443)["server"]
+    assert server["sockets"] == 2
+    assert server["rx_queue"] == 256
+    assert server["drops"] == 8
+    assert server["flows"] == 2
+    assert "server" not in collector.collect(CLIENTS)
+
+
+def test_missing_tables_yield_empty_stats(tmp_path):
+    collector = SocketStatsCollector(str(tmp_path / "proc"), str(tmp_path / "cgroup"))
+    stats = collector.collect(CLIENTS, 443)
+    assert stats["clients"]["client1"]["socks"]["listening"] == 0
+    assert stats["server"]["sockets"] == 0
+    assert stats["server"]["flows"] is None